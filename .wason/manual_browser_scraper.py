@@ -3,7 +3,9 @@
 采集industry-chain页面的SVG数据和chain-info页面的项目列表数据
 
 使用方法：
-    python manual_browser_scraper.py
+    python manual_browser_scraper.py                                  # 交互模式
+    python manual_browser_scraper.py --batch seeds.txt --refresh     # 批量采集模式（无界面）
+    python manual_browser_scraper.py --profile fast                   # 交互模式，去掉为观看者放慢的操作延迟
 
 功能：
     - 监听 industry-chain 页面：点击产业链按钮后自动采集SVG数据
@@ -12,22 +14,3400 @@
     - SVG数据：仅保存SVG文件和SVG代码（txt文件），不保存JSON数据
     - 项目列表：保存为JSON和CSV格式
     - 项目详情：保存为JSON格式
+    - 批量采集：从交互模式的persistent context导出登录状态，遇到未登录页面时中止采集
+
+依赖：
+    - playwright（必需）
+    - aiohttp（可选）：SVG直接下载使用独立连接池；未安装时使用 context.request，启动时会给出警告
+    - watchdog（可选）：监听SVG输出目录，同步其他进程写入的文件
+"""
+
+import asyncio
+import atexit
+import codecs
+import concurrent.futures
+import contextvars
+import copy
+import functools
+import hashlib
+import importlib.util
+import json
+import csv
+import fnmatch
+import inspect
+import io
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+# 日志（记录先放入队列，由后台线程写入stdout，终端或管道较慢时不阻塞事件循环），见 setup_logging()
+logger = logging.getLogger("manual_browser_scraper")
+
+# 日志记录中的结构化字段（采集中记录的日志会自动补充，也可以通过 extra 指定）
+LOG_FIELDS = ("page_type", "url", "stage", "elapsed")
+
+_log_listener = None
+
+
+class _TraceContextFilter(logging.Filter):
+    """为日志记录补充当前采集的结构化字段（在记录日志的线程中执行，可以读取当前采集）"""
+    
+    def filter(self, record):
+        trace = _current_trace.get()
+        if trace is not None:
+            if getattr(record, "page_type", None) is None:
+                record.page_type = trace.page_type
+            if getattr(record, "url", None) is None:
+                record.url = trace.key
+            if getattr(record, "stage", None) is None and trace._stack:
+                record.stage = trace._stack[-1][0]
+            if getattr(record, "elapsed", None) is None:
+                record.elapsed = round(time.perf_counter() - trace._start, 3)
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    日志格式：文本（时间 级别 消息  字段=值 ...）或每条一行JSON
+    """
+    
+    def __init__(self, json_format=False):
+        super().__init__("%(asctime)s %(levelname)-7s %(message)s", datefmt="%H:%M:%S")
+        self.json_format = json_format
+    
+    def format(self, record):
+        fields = {name: getattr(record, name) for name in LOG_FIELDS if getattr(record, name, None) is not None}
+        if self.json_format:
+            entry = {
+                "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+                "level": record.levelname,
+                "message": record.getMessage(),
+            }
+            entry.update(fields)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+        text = super().format(record)
+        if not fields:
+            return text
+        first_line, _, rest = text.partition("\n")
+        suffix = " ".join(f"{name}={value}" for name, value in fields.items())
+        return f"{first_line}  {suffix}" + (f"\n{rest}" if rest else "")
+
+
+def setup_logging(level="INFO", json_format=False, stream=None):
+    """
+    配置日志输出：QueueHandler 把日志记录放入队列，QueueListener 在后台线程中格式化并写入输出流
+    
+    Args:
+        level: 日志级别（DEBUG 输出逐步骤的详细信息和提取结果，默认 INFO）
+        json_format: 每条日志输出一行JSON（便于日志采集），默认False
+        stream: 输出流，默认 sys.stdout
+    """
+    global _log_listener
+    stop_logging()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(StructuredFormatter(json_format))
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_TraceContextFilter())
+    logger.handlers[:] = [queue_handler]
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    _log_listener = logging.handlers.QueueListener(log_queue, handler)
+    _log_listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """停止后台日志线程（先写出队列中剩余的日志）"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+# 页面事件绑定名称（注入脚本通过 window.__scraper_notify(...) 向Python推送路由/SVG变化，需与注入脚本保持一致）
+PAGE_EVENT_BINDING = "__scraper_notify"
+
+# 各页面类型默认的并发采集上限
+DEFAULT_COLLECTION_TYPE_LIMITS = {
+    "chain-detail": 2,
+    "chain-info": 5,
+    "product-details": 3,
+    "svg": 2,
+}
+
+# 各页面类型的就绪等待时间预算（秒），条件满足时立即返回，超时后继续采集
+DEFAULT_READINESS_TIMEOUTS = {
+    "chain-detail": 15.0,
+    "chain-info": 10.0,
+    "product-details": 8.0,
+    "svg": 10.0,
+}
+
+# 性能配置：浏览器操作延迟、是否无界面，以及采集过程中的固定等待、滚动次数和networkidle超时（秒）
+# interactive 适合有人观看的交互模式；fast 去掉为观看者放慢的延迟；batch 用于无人值守的批量采集
+PERFORMANCE_PROFILES = {
+    "interactive": {
+        "slow_mo": 100,  # 每个Playwright操作的延迟（毫秒）
+        "headless": False,  # 批量采集是否无界面运行（交互模式需要用户操作浏览器，始终显示窗口）
+        "page_load_timeout": 20.0,  # 处理页面前等待networkidle的超时
+        "svg_settle_timeout": 10.0,  # SVG URL变化后等待networkidle的超时
+        "max_scrolls": 50,  # 滚动加载的最多次数（内容不再增长时提前停止，只是防止无限滚动的上限）
+        "scroll_delay": 2.0,  # 每次滚动后等待新内容出现的最长时间
+        "scroll_idle_timeout": 3.0,  # 新内容出现后等待其加载完成的额外时间上限
+        "quick_check_delay": 2.0,  # 快速检查数据更新前的等待时间
+        "quick_check_scroll_delay": 1.5,  # 快速检查时每次滚动后的等待时间
+        "resource_policy": None,  # 请求拦截规则（见 ResourcePolicy），None表示不拦截
+        "recycle_after_collections": 300,  # 每个浏览器上下文完成多少次采集后重启（见 ContextRecycler；交互模式有打开的网页时改为逐页回收），0表示不限制
+        "recycle_after_renderer_mb": 1536,  # 所有页面JS堆超过多少MB后重启，0表示不限制
+        "recycle_check_interval": 60.0,  # 测量页面内存的间隔（秒）
+        "download_concurrency": 4,  # 同时进行的SVG下载数上限（见 SvgDownloadClient）
+        "download_rate": 4.0,  # 每个域名每秒的平均下载请求数，0表示不限速
+        "download_burst": 8,  # 每个域名允许的突发请求数
+        "download_retries": 3,  # 下载失败后的最大重试次数
+    },
+    "fast": {
+        "slow_mo": 0,
+        "headless": False,
+        "page_load_timeout": 10.0,
+        "svg_settle_timeout": 5.0,
+        "max_scrolls": 50,
+        "scroll_delay": 0.8,
+        "scroll_idle_timeout": 1.5,
+        "quick_check_delay": 0.8,
+        "quick_check_scroll_delay": 0.6,
+        "resource_policy": None,
+        "recycle_after_collections": 300,
+        "recycle_after_renderer_mb": 1536,
+        "recycle_check_interval": 60.0,
+        "download_concurrency": 8,
+        "download_rate": 8.0,
+        "download_burst": 16,
+        "download_retries": 3,
+    },
+    "batch": {
+        "slow_mo": 0,
+        "headless": True,
+        "page_load_timeout": 8.0,
+        "svg_settle_timeout": 5.0,
+        "max_scrolls": 50,
+        "scroll_delay": 0.5,
+        "scroll_idle_timeout": 1.0,
+        "quick_check_delay": 0.5,
+        "quick_check_scroll_delay": 0.5,
+        "resource_policy": {},  # 使用默认拦截规则
+        "recycle_after_collections": 200,
+        "recycle_after_renderer_mb": 1024,
+        "recycle_check_interval": 30.0,
+        "download_concurrency": 8,
+        "download_rate": 8.0,
+        "download_burst": 16,
+        "download_retries": 3,
+        "readiness_timeouts": {
+            "chain-detail": 10.0,
+            "chain-info": 8.0,
+            "product-details": 6.0,
+            "svg": 8.0,
+        },
+    },
+}
+
+DEFAULT_PERFORMANCE_PROFILE = "interactive"
+
+# 已不再使用的配置项（旧配置文件中可能仍然存在），读取时忽略
+DEPRECATED_PROFILE_KEYS = ("scroll_settle_timeout",)
+
+
+def resolve_performance_profile(name=None, overrides=None) -> dict:
+    """
+    获取性能配置（内置配置 + 覆盖项）
+    
+    Args:
+        name: 配置名称（interactive / fast / batch），None表示默认配置
+        overrides: 覆盖项，例如 {"scroll_delay": 1.0}
+        
+    Returns:
+        dict: 性能配置
+    """
+    name = name or DEFAULT_PERFORMANCE_PROFILE
+    if name not in PERFORMANCE_PROFILES:
+        raise ValueError(f"未知的性能配置: {name}（可选: {', '.join(PERFORMANCE_PROFILES)}）")
+    profile = dict(PERFORMANCE_PROFILES[name])
+    profile["name"] = name
+    for key, value in (overrides or {}).items():
+        if key in DEPRECATED_PROFILE_KEYS:
+            logger.warning("[性能配置] 配置项 %s 已不再使用，已忽略", key)
+            continue
+        if key not in PERFORMANCE_PROFILES[DEFAULT_PERFORMANCE_PROFILE] and key != "readiness_timeouts":
+            raise ValueError(f"未知的性能配置项: {key}")
+        profile[key] = value
+    return profile
+
+
+# SVG响应缓存的默认容量（字节）
+DEFAULT_SVG_CACHE_BYTES = 256 * 1024 * 1024
+
+# 请求拦截：站点主域名（页面和XHR/fetch永远放行）、永远放行的域名、默认拦截的资源类型和域名
+FIRST_PARTY_DOMAIN = "hanghangcha.com"
+ALWAYS_ALLOWED_HOSTS = ("data.hanghangcha.com",)
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+DEFAULT_BLOCKED_HOSTS = (
+    "hm.baidu.com",
+    "*.google-analytics.com",
+    "*.googletagmanager.com",
+    "*.doubleclick.net",
+    "*.cnzz.com",
+    "*.growingio.com",
+    "*.sensorsdata.cn",
+)
+
+# 被拦截资源的默认大小估算（字节），运行中观察到同类响应后改用实际平均值
+RESOURCE_SIZE_ESTIMATES = {
+    "image": 40 * 1024,
+    "font": 80 * 1024,
+    "media": 500 * 1024,
+    "script": 50 * 1024,
+    "stylesheet": 20 * 1024,
+    "other": 10 * 1024,
+}
+
+
+class ResourcePolicy:
+    """
+    请求拦截策略 - 通过 context.route 拦截采集用不到的资源（图片、字体、媒体、统计/广告脚本）
+    
+    data.hanghangcha.com 的资源和 .svg 文件永远放行，站内的页面和 XHR/fetch 请求（表格接口）也永远放行；
+    其余请求按资源类型和域名规则拦截，并统计拦截的请求数和节省的流量（按资源类型的平均大小估算）
+    """
+    
+    def __init__(self, block_types=None, block_hosts=None, allow_hosts=None):
+        """
+        初始化策略
+        
+        Args:
+            block_types: 拦截的资源类型，默认 DEFAULT_BLOCKED_RESOURCE_TYPES
+            block_hosts: 拦截的域名（支持通配符，如 "*.doubleclick.net"），默认 DEFAULT_BLOCKED_HOSTS
+            allow_hosts: 额外放行的域名（支持通配符），优先于拦截规则
+        """
+        self.block_types = set(DEFAULT_BLOCKED_RESOURCE_TYPES if block_types is None else block_types)
+        self.block_hosts = tuple(DEFAULT_BLOCKED_HOSTS if block_hosts is None else block_hosts)
+        self.allow_hosts = tuple(ALWAYS_ALLOWED_HOSTS) + tuple(allow_hosts or ())
+        # 域名通配符预先编译为正则（拦截规则保留原始写法，用于统计）
+        self._allow_patterns = [self._compile_host_pattern(pattern) for pattern in self.allow_hosts]
+        self._block_patterns = [(pattern, self._compile_host_pattern(pattern)) for pattern in self.block_hosts]
+        self._host_rules = {}  # host -> "allow" / "first-party" / 拦截规则 / None（缓存域名匹配结果）
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = {}
+        self.blocked_by_host = {}
+        self.estimated_bytes_saved = 0
+        self._observed_sizes = {}  # resource_type -> (总字节数, 响应数)，用于估算被拦截资源的大小
+    
+    @classmethod
+    def from_config(cls, config) -> "ResourcePolicy":
+        """
+        根据性能配置中的 resource_policy 创建策略
+        
+        Args:
+            config: None（不拦截）、{}（使用默认规则），或包含 block_types / block_hosts / allow_hosts 的字典
+            
+        Returns:
+            ResourcePolicy: 策略，不拦截时返回None
+        """
+        if config is None or config is False:
+            return None
+        if config is True:
+            config = {}
+        return cls(
+            block_types=config.get("block_types"),
+            block_hosts=config.get("block_hosts"),
+            allow_hosts=config.get("allow_hosts")
+        )
+    
+    @staticmethod
+    def _compile_host_pattern(pattern: str):
+        """把域名通配符（如 "*.doubleclick.net"）编译为正则（域名不区分大小写）"""
+        return re.compile(fnmatch.translate(pattern.lower()))
+    
+    def _host_rule(self, host: str):
+        rule = self._host_rules.get(host, "")
+        if rule != "":
+            return rule
+        if any(regex.match(host) for regex in self._allow_patterns):
+            rule = "allow"
+        elif host == FIRST_PARTY_DOMAIN or host.endswith("." + FIRST_PARTY_DOMAIN):
+            rule = "first-party"
+        else:
+            rule = next((pattern for pattern, regex in self._block_patterns if regex.match(host)), None)
+        self._host_rules[host] = rule
+        return rule
+    
+    def decide(self, url: str, resource_type: str):
+        """
+        判断请求是否拦截
+        
+        Args:
+            url: 请求URL
+            resource_type: Playwright的资源类型（document、xhr、fetch、image……）
+            
+        Returns:
+            str: 拦截原因（"host:<规则>" 或 "type:<资源类型>"），放行返回None
+        """
+        try:
+            parsed = urlparse(url)
+        except Exception:
+            return None
+        if parsed.scheme not in ("http", "https"):
+            return None
+        if parsed.path.lower().endswith(".svg"):
+            return None
+        rule = self._host_rule((parsed.hostname or "").lower())
+        if rule == "allow":
+            return None
+        if rule == "first-party" and resource_type in ("document", "xhr", "fetch"):
+            return None
+        if rule and rule != "first-party":
+            return f"host:{rule}"
+        if resource_type in self.block_types:
+            return f"type:{resource_type}"
+        return None
+    
+    async def handle(self, route):
+        """context.route 的回调"""
+        request = route.request
+        resource_type = request.resource_type
+        reason = self.decide(request.url, resource_type)
+        if reason is None:
+            self.allowed += 1
+            await route.continue_()
+            return
+        self.blocked += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        if reason.startswith("host:"):
+            self.blocked_by_host[reason[5:]] = self.blocked_by_host.get(reason[5:], 0) + 1
+        self.estimated_bytes_saved += self.estimate_size(resource_type)
+        await route.abort("blockedbyclient")
+    
+    def observe_response(self, resource_type: str, content_length):
+        """记录放行响应的大小（Content-Length），用于估算同类被拦截资源的大小"""
+        try:
+            size = int(content_length)
+        except (TypeError, ValueError):
+            return
+        total, count = self._observed_sizes.get(resource_type, (0, 0))
+        self._observed_sizes[resource_type] = (total + size, count + 1)
+    
+    def estimate_size(self, resource_type: str) -> int:
+        """估算某类资源的平均大小（优先使用实际观察到的平均值）"""
+        total, count = self._observed_sizes.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return RESOURCE_SIZE_ESTIMATES.get(resource_type, RESOURCE_SIZE_ESTIMATES["other"])
+    
+    def summary(self) -> str:
+        """拦截统计摘要"""
+        total = self.allowed + self.blocked
+        by_type = "，".join(f"{key} {value}" for key, value in sorted(self.blocked_by_type.items(), key=lambda item: -item[1]))
+        return (f"共 {total} 个请求，拦截 {self.blocked} 个（{by_type or '无'}），"
+                f"估计节省 {self.estimated_bytes_saved / 1024 / 1024:.1f} MB")
+
+
+class SvgResponseCache:
+    """
+    SVG响应缓存 - 保存浏览器自身网络流量中已经加载的SVG内容（按URL索引，超出容量时淘汰最久未使用的条目）
+    
+    提取SVG时优先从这里读取，避免再通过 context.request 重复下载同一个文件
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_SVG_CACHE_BYTES):
+        """
+        初始化缓存
+        
+        Args:
+            max_bytes: 缓存的最大容量（按字符数估算），默认256MB
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # url -> SVG文本
+        self._validators = {}  # url -> 该响应的 {"etag", "last_modified", "fingerprint"}（与内容一起淘汰）
+        self._size = 0
+        self._pending = {}  # url -> asyncio.Future，响应头已到达但响应体还在读取中
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(url: str) -> str:
+        """缓存key：去除URL中的fragment"""
+        return url.split('#', 1)[0] if url else url
+    
+    @staticmethod
+    def is_svg_response(url: str, content_type: str = "") -> bool:
+        """
+        判断响应是否是SVG
+        
+        Args:
+            url: 响应URL
+            content_type: 响应的Content-Type头
+            
+        Returns:
+            bool: 是SVG返回True
+        """
+        try:
+            path = urlparse(url).path.lower()
+        except Exception:
+            return False
+        return path.endswith('.svg') or 'image/svg+xml' in (content_type or '').lower()
+    
+    def begin(self, url: str):
+        """标记某个URL的响应体正在读取"""
+        key = self._key(url)
+        if key not in self._pending:
+            self._pending[key] = asyncio.get_running_loop().create_future()
+    
+    def put(self, url: str, content: str, validators: dict = None):
+        """
+        保存SVG响应内容
+        
+        Args:
+            url: 响应URL
+            content: 响应体文本
+            validators: 该响应的 {"etag", "last_modified", "fingerprint"}，采集保存成功后记录到状态存储
+        """
+        key = self._key(url)
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._validators.pop(key, None)
+        if content and len(content) <= self.max_bytes:
+            self._entries[key] = content
+            if validators:
+                self._validators[key] = validators
+            self._size += len(content)
+            # 超出容量时淘汰最久未使用的条目
+            while self._size > self.max_bytes and self._entries:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._validators.pop(evicted_key, None)
+                self._size -= len(evicted)
+        future = self._pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(content)
+    
+    def fail(self, url: str):
+        """标记某个URL的响应体读取失败"""
+        future = self._pending.pop(self._key(url), None)
+        if future is not None and not future.done():
+            future.set_result(None)
+    
+    def get(self, url: str):
+        """
+        读取已缓存的SVG内容
+        
+        Args:
+            url: SVG URL
+            
+        Returns:
+            str: SVG内容，未缓存返回None
+        """
+        key = self._key(url)
+        content = self._entries.get(key)
+        if content is not None:
+            self._entries.move_to_end(key)
+        return content
+    
+    def validators(self, url: str):
+        """
+        读取已缓存响应的 ETag / Last-Modified 和内容指纹
+        
+        Args:
+            url: SVG URL
+            
+        Returns:
+            dict: {"etag", "last_modified", "fingerprint"}，未缓存时返回None
+        """
+        return self._validators.get(self._key(url))
+    
+    async def wait_for(self, url: str, timeout: float = 5.0):
+        """
+        读取SVG内容；如果响应体正在读取中，最多等待timeout秒
+        
+        Args:
+            url: SVG URL
+            timeout: 等待正在读取的响应体的最长时间（秒）
+            
+        Returns:
+            str: SVG内容，未捕获到返回None
+        """
+        content = self.get(url)
+        if content is None:
+            future = self._pending.get(self._key(url))
+            if future is not None:
+                try:
+                    content = await asyncio.wait_for(asyncio.shield(future), timeout)
+                except asyncio.TimeoutError:
+                    content = None
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return content
+    
+    def clear(self):
+        """清空缓存（浏览器上下文重启时调用，旧上下文的响应不再有用）"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
+        self._entries.clear()
+        self._validators.clear()
+        self._size = 0
+    
+    @property
+    def size(self) -> int:
+        """当前缓存内容的总大小"""
+        return self._size
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+def content_digest(data) -> str:
+    """
+    计算内容摘要（BLAKE2b，128位）- 采集状态中的数据哈希、SVG指纹和blob id都使用这一种摘要
+    
+    Args:
+        data: 内容（str按UTF-8编码，或bytes）
+        
+    Returns:
+        str: 摘要（32位十六进制）
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def data_digest(obj) -> str:
+    """
+    计算结构化数据的摘要（按键排序的JSON，再计算 content_digest）
+    
+    Args:
+        obj: 可以JSON序列化的数据
+        
+    Returns:
+        str: 摘要（32位十六进制）
+    """
+    return content_digest(json.dumps(obj, sort_keys=True, ensure_ascii=False))
+
+
+class SvgFingerprint:
+    """
+    SVG内容指纹（BLAKE2b，128位）- 可以分块更新，下载时边接收边计算，不需要再完整遍历一次内容
+    
+    计算前规范化（见 normalize）：去掉开头的UTF-8 BOM和所有回车符，换行方式（CRLF/LF）不同的相同内容得到相同指纹。
+    SvgBlobStore 使用同一规范化和指纹作为blob id，同一SVG在各处得到相同的标识
+    """
+    
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._started = False
+    
+    @staticmethod
+    def normalize(markup: str) -> str:
+        """
+        规范化SVG文本（与分块计算指纹时的处理相同）
+        
+        Args:
+            markup: SVG文本
+            
+        Returns:
+            str: 去掉开头BOM和所有回车符后的文本
+        """
+        markup = markup or ""
+        if markup.startswith('\ufeff'):
+            markup = markup[1:]
+        return markup.replace('\r', '')
+    
+    def update(self, chunk: bytes):
+        """加入一块内容（按接收顺序调用）"""
+        if not self._started:
+            if not chunk:
+                return
+            if chunk.startswith(codecs.BOM_UTF8):
+                chunk = chunk[len(codecs.BOM_UTF8):]
+            self._started = True
+        self._hash.update(chunk.replace(b"\r", b""))
+    
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+    
+    @classmethod
+    def of(cls, content) -> str:
+        """
+        计算完整内容的指纹
+        
+        Args:
+            content: SVG内容（str按UTF-8编码，或bytes）
+            
+        Returns:
+            str: 指纹（32位十六进制）
+        """
+        fingerprint = cls()
+        fingerprint.update(content.encode("utf-8") if isinstance(content, str) else content)
+        return fingerprint.hexdigest()
+
+
+class TokenBucket:
+    """令牌桶限速 - 平均每秒 rate 个请求，最多允许 burst 个请求的突发"""
+    
+    def __init__(self, rate: float, burst: int):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate: 每秒补充的令牌数（<=0 表示不限速）
+            burst: 令牌桶容量
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+    
+    async def acquire(self) -> float:
+        """
+        取一个令牌，令牌不足时等待
+        
+        Returns:
+            float: 等待的时间（秒）
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return waited
+            delay = (1 - self._tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+class SvgDownloadClient:
+    """
+    SVG下载客户端 - 浏览器未捕获到SVG响应时直接下载，全程异步，不阻塞事件循环
+    
+    - 安装了 aiohttp 时使用独立的连接池（keep-alive，复用到 data.hanghangcha.com 的连接），
+      cookies 定期从浏览器上下文同步（context.cookies()）；未安装时使用 context.request（同样异步，由浏览器复用连接和cookies）
+    - 每个域名一个令牌桶限速，全局信号量限制同时进行的下载数
+    - 连接错误、超时、429和5xx按指数退避重试（有 Retry-After 时按其等待），401/403时重新同步cookies后重试
+    - 下载成功时返回响应的 ETag / Last-Modified 和内容指纹（接收时流式计算，见 SvgFingerprint），
+      由调用方在采集保存成功后记录；重新检查时用记录的值发送条件请求，内容未变化时只传输响应头（304）
+    """
+    
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    
+    def __init__(self, concurrency=4, rate=4.0, burst=8, retries=3, timeout=15.0,
+                 backoff=0.5, max_backoff=10.0, cookie_refresh_interval=60.0):
+        """
+        初始化下载客户端
+        
+        Args:
+            concurrency: 同时进行的下载数上限（也是aiohttp连接池大小）
+            rate: 每个域名每秒的平均请求数（<=0 表示不限速）
+            burst: 每个域名允许的突发请求数
+            retries: 失败后的最大重试次数
+            timeout: 单次请求超时（秒）
+            backoff: 第一次重试前的等待时间（秒），之后每次翻倍
+            max_backoff: 重试等待时间上限（秒，Retry-After 也按此截断）
+            cookie_refresh_interval: 从浏览器上下文重新同步cookies的间隔（秒）
+        """
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cookie_refresh_interval = cookie_refresh_interval
+        self._buckets = {}  # 域名 -> TokenBucket
+        self._semaphore = None
+        self._session = None
+        self._aiohttp = None
+        self._cookies = []
+        self._cookie_context = None
+        self._cookies_synced = 0.0
+        self._user_agent = None
+        self.in_flight = 0
+        self.downloads = 0
+        self.retried = 0
+        self.not_modified = 0
+        self.throttled_seconds = 0.0
+    
+    @classmethod
+    def from_profile(cls, profile: dict):
+        """根据性能配置创建下载客户端"""
+        return cls(
+            concurrency=profile.get("download_concurrency") or 4,
+            rate=profile.get("download_rate") or 0,
+            burst=profile.get("download_burst") or 1,
+            retries=profile.get("download_retries") or 0,
+        )
+    
+    @staticmethod
+    def pooling_available() -> bool:
+        """是否安装了aiohttp（未安装时不使用独立连接池，改用 context.request 下载）"""
+        return importlib.util.find_spec("aiohttp") is not None
+    
+    @property
+    def backend(self) -> str:
+        """当前使用的下载方式"""
+        return "aiohttp" if self._session is not None else "context.request"
+    
+    def _get_session(self):
+        """获取aiohttp会话（首次调用时创建），未安装aiohttp返回None"""
+        if self._session is None and self._aiohttp is None:
+            try:
+                import aiohttp
+            except ImportError:
+                self._aiohttp = False
+                logger.debug("[下载] 未安装aiohttp，使用 context.request 下载")
+                return None
+            self._aiohttp = aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                cookie_jar=aiohttp.DummyCookieJar(),  # cookies 以浏览器上下文为准，每次请求时设置
+            )
+        return self._session
+    
+    async def _sync_cookies(self, context, force=False):
+        """
+        从浏览器上下文同步cookies和User-Agent（上下文变化、超过同步间隔或force时才重新读取）
+        
+        Args:
+            context: 浏览器上下文对象
+            force: 是否强制同步（如收到401/403时）
+        """
+        now = time.monotonic()
+        if not force and context is self._cookie_context and now - self._cookies_synced < self.cookie_refresh_interval:
+            return
+        try:
+            self._cookies = await context.cookies()
+        except Exception as e:
+            logger.debug("[下载] 读取浏览器cookies失败: %s", e)
+        if context is not self._cookie_context:
+            self._user_agent = None
+            for page in context.pages:
+                try:
+                    self._user_agent = await page.evaluate("navigator.userAgent")
+                    break
+                except Exception:
+                    continue
+        self._cookie_context = context
+        self._cookies_synced = now
+    
+    def _cookie_header(self, url: str) -> str:
+        """生成请求URL适用的Cookie头（按域名和路径匹配浏览器cookies）"""
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        path = parsed.path or "/"
+        pairs = []
+        for cookie in self._cookies:
+            domain = (cookie.get("domain") or "").lower().lstrip(".")
+            if not domain or not (host == domain or host.endswith("." + domain)):
+                continue
+            if not path.startswith(cookie.get("path") or "/"):
+                continue
+            if cookie.get("secure") and parsed.scheme != "https":
+                continue
+            pairs.append(f"{cookie['name']}={cookie['value']}")
+        return "; ".join(pairs)
+    
+    @staticmethod
+    def _retry_after(headers: dict) -> float:
+        """解析 Retry-After 头（秒数），没有或无法解析返回None"""
+        value = headers.get("retry-after")
+        try:
+            return max(0.0, float(value)) if value else None
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _conditional_headers(validators: dict) -> dict:
+        """根据上次采集记录的 ETag / Last-Modified 生成条件请求头（没有记录时返回空字典）"""
+        headers = {}
+        if validators and validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators and validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+    
+    async def _request(self, context, url: str, extra_headers: dict) -> tuple:
+        """
+        发送一次GET请求（接收响应体的同时计算内容指纹）
+        
+        Returns:
+            tuple: (状态码, 响应文本, 响应头（键为小写）, 内容指纹)
+        """
+        fingerprint = SvgFingerprint()
+        session = self._get_session()
+        if session is None:
+            response = await context.request.get(url, headers=extra_headers or None, timeout=self.timeout * 1000)
+            body = await response.body()
+            fingerprint.update(body)
+            metrics_count("bytes_downloaded", len(body))
+            headers = {name.lower(): value for name, value in response.headers.items()}
+            return response.status, body.decode("utf-8", errors="replace"), headers, fingerprint.hexdigest()
+        
+        await self._sync_cookies(context)
+        headers = dict(extra_headers)
+        cookie = self._cookie_header(url)
+        if cookie:
+            headers["Cookie"] = cookie
+        if self._user_agent:
+            headers["User-Agent"] = self._user_agent
+        async with session.get(url, headers=headers) as response:
+            chunks = []
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                fingerprint.update(chunk)
+                chunks.append(chunk)
+            body = b"".join(chunks)
+            metrics_count("bytes_downloaded", len(body))
+            text = body.decode(response.charset or "utf-8", errors="replace")
+            headers = {name.lower(): value for name, value in response.headers.items()}
+            return response.status, text, headers, fingerprint.hexdigest()
+    
+    async def fetch(self, context, url: str, validators: dict = None):
+        """
+        下载URL内容（限速、限制并发，失败时重试）
+        
+        Args:
+            context: 浏览器上下文对象（提供cookies；未安装aiohttp时用于发送请求）
+            url: 要下载的URL
+            validators: 上次采集记录的 {"etag", "last_modified"}，提供时携带 If-None-Match / If-Modified-Since，
+                内容未变化时服务器返回304，不传输响应体
+            
+        Returns:
+            tuple: (200, 响应文本, {"etag", "last_modified", "fingerprint"}) 或 (304, None, None)，下载失败返回None
+        """
+        host = urlparse(url).hostname or ""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        extra_headers = self._conditional_headers(validators) if validators else {}
+        
+        failure = None
+        for attempt in range(self.retries + 1):
+            self.throttled_seconds += await bucket.acquire()
+            headers = {}
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    status, text, headers, fingerprint = await self._request(context, url, extra_headers)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    failure = f"{type(e).__name__}: {e}"
+                    status = None
+                finally:
+                    self.in_flight -= 1
+            if status == 200:
+                self.downloads += 1
+                return 200, text, {
+                    "etag": headers.get("etag"),
+                    "last_modified": headers.get("last-modified"),
+                    "fingerprint": fingerprint,
+                }
+            if status == 304 and extra_headers:
+                self.not_modified += 1
+                metrics_count("not_modified")
+                return 304, None, None
+            if status is not None:
+                failure = f"HTTP状态码 {status}"
+                if status in (401, 403) and self._session is not None:
+                    # cookies可能已过期：从浏览器重新同步后重试
+                    await self._sync_cookies(context, force=True)
+                elif status not in self.RETRY_STATUSES:
+                    break
+            if attempt == self.retries:
+                break
+            retry_after = self._retry_after(headers)
+            # 服务器要求的等待时间同样不超过 max_backoff，避免异常的 Retry-After 长时间占住采集任务
+            delay = min(self.max_backoff, retry_after if retry_after is not None else self.backoff * 2 ** attempt)
+            self.retried += 1
+            metrics_count("download_retries")
+            logger.debug("[下载] %s，%.1f 秒后重试（第 %s 次）: %s", failure, delay, attempt + 1, url)
+            await asyncio.sleep(delay)
+        logger.warning("[下载失败] %s: %s", failure, url)
+        return None
+    
+    async def close(self):
+        """关闭aiohttp连接池"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._aiohttp = None
+
+# 项目列表接口字段别名（接口字段名 -> 项目列表记录字段），按顺序取第一个有值的字段
+PROJECT_API_FIELD_ALIASES = {
+    "project_name": ("project_name", "projectName", "shortName", "short_name", "productName", "name"),
+    "business_description": ("business_description", "businessDescription", "brief", "intro", "slogan", "description", "desc"),
+    "region": ("region", "area", "province", "city", "location"),
+    "round": ("round", "roundName", "financingRound", "latestRound", "investRound", "stage"),
+    "time": ("time", "financingTime", "financingDate", "investDate", "eventDate", "date"),
+    "amount": ("amount", "amountStr", "financingAmount", "investAmount", "money"),
+    "investors": ("investors", "investorNames", "investorName", "investor", "institutions"),
+    "project_url": ("project_url", "projectUrl", "detailUrl", "url", "link"),
+}
+
+# 项目ID字段（接口未返回项目链接时，用于拼接product-details页面URL）
+PROJECT_API_ID_KEYS = ("projectId", "productId", "project_id", "product_id", "id")
+
+# 接口中表示总记录数的字段
+PROJECT_API_TOTAL_KEYS = ("total", "totalCount", "total_count", "totalNum", "totalSize")
+
+# 由项目ID拼接项目详情页URL的模板
+PROJECT_DETAIL_URL_TEMPLATE = "https://www.hanghangcha.com/product-details?id={id}"
+
+
+# 项目列表记录的列：页面内按该顺序把每行编码为数组（避免每行重复传输字段名），Python端再解码为记录
+PROJECT_ROW_COLUMNS = ("project_name", "business_description", "region", "round", "time", "amount", "investors", "project_url")
+
+# 表格行解析函数（页面内JS，表格提取和流式采集共用）：按 PROJECT_ROW_COLUMNS 的顺序返回数组，不完整的行返回null
+PROJECT_ROW_PARSER_JS = """
+(row) => {
+    const cells = row.querySelectorAll('td');
+    if (cells.length < 7) {
+        return null; // 跳过不完整的行
+    }
+    const text = (cell) => cell ? (cell.textContent || '').trim() : '';
+    
+    // 提取项目名称
+    const nameLink = cells[0].querySelector('a');
+    const projectName = nameLink ? (nameLink.textContent || nameLink.getAttribute('title') || '').trim() : '';
+    if (!projectName) {
+        return null;
+    }
+    
+    // 提取链接
+    let projectUrl = '';
+    if (nameLink) {
+        // 获取href属性
+        projectUrl = nameLink.getAttribute('href') || '';
+        // 如果是相对路径，转换为绝对路径
+        if (projectUrl && !projectUrl.startsWith('http')) {
+            if (projectUrl.startsWith('/')) {
+                projectUrl = 'https://www.hanghangcha.com' + projectUrl;
+            } else {
+                projectUrl = 'https://www.hanghangcha.com/' + projectUrl;
+            }
+        }
+        // 如果还是没有，尝试从其他属性获取
+        if (!projectUrl) {
+            projectUrl = nameLink.getAttribute('data-url') || nameLink.getAttribute('data-href') || '';
+        }
+    }
+    
+    return [
+        projectName,
+        text(cells[1]),  // 业务简述
+        text(cells[2]),  // 项目地区
+        text(cells[3]),  // 轮次
+        text(cells[4]),  // 时间
+        text(cells[5]),  // 金额
+        text(cells[6]),  // 投资方
+        projectUrl
+    ];
+}
+"""
+
+
+def decode_row_tuples(payload) -> list:
+    """
+    将页面内按列编码的提取结果解码为记录列表
+    
+    Args:
+        payload: {"columns": [列名, ...], "rows": [[值, ...], ...]}；已是记录列表时原样返回
+        
+    Returns:
+        list: 记录列表
+    """
+    if not payload:
+        return []
+    if isinstance(payload, list):
+        return payload
+    columns = payload.get("columns") or []
+    return [dict(zip(columns, row)) for row in payload.get("rows") or []]
+
+
+class ProjectListCapture:
+    """
+    chain-info页面项目列表接口数据的拦截结果
+    
+    表格的每一页接口数据到达时解码为与表格提取相同的记录结构
+    （project_name、round、amount、investors、project_url……），按项目链接去重合并
+    """
+    
+    def __init__(self):
+        self.records = OrderedDict()  # 去重key -> 项目记录
+        self.total = None  # 接口返回的总记录数（如果有）
+        self.responses = 0  # 已合并的接口响应数
+        self._updated = asyncio.Event()
+    
+    @staticmethod
+    def _pick(item: dict, keys):
+        """按别名顺序取第一个非空字段值"""
+        for key in keys:
+            value = item.get(key)
+            if value not in (None, "", [], {}):
+                return value
+        return None
+    
+    @staticmethod
+    def _to_text(value) -> str:
+        """将接口字段值转换为与表格单元格一致的文本"""
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            parts = []
+            for part in value:
+                if isinstance(part, dict):
+                    part = ProjectListCapture._pick(part, ("name", "shortName", "investorName", "title"))
+                text = ProjectListCapture._to_text(part)
+                if text:
+                    parts.append(text)
+            return "、".join(parts)
+        if isinstance(value, dict):
+            return ProjectListCapture._to_text(ProjectListCapture._pick(value, ("name", "shortName", "title")))
+        return str(value).strip()
+    
+    @classmethod
+    def decode_record(cls, item: dict):
+        """
+        将接口返回的一条项目数据解码为项目列表记录
+        
+        Args:
+            item: 接口返回的项目数据
+            
+        Returns:
+            dict: 项目列表记录，缺少项目名称时返回None
+        """
+        record = {}
+        for field, aliases in PROJECT_API_FIELD_ALIASES.items():
+            record[field] = cls._to_text(cls._pick(item, aliases))
+        if not record["project_name"]:
+            return None
+        
+        project_url = record["project_url"]
+        if project_url and not project_url.startswith("http"):
+            project_url = "https://www.hanghangcha.com" + (project_url if project_url.startswith("/") else "/" + project_url)
+        if not project_url:
+            project_id = cls._pick(item, PROJECT_API_ID_KEYS)
+            if project_id is not None:
+                project_url = PROJECT_DETAIL_URL_TEMPLATE.format(id=project_id)
+        record["project_url"] = project_url or ""
+        return record
+    
+    @classmethod
+    def find_records(cls, payload, depth: int = 0):
+        """
+        在接口JSON中查找项目记录列表（列表中的大部分元素包含项目名称字段）
+        
+        Args:
+            payload: 接口返回的JSON数据
+            depth: 当前递归深度
+            
+        Returns:
+            tuple: (项目数据列表, 总记录数)，未找到返回 (None, None)
+        """
+        if depth > 4:
+            return None, None
+        if isinstance(payload, list):
+            items = [item for item in payload if isinstance(item, dict)]
+            if items:
+                name_keys = PROJECT_API_FIELD_ALIASES["project_name"]
+                matched = sum(1 for item in items if cls._pick(item, name_keys) is not None)
+                if matched * 2 > len(items):
+                    return items, None
+            return None, None
+        if isinstance(payload, dict):
+            total = cls._pick(payload, PROJECT_API_TOTAL_KEYS)
+            for value in payload.values():
+                if isinstance(value, (list, dict)):
+                    records, inner_total = cls.find_records(value, depth + 1)
+                    if records is not None:
+                        total = inner_total if inner_total is not None else total
+                        try:
+                            total = int(total) if total is not None else None
+                        except (TypeError, ValueError):
+                            total = None
+                        return records, total
+        return None, None
+    
+    def merge(self, payload) -> int:
+        """
+        合并一页接口数据
+        
+        Args:
+            payload: 接口返回的JSON数据
+            
+        Returns:
+            int: 新增的记录数（不是项目列表数据时返回-1）
+        """
+        items, total = self.find_records(payload)
+        if items is None:
+            return -1
+        added = 0
+        for item in items:
+            record = self.decode_record(item)
+            if not record:
+                continue
+            key = record["project_url"] or record["project_name"]
+            if key not in self.records:
+                added += 1
+            self.records[key] = record
+        if total is not None:
+            self.total = total
+        self.responses += 1
+        self._updated.set()
+        return added
+    
+    def clear_update(self):
+        """清除更新标记（在触发下一页请求之前调用）"""
+        self._updated.clear()
+    
+    async def wait_for_update(self, timeout: float) -> bool:
+        """
+        等待 clear_update() 之后的下一页接口数据到达
+        
+        Args:
+            timeout: 最长等待时间（秒）
+            
+        Returns:
+            bool: 有新数据到达返回True，超时返回False
+        """
+        try:
+            await asyncio.wait_for(self._updated.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    def matches_table(self, rendered_rows: list, min_ratio: float = 0.8) -> bool:
+        """
+        检查接口数据是否就是页面表格显示的项目列表（页面上任何包含 name 字段列表的JSON接口都可能被误认为项目列表）
+        
+        Args:
+            rendered_rows: 页面表格当前显示的行 [(项目名称, 项目链接), ...]
+            min_ratio: 表格中的项目名称至少有多少比例出现在接口数据中
+            
+        Returns:
+            bool: 表格项目名称大部分出现在接口数据中，且接口数据的项目链接与表格一致时返回True；表格为空返回False
+        """
+        if not rendered_rows:
+            return False
+        urls_by_name = {record["project_name"]: record["project_url"] for record in self.records.values()}
+        matched = [(name, url) for name, url in rendered_rows if name in urls_by_name]
+        if len(matched) < max(1, math.ceil(len(rendered_rows) * min_ratio)):
+            return False
+        # 接口数据中没有链接时按ID猜测的详情页链接，需要与表格中的链接一致
+        compared = [(urls_by_name[name], url) for name, url in matched if url]
+        mismatched = sum(1 for api_url, url in compared if api_url.rstrip("/") != url.rstrip("/"))
+        return mismatched * 2 <= len(compared)
+    
+    @property
+    def is_complete(self) -> bool:
+        """接口返回了总记录数并且已全部拿到"""
+        return self.total is not None and len(self.records) >= self.total
+    
+    def to_list(self) -> list:
+        """
+        转换为项目列表（按到达顺序编号 row_index）
+        
+        Returns:
+            list: 项目列表
+        """
+        project_list = []
+        for index, record in enumerate(self.records.values(), 1):
+            item = dict(record)
+            item["row_index"] = index
+            project_list.append(item)
+        return project_list
+
+
+class ChainFileIndex:
+    """
+    已采集产业链索引（产业链文件夹名 -> 文件夹中的 .txt/.svg/manifest.json 文件名集合）
+    
+    启动时用一次 os.scandir 遍历输出目录建立索引，之后由 _save_svg_data 在写入文件时更新，
+    判断产业链是否已采集只查内存，不再每次对文件夹执行 glob；
+    安装了 watchdog 时可监听输出目录，同步其他进程写入的文件
+    """
+    
+    INDEXED_SUFFIXES = (".txt", ".svg")
+    INDEXED_NAMES = ("manifest.json",)
+    
+    @classmethod
+    def is_indexed(cls, name: str) -> bool:
+        """判断文件是否计入索引（.txt/.svg 快照文件或内容寻址存储的manifest）"""
+        name = name.lower()
+        return name.endswith(cls.INDEXED_SUFFIXES) or name in cls.INDEXED_NAMES
+    
+    def __init__(self, root):
+        """
+        初始化索引
+        
+        Args:
+            root: SVG输出目录（每个产业链一个子文件夹）
+        """
+        self.root = Path(root)
+        self._abs_root = Path(os.path.abspath(self.root))  # 监听事件给出的是绝对路径
+        self._chains = {}  # 产业链文件夹名 -> 文件名集合
+        self._lock = threading.Lock()  # 监听线程和事件循环都会修改索引
+        self._observer = None
+    
+    def build(self):
+        """
+        遍历输出目录建立索引（跳过以"."开头的目录）
+        
+        Returns:
+            int: 索引到的文件数
+        """
+        chains = {}
+        file_count = 0
+        try:
+            with os.scandir(self.root) as chain_entries:
+                for chain_entry in chain_entries:
+                    if chain_entry.name.startswith('.') or not chain_entry.is_dir():
+                        continue
+                    names = set()
+                    try:
+                        with os.scandir(chain_entry.path) as file_entries:
+                            for file_entry in file_entries:
+                                if self.is_indexed(file_entry.name) and file_entry.is_file():
+                                    names.add(file_entry.name)
+                    except OSError:
+                        continue
+                    if names:
+                        chains[chain_entry.name] = names
+                        file_count += len(names)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._chains = chains
+        return file_count
+    
+    def _split(self, path):
+        """把文件路径拆成 (产业链文件夹名, 文件名)，不是输出目录下一级文件夹中需要索引的文件时返回None"""
+        path = Path(os.path.abspath(path))
+        if not self.is_indexed(path.name):
+            return None
+        try:
+            relative = path.relative_to(self._abs_root)
+        except ValueError:
+            return None
+        if len(relative.parts) != 2 or relative.parts[0].startswith('.'):
+            return None
+        return relative.parts[0], relative.parts[1]
+    
+    def add(self, path):
+        """记录新写入的文件"""
+        parts = self._split(path)
+        if parts:
+            with self._lock:
+                self._chains.setdefault(parts[0], set()).add(parts[1])
+    
+    def discard(self, path):
+        """移除已删除的文件"""
+        parts = self._split(path)
+        if parts:
+            with self._lock:
+                names = self._chains.get(parts[0])
+                if names is not None:
+                    names.discard(parts[1])
+                    if not names:
+                        del self._chains[parts[0]]
+    
+    def files(self, chain_dir_name: str) -> list:
+        """
+        获取产业链文件夹中已索引的文件名
+        
+        Args:
+            chain_dir_name: 清理后的产业链文件夹名
+            
+        Returns:
+            list: 文件名列表（按名称排序）
+        """
+        with self._lock:
+            return sorted(self._chains.get(chain_dir_name, ()))
+    
+    def has_files(self, chain_dir_name: str) -> bool:
+        """判断产业链文件夹中是否有已索引的文件"""
+        with self._lock:
+            return bool(self._chains.get(chain_dir_name))
+    
+    def chain_names(self) -> list:
+        """获取有文件的产业链文件夹名列表"""
+        with self._lock:
+            return list(self._chains)
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._chains)
+    
+    def start_watching(self) -> bool:
+        """
+        监听输出目录的文件变化（需要安装 watchdog，Linux上基于inotify）
+        
+        Returns:
+            bool: 监听已启动返回True，未安装 watchdog 或启动失败返回False
+        """
+        if self._observer is not None:
+            return True
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return False
+        
+        index = self
+        
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    index.add(event.src_path)
+            
+            def on_deleted(self, event):
+                if not event.is_directory:
+                    index.discard(event.src_path)
+            
+            def on_moved(self, event):
+                if not event.is_directory:
+                    index.discard(event.src_path)
+                    index.add(event.dest_path)
+        
+        try:
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(_Handler(), str(self.root), recursive=True)
+            observer.start()
+        except Exception as e:
+            logger.warning("[产业链索引] 启动目录监听失败: %s", e)
+            return False
+        self._observer = observer
+        return True
+    
+    def stop_watching(self):
+        """停止监听输出目录"""
+        if self._observer is None:
+            return
+        try:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+        except Exception:
+            pass
+        self._observer = None
+
+
+class AtomicFileWriter:
+    """
+    后台文件写入器 - 在独立线程中完成序列化和磁盘写入，不阻塞事件循环
+    
+    每个文件先写入同目录下的临时文件，再用 os.replace 原子替换，读取方不会看到写了一半的文件；
+    同一路径尚未写入时再次提交，只保留最新内容（例如同一个chain-info文件被反复覆盖）
+    
+    每次提交返回一个 concurrent.futures.Future，写入完成后结果为写入的字节数，写入失败时为对应异常
+    （被合并的提交随最终那次写入一起完成）
+    """
+    
+    def __init__(self):
+        self._pending = OrderedDict()  # path -> (render, encoding, newline, 所属采集的CollectionTrace, [Future, ...])
+        self._cond = threading.Condition()
+        self._writing = False
+        self._closed = False
+        self._thread = None
+        self.written = 0
+        self.bytes_written = 0
+        self.coalesced = 0
+        self.failed = 0
+    
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-writer", daemon=True)
+            self._thread.start()
+    
+    def submit(self, path, render, encoding="utf-8", newline=None):
+        """
+        提交一次写入
+        
+        Args:
+            path: 目标文件路径
+            render: 无参函数，在写入线程中调用，返回要写入的文本
+            encoding: 文件编码
+            newline: 传给 open() 的 newline 参数（CSV使用 ''）
+            
+        Returns:
+            concurrent.futures.Future: 写入完成的结果
+        """
+        path = Path(path)
+        future = concurrent.futures.Future()
+        # 记录写入所属的采集，写入完成后计入该采集的 bytes_written
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.begin_write(future)
+        with self._cond:
+            if self._closed:
+                if trace is not None:
+                    trace.end_write(0)
+                raise RuntimeError("文件写入器已关闭")
+            futures = [future]
+            if path in self._pending:
+                replaced = self._pending.pop(path)
+                if replaced[3] is not None:
+                    replaced[3].end_write(0)
+                # 被合并的提交以最终写入的结果完成
+                futures = replaced[4] + futures
+                self.coalesced += 1
+            self._pending[path] = (render, encoding, newline, trace, futures)
+            self._ensure_thread()
+            self._cond.notify()
+        return future
+    
+    def write_text(self, path, text: str, encoding="utf-8"):
+        """提交文本写入"""
+        return self.submit(path, lambda: text, encoding)
+    
+    def write_json(self, path, data):
+        """提交JSON写入（json.dumps 在写入线程中执行）"""
+        return self.submit(path, lambda: json.dumps(data, ensure_ascii=False, indent=2))
+    
+    def write_csv(self, path, fieldnames: list, rows: list, encoding="utf-8-sig"):
+        """提交CSV写入（只写入fieldnames中定义的字段）"""
+        def render():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+            return buffer.getvalue()
+        return self.submit(path, render, encoding, newline="")
+    
+    @staticmethod
+    def _write_atomic(path: Path, content: str, encoding: str, newline) -> int:
+        """写入临时文件后原子替换目标文件，返回写入的字节数"""
+        path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding=encoding, newline=newline) as f:
+                f.write(content)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+            os.replace(tmp_path, path)
+            return size
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                path, (render, encoding, newline, trace, futures) = self._pending.popitem(last=False)
+                self._writing = True
+            size = 0
+            error = None
+            try:
+                size = self._write_atomic(path, render(), encoding, newline)
+                self.written += 1
+                self.bytes_written += size
+            except Exception as e:
+                error = e
+                self.failed += 1
+                logger.error("[写入错误] %s: %s", path, e)
+            finally:
+                if trace is not None:
+                    trace.end_write(size)
+                for future in futures:
+                    if error is None:
+                        future.set_result(size)
+                    else:
+                        future.set_exception(error)
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+    
+    @property
+    def pending_count(self) -> int:
+        """等待写入的文件数"""
+        with self._cond:
+            return len(self._pending) + (1 if self._writing else 0)
+    
+    def flush(self, timeout=None) -> bool:
+        """
+        等待所有已提交的写入完成
+        
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            bool: 全部写入完成返回True，超时返回False
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+    
+    def close(self, timeout=None):
+        """写入剩余文件后停止写入线程"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class SvgBlobStore:
+    """
+    内容寻址的SVG存储 - 以SVG内容的指纹（SvgFingerprint）作为blob id，相同内容只保存一份
+    
+    blob保存在输出目录下的 .blobs/<前两位>/<blob id>.svg，产业链文件夹中只保存 manifest.json，
+    记录每次采集的时间和对应的blob id（内容未变化的重复采集只更新最后采集时间）
+    """
+    
+    MANIFEST_NAME = "manifest.json"
+    
+    def __init__(self, root, file_writer, max_manifests=256):
+        """
+        初始化存储
+        
+        Args:
+            root: blob目录（通常为 output_dir / ".blobs"）
+            file_writer: AtomicFileWriter，blob和manifest都通过它在后台写入
+            max_manifests: 内存中最多缓存的manifest数，超出时淘汰最久未使用的（下次使用时从磁盘重新加载）
+        """
+        self.root = Path(root)
+        self.file_writer = file_writer
+        self.max_manifests = max(1, max_manifests)
+        self._known = set()  # 已存在或已提交写入的blob id
+        # manifest路径 -> [manifest内容, 最近一次提交写入的Future]（首次使用时从磁盘加载，按最近使用排序）
+        self._manifests = OrderedDict()
+        self.blobs_written = 0
+        self.blobs_reused = 0
+    
+    def blob_path(self, blob_id: str) -> Path:
+        """blob文件路径"""
+        return self.root / blob_id[:2] / f"{blob_id}.svg"
+    
+    def contains(self, blob_id: str) -> bool:
+        """判断blob是否已存在（包括已提交但尚未写入磁盘的）"""
+        if blob_id in self._known:
+            return True
+        if self.blob_path(blob_id).exists():
+            self._known.add(blob_id)
+            return True
+        return False
+    
+    def put(self, markup: str) -> dict:
+        """
+        保存一段SVG，内容已存在时不再写入
+        
+        Args:
+            markup: SVG文本
+            
+        Returns:
+            dict: {"blob_id", "bytes", "created"}
+        """
+        normalized = SvgFingerprint.normalize(markup)
+        data = normalized.encode('utf-8')
+        blob_id = content_digest(data)
+        created = not self.contains(blob_id)
+        if created:
+            future = self.file_writer.write_text(self.blob_path(blob_id), normalized)
+            self._known.add(blob_id)
+            # 写入失败时不再视为已存在，下次保存相同内容时重新写入
+            future.add_done_callback(lambda f, blob_id=blob_id: f.exception() and self._known.discard(blob_id))
+            self.blobs_written += 1
+        else:
+            self.blobs_reused += 1
+        return {"blob_id": blob_id, "bytes": len(data), "created": created}
+    
+    def read(self, blob_id: str) -> str:
+        """读取blob内容"""
+        with open(self.blob_path(blob_id), 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def _load_manifest(self, manifest_path: Path, chain_name: str) -> list:
+        entry = self._manifests.get(manifest_path)
+        if entry is not None:
+            self._manifests.move_to_end(manifest_path)
+            return entry
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            manifest = {"chain_name": chain_name, "snapshots": []}
+        entry = self._manifests[manifest_path] = [manifest, None]
+        return entry
+    
+    def _evict_manifests(self):
+        """淘汰最久未使用的manifest（写入尚未完成的保留，否则重新加载时会读到旧内容）"""
+        excess = len(self._manifests) - self.max_manifests
+        for path in list(self._manifests)[:-1]:
+            if excess <= 0:
+                break
+            future = self._manifests[path][1]
+            if future is None or future.done():
+                del self._manifests[path]
+                excess -= 1
+    
+    def add_snapshot(self, manifest_path, chain_name: str, blobs: list, info: dict = None) -> dict:
+        """
+        在manifest中记录一次采集
+        
+        Args:
+            manifest_path: manifest文件路径
+            chain_name: 产业链名称
+            blobs: 本次采集的blob列表，每项包含 blob_id、kind（inline/file）、bytes，以及可选的 source_url
+            info: 附加信息（如 svg_url、page_url）
+            
+        Returns:
+            dict: 本次采集对应的快照记录
+        """
+        manifest_path = Path(manifest_path)
+        entry = self._load_manifest(manifest_path, chain_name)
+        self._evict_manifests()
+        manifest = entry[0]
+        collected_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        blob_ids = [blob["blob_id"] for blob in blobs]
+        snapshots = manifest["snapshots"]
+        
+        # 内容与上一次采集相同时只更新最后采集时间
+        if snapshots and [blob["blob_id"] for blob in snapshots[-1]["blobs"]] == blob_ids:
+            snapshot = snapshots[-1]
+            snapshot["last_seen"] = collected_at
+            snapshot["times_seen"] = snapshot.get("times_seen", 1) + 1
+        else:
+            snapshot = {"collected_at": collected_at, "last_seen": collected_at, "times_seen": 1, "blobs": blobs}
+            snapshot.update(info or {})
+            snapshots.append(snapshot)
+        manifest["chain_name"] = chain_name
+        manifest["updated_at"] = collected_at
+        
+        # 写入线程序列化时manifest可能被再次修改，提交当前内容的副本
+        entry[1] = self.file_writer.write_json(manifest_path, copy.deepcopy(manifest))
+        return snapshot
+
+
+class CrawlStateStore:
+    """
+    采集状态持久化存储（嵌入式SQLite，WAL模式）
+    
+    保存已采集URL集合、页面数据哈希（含最后采集时间、内容哈希和输出路径）、chain_id -> 产业链名称映射
+    以及SVG URL的 ETag / Last-Modified 和内容指纹（用于条件请求和内容变化检测），
+    写操作先在内存中合并，由后台定期批量写入，重启后可直接加载，避免重复采集
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS collected (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            last_seen REAL NOT NULL,
+            content_hash TEXT,
+            output_path TEXT,
+            PRIMARY KEY (kind, key)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS page_hashes (
+            kind TEXT NOT NULL,
+            url TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (kind, url)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS chain_names (
+            chain_id TEXT PRIMARY KEY,
+            chain_name TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            fingerprint TEXT,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID;
+    """
+    
+    def __init__(self, db_path, flush_interval=1.0):
+        """
+        打开（或创建）状态数据库
+        
+        Args:
+            db_path: SQLite数据库文件路径
+            flush_interval: 后台批量写入的间隔（秒），默认1秒
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.flush_interval = flush_interval
+        
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(http_validators)")}
+        if "fingerprint" not in columns:
+            # 旧版本创建的表没有内容指纹列
+            self._conn.execute("ALTER TABLE http_validators ADD COLUMN fingerprint TEXT")
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+        
+        # 待写入的变更（同一条记录的多次更新在内存中合并）
+        self._pending_lock = threading.Lock()
+        self._pending_collected = {}  # (kind, key) -> (last_seen, content_hash, output_path)
+        self._pending_deleted = set()  # (kind, key)
+        self._pending_hashes = {}  # (kind, url) -> (hash, updated_at)
+        self._pending_chain_names = {}  # chain_id -> (chain_name, updated_at)
+        self._pending_validators = {}  # url -> (etag, last_modified, fingerprint, updated_at)
+    
+    def load_collected(self, kind: str) -> set:
+        """
+        加载某类页面的已采集key集合
+        
+        Args:
+            kind: 页面类型，如 "chain-detail"
+            
+        Returns:
+            set: 已采集的key集合
+        """
+        with self._db_lock:
+            rows = self._conn.execute("SELECT key FROM collected WHERE kind = ?", (kind,)).fetchall()
+        return {row[0] for row in rows}
+    
+    def load_hashes(self, kind: str) -> dict:
+        """
+        加载某类页面的数据哈希
+        
+        Args:
+            kind: 页面类型
+            
+        Returns:
+            dict: URL -> 数据哈希
+        """
+        with self._db_lock:
+            rows = self._conn.execute("SELECT url, hash FROM page_hashes WHERE kind = ?", (kind,)).fetchall()
+        return {row[0]: row[1] for row in rows}
+    
+    def load_chain_names(self) -> dict:
+        """
+        加载 chain_id -> 产业链名称映射
+        
+        Returns:
+            dict: chain_id -> (产业链名称, 更新时间)
+        """
+        with self._db_lock:
+            rows = self._conn.execute("SELECT chain_id, chain_name, updated_at FROM chain_names").fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+    
+    def load_records(self, kind: str) -> dict:
+        """
+        加载某类页面的全部采集记录（不包含尚未写入的变更）
+        
+        Args:
+            kind: 页面类型
+            
+        Returns:
+            dict: key -> {"last_seen", "content_hash", "output_path"}
+        """
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT key, last_seen, content_hash, output_path FROM collected WHERE kind = ?", (kind,)
+            ).fetchall()
+        return {row[0]: {"last_seen": row[1], "content_hash": row[2], "output_path": row[3]} for row in rows}
+    
+    def get_record(self, kind: str, key: str):
+        """
+        读取一条采集记录（包含尚未写入的变更）
+        
+        Args:
+            kind: 页面类型
+            key: 规范化URL或SVG URL
+            
+        Returns:
+            dict: {"last_seen", "content_hash", "output_path"}，不存在返回None
+        """
+        with self._pending_lock:
+            pending = self._pending_collected.get((kind, key))
+            if (kind, key) in self._pending_deleted:
+                return None
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT last_seen, content_hash, output_path FROM collected WHERE kind = ? AND key = ?",
+                (kind, key)
+            ).fetchone()
+        record = None
+        if row:
+            record = {"last_seen": row[0], "content_hash": row[1], "output_path": row[2]}
+        if pending:
+            record = record or {"last_seen": None, "content_hash": None, "output_path": None}
+            record["last_seen"] = pending[0]
+            record["content_hash"] = pending[1] or record["content_hash"]
+            record["output_path"] = pending[2] or record["output_path"]
+        return record
+    
+    def record(self, kind: str, key: str, content_hash: str = None, output_path=None):
+        """
+        记录一次采集（更新最后采集时间，可选更新内容哈希和输出路径）
+        
+        Args:
+            kind: 页面类型
+            key: 规范化URL或SVG URL
+            content_hash: 内容哈希（None表示保持原值）
+            output_path: 输出文件路径（None表示保持原值）
+        """
+        output_path = str(output_path) if output_path is not None else None
+        with self._pending_lock:
+            previous = self._pending_collected.get((kind, key))
+            if previous:
+                content_hash = content_hash or previous[1]
+                output_path = output_path or previous[2]
+            self._pending_collected[(kind, key)] = (time.time(), content_hash, output_path)
+            self._pending_deleted.discard((kind, key))
+    
+    def forget(self, kind: str, key: str):
+        """
+        删除一条采集记录
+        
+        Args:
+            kind: 页面类型
+            key: 规范化URL或SVG URL
+        """
+        with self._pending_lock:
+            self._pending_collected.pop((kind, key), None)
+            self._pending_deleted.add((kind, key))
+    
+    def record_hash(self, kind: str, url: str, data_hash: str):
+        """
+        记录页面数据哈希
+        
+        Args:
+            kind: 页面类型
+            url: 规范化URL
+            data_hash: 数据哈希
+        """
+        with self._pending_lock:
+            self._pending_hashes[(kind, url)] = (data_hash, time.time())
+    
+    def get_validators(self, url: str):
+        """
+        读取页面上次采集的SVG的 ETag / Last-Modified 和内容指纹（包含尚未写入的变更）
+        
+        Args:
+            url: chain-detail页面的规范化URL
+            
+        Returns:
+            dict: {"etag", "last_modified", "fingerprint"}，没有记录返回None
+        """
+        with self._pending_lock:
+            pending = self._pending_validators.get(url)
+        if pending:
+            return {"etag": pending[0], "last_modified": pending[1], "fingerprint": pending[2]}
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fingerprint FROM http_validators WHERE url = ?", (url,)
+            ).fetchone()
+        return {"etag": row[0], "last_modified": row[1], "fingerprint": row[2]} if row else None
+    
+    def record_validators(self, url: str, etag: str = None, last_modified: str = None, fingerprint: str = None):
+        """
+        记录页面本次采集的SVG的 ETag / Last-Modified 和内容指纹（采集保存成功后调用）
+        
+        Args:
+            url: chain-detail页面的规范化URL
+            etag: ETag响应头
+            last_modified: Last-Modified响应头
+            fingerprint: 响应内容的指纹（见 SvgFingerprint）
+        """
+        with self._pending_lock:
+            self._pending_validators[url] = (etag, last_modified, fingerprint, time.time())
+    
+    def record_chain_name(self, chain_id: str, chain_name: str, updated_at: float = None):
+        """
+        记录 chain_id 对应的产业链名称
+        
+        Args:
+            chain_id: 产业链ID
+            chain_name: 产业链名称（清理后的文件夹/文件名前缀）
+            updated_at: 更新时间，默认当前时间
+        """
+        with self._pending_lock:
+            self._pending_chain_names[chain_id] = (chain_name, updated_at or time.time())
+    
+    def replace_chain_names(self, mapping: dict):
+        """
+        用新的映射整体替换 chain_id -> 产业链名称表（重建索引时使用，立即写入）
+        
+        Args:
+            mapping: chain_id -> (产业链名称, 更新时间)
+        """
+        with self._pending_lock:
+            self._pending_chain_names = {}
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM chain_names")
+                self._conn.executemany(
+                    "INSERT INTO chain_names (chain_id, chain_name, updated_at) VALUES (?, ?, ?)",
+                    [(chain_id, name, updated_at) for chain_id, (name, updated_at) in mapping.items()]
+                )
+    
+    @property
+    def pending_count(self) -> int:
+        """尚未写入数据库的变更数"""
+        with self._pending_lock:
+            return (len(self._pending_collected) + len(self._pending_deleted)
+                    + len(self._pending_hashes) + len(self._pending_chain_names) + len(self._pending_validators))
+    
+    def flush(self):
+        """将内存中合并的变更在一个事务中批量写入数据库（可在线程中调用）"""
+        with self._pending_lock:
+            collected = self._pending_collected
+            deleted = self._pending_deleted
+            hashes = self._pending_hashes
+            chain_names = self._pending_chain_names
+            validators = self._pending_validators
+            self._pending_collected = {}
+            self._pending_deleted = set()
+            self._pending_hashes = {}
+            self._pending_chain_names = {}
+            self._pending_validators = {}
+        if not (collected or deleted or hashes or chain_names or validators):
+            return
+        with self._db_lock:
+            with self._conn:
+                if deleted:
+                    self._conn.executemany(
+                        "DELETE FROM collected WHERE kind = ? AND key = ?",
+                        list(deleted)
+                    )
+                if collected:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO collected (kind, key, last_seen, content_hash, output_path)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (kind, key) DO UPDATE SET
+                            last_seen = excluded.last_seen,
+                            content_hash = COALESCE(excluded.content_hash, collected.content_hash),
+                            output_path = COALESCE(excluded.output_path, collected.output_path)
+                        """,
+                        [(kind, key) + values for (kind, key), values in collected.items()]
+                    )
+                if hashes:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO page_hashes (kind, url, hash, updated_at)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT (kind, url) DO UPDATE SET
+                            hash = excluded.hash,
+                            updated_at = excluded.updated_at
+                        """,
+                        [(kind, url) + values for (kind, url), values in hashes.items()]
+                    )
+                if chain_names:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO chain_names (chain_id, chain_name, updated_at)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT (chain_id) DO UPDATE SET
+                            chain_name = excluded.chain_name,
+                            updated_at = excluded.updated_at
+                        """,
+                        [(chain_id,) + values for chain_id, values in chain_names.items()]
+                    )
+                if validators:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO http_validators (url, etag, last_modified, fingerprint, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (url) DO UPDATE SET
+                            etag = excluded.etag,
+                            last_modified = excluded.last_modified,
+                            fingerprint = excluded.fingerprint,
+                            updated_at = excluded.updated_at
+                        """,
+                        [(url,) + values for url, values in validators.items()]
+                    )
+    
+    async def run_flusher(self):
+        """后台任务：定期在线程中批量写入，不阻塞事件循环"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.pending_count:
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    logger.warning("[状态存储] 批量写入失败: %s", e)
+    
+    def close(self):
+        """写入剩余变更并关闭数据库"""
+        try:
+            self.flush()
+        finally:
+            with self._db_lock:
+                self._conn.close()
+    
+    def tracked_set(self, kind: str) -> "TrackedSet":
+        """
+        创建一个与数据库同步的已采集集合（已加载数据库中的记录）
+        
+        Args:
+            kind: 页面类型
+            
+        Returns:
+            TrackedSet: 已采集集合
+        """
+        return TrackedSet(self, kind, self.load_collected(kind))
+    
+    def tracked_dict(self, kind: str) -> "TrackedDict":
+        """
+        创建一个与数据库同步的数据哈希字典（已加载数据库中的记录）
+        
+        Args:
+            kind: 页面类型
+            
+        Returns:
+            TrackedDict: 数据哈希字典
+        """
+        return TrackedDict(self, kind, self.load_hashes(kind))
+
+
+class TrackedSet(set):
+    """
+    已采集集合：所有修改都同步记录到状态存储
+    
+    采集成功后调用 record（同时记录内容哈希和输出路径，只写一次状态存储）；add/discard/remove/clear/update
+    同样同步到状态存储，无法逐项同步的 pop 和就地集合运算（|=、-=、intersection_update 等）不可用
+    """
+    
+    def __init__(self, store, kind, items=()):
+        super().__init__(items)
+        self._store = store
+        self._kind = kind
+    
+    def record(self, key, content_hash=None, output_path=None):
+        """
+        标记为已采集并记录到状态存储
+        
+        Args:
+            key: 规范化URL或SVG URL
+            content_hash: 内容哈希（None表示保持原值）
+            output_path: 输出文件路径（None表示保持原值）
+        """
+        super().add(key)
+        self._store.record(self._kind, key, content_hash=content_hash, output_path=output_path)
+    
+    def add(self, key):
+        self.record(key)
+    
+    def update(self, *iterables):
+        for iterable in iterables:
+            for key in iterable:
+                self.record(key)
+    
+    def discard(self, key):
+        if key in self:
+            super().discard(key)
+            self._store.forget(self._kind, key)
+    
+    def remove(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.discard(key)
+    
+    def clear(self):
+        for key in list(self):
+            self.discard(key)
+    
+    def _unsupported(self, *args, **kwargs):
+        raise TypeError("TrackedSet 不支持该操作（无法同步到状态存储），请使用 record/discard")
+    
+    pop = _unsupported
+    __ior__ = __iand__ = __isub__ = __ixor__ = _unsupported
+    intersection_update = difference_update = symmetric_difference_update = _unsupported
+
+
+class TrackedDict(dict):
+    """数据哈希字典：赋值时同步记录到状态存储"""
+    
+    def __init__(self, store, kind, items=None):
+        super().__init__(items or {})
+        self._store = store
+        self._kind = kind
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if value:
+            self._store.record_hash(self._kind, key, value)
+
+
+class CollectionScheduler:
+    """
+    采集任务调度器 - 按页面类型分开排队，同时受全局并发数和页面类型并发上限限制
+    
+    - 同一个key（页面类型 + 规范化URL）同时只会有一个任务在队列中或执行中
+    - 每种页面类型有独立的并发上限，不同页面可以并行采集
+    - 只有页面类型还有并发余量时才占用全局并发名额，某一类型积压不会占满名额、阻塞其他类型
+    """
+    
+    def __init__(self, workers=None, queue_size=100, type_limits=None, submit_timeout=30.0):
+        """
+        初始化调度器
+        
+        Args:
+            workers: 全局最大并发采集数，默认None表示各页面类型并发上限之和（每种类型都能达到自己的上限）
+            queue_size: 等待队列的最大长度（所有页面类型合计），默认100
+            type_limits: 各页面类型的并发上限，例如 {"chain-info": 5}，未指定的类型使用默认值
+            submit_timeout: 队列已满时提交任务最多等待空位的时间（秒），超时后放弃本次提交，默认30
+        """
+        self.type_limits = dict(DEFAULT_COLLECTION_TYPE_LIMITS)
+        if type_limits:
+            self.type_limits.update(type_limits)
+        if workers is None:
+            workers = sum(max(1, limit) for limit in self.type_limits.values())
+        self.workers = max(1, int(workers))
+        self.queue_size = queue_size
+        self.submit_timeout = submit_timeout
+        
+        self._pending = OrderedDict()  # 页面类型 -> deque[(key, job)]，等待执行的任务
+        self._running = {}  # 页面类型 -> 正在执行的任务数
+        self._tasks = set()  # 正在执行的任务
+        self._started = False
+        # 正在排队或执行中的任务（key -> 页面类型）
+        self._in_flight = {}
+        # 等待队列空位的提交（Future，队列有空位或调度器停止时唤醒）
+        self._space_waiters = deque()
+        self.completed = 0  # 累计执行完成的任务数
+        self.duplicates = 0  # 因重复而跳过的提交数
+        self.dropped = 0  # 等待队列空位超时而放弃的提交数
+    
+    def start(self):
+        """启动调度（需要在事件循环中调用）"""
+        if self._started:
+            return
+        self._started = True
+        logger.info("[调度] 采集调度器已启动: 全局并发 %s，页面类型并发上限: %s", self.workers, self.type_limits)
+        self._dispatch()
+    
+    async def stop(self):
+        """取消执行中的任务，丢弃尚未执行的任务"""
+        self._started = False
+        self._pending.clear()
+        self._wake_submitters()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._running.clear()
+        self._in_flight.clear()
+    
+    def is_in_flight(self, key) -> bool:
+        """
+        检查任务是否正在排队或执行中
+        
+        Args:
+            key: 任务去重key
+            
+        Returns:
+            bool: 如果任务正在排队或执行中返回True
+        """
+        return key in self._in_flight
+    
+    async def submit(self, page_type, key, job) -> bool:
+        """
+        提交采集任务，队列已满时等待空位（最多 submit_timeout 秒）
+        
+        等待期间该key视为已在队列中（重复触发会被跳过）；超时放弃时页面没有被标记为已采集，
+        下次触发（重新导航、定期检查）时会再次提交
+        
+        Args:
+            page_type: 页面类型（用于并发限制），如 "chain-info"
+            key: 任务去重key，同一个key同时只允许一个任务
+            job: 无参数的协程函数，由调度器调用执行
+            
+        Returns:
+            bool: 任务已入队返回True，重复、调度器未启动或等待空位超时返回False
+        """
+        if key in self._in_flight:
+            logger.debug("[调度] 任务已在队列或执行中，跳过重复提交: %s", key)
+            self.duplicates += 1
+            return False
+        if not self._started:
+            logger.warning("[调度] 调度器尚未启动，无法提交任务: %s", key)
+            return False
+        if self.queue_depth >= self.queue_size:
+            logger.info("[调度] 采集队列已满（%s），等待空位: %s", self.queue_size, key)
+            self._in_flight[key] = page_type
+            try:
+                has_space = await self._wait_for_space()
+            finally:
+                self._in_flight.pop(key, None)
+            if not has_space:
+                logger.warning("[调度] 等待采集队列空位超时（%s 秒），放弃本次提交，页面保持未采集状态: %s",
+                               self.submit_timeout, key)
+                self.dropped += 1
+                return False
+        self._pending.setdefault(page_type, deque()).append((key, job))
+        self._in_flight[key] = page_type
+        self._dispatch()
+        return True
+    
+    async def _wait_for_space(self) -> bool:
+        """
+        等待等待队列出现空位
+        
+        Returns:
+            bool: 有空位返回True，超时或调度器已停止返回False
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.submit_timeout
+        while self.queue_depth >= self.queue_size:
+            remaining = deadline - loop.time()
+            if not self._started or remaining <= 0:
+                return False
+            waiter = loop.create_future()
+            self._space_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                if waiter in self._space_waiters:
+                    self._space_waiters.remove(waiter)
+        return self._started
+    
+    def _wake_submitters(self):
+        """唤醒等待队列空位的提交（被唤醒后重新检查队列长度）"""
+        while self._space_waiters:
+            waiter = self._space_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+    
+    def _type_limit(self, page_type) -> int:
+        """页面类型的并发上限，未配置的类型按1个并发处理"""
+        return max(1, self.type_limits.get(page_type, 1))
+    
+    def _dispatch(self):
+        """在全局并发和页面类型并发都有余量时启动等待中的任务（各页面类型轮流取任务）"""
+        while self._started and len(self._tasks) < self.workers:
+            started = False
+            for page_type in list(self._pending):
+                queue = self._pending[page_type]
+                if not queue:
+                    continue
+                if self._running.get(page_type, 0) >= self._type_limit(page_type):
+                    continue
+                if len(self._tasks) >= self.workers:
+                    break
+                key, job = queue.popleft()
+                # 已启动任务的类型移到末尾，下一轮优先其他类型
+                self._pending.move_to_end(page_type)
+                self._running[page_type] = self._running.get(page_type, 0) + 1
+                task = asyncio.create_task(self._run(page_type, key, job), name=f"collect:{page_type}")
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                started = True
+            if not started:
+                break
+        if self._space_waiters and self.queue_depth < self.queue_size:
+            self._wake_submitters()
+    
+    async def _run(self, page_type, key, job):
+        """执行一个任务，结束后启动下一个等待中的任务"""
+        try:
+            await job()
+            self.completed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("[调度] 执行任务出错 (%s): %s", key, e)
+        finally:
+            self._running[page_type] = max(0, self._running.get(page_type, 0) - 1)
+            self._in_flight.pop(key, None)
+            self._tasks.discard(asyncio.current_task())
+            self._dispatch()
+    
+    @property
+    def queue_depth(self) -> int:
+        """等待执行的任务数"""
+        return sum(len(queue) for queue in self._pending.values())
+    
+    @property
+    def in_flight_count(self) -> int:
+        """正在排队或执行中的任务数"""
+        return len(self._in_flight)
+    
+    def in_flight_by_type(self) -> dict:
+        """按页面类型统计正在排队或执行中的任务数"""
+        counts = {}
+        for page_type in self._in_flight.values():
+            counts[page_type] = counts.get(page_type, 0) + 1
+        return counts
+
+
+class UrlFrontier:
+    """
+    批量采集的URL边界队列 - 按规范化URL去重，记录发现深度和重试次数
+    
+    种子URL深度为0，从采集结果中发现的URL深度为来源深度+1，超过 max_depth 的URL不再入队
+    """
+    
+    def __init__(self, normalize, max_depth=1, max_pages=None, max_attempts=2):
+        """
+        初始化URL队列
+        
+        Args:
+            normalize: URL规范化函数（用于去重）
+            max_depth: 最大发现深度，默认1（种子页面 + 从种子页面发现的页面）
+            max_pages: 最多入队的页面数，None表示不限制
+            max_attempts: 每个URL的最多尝试次数，默认2
+        """
+        self.normalize = normalize
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_attempts = max(1, int(max_attempts))
+        self._queue = asyncio.Queue()
+        self._seen = set()
+        self.added = 0
+        self.duplicates = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+    
+    def add(self, url: str, depth: int = 0, page_type: str = None) -> bool:
+        """
+        添加URL（已入队过的URL、超过最大深度或页面数上限时忽略）
+        
+        Args:
+            url: 页面URL
+            depth: 发现深度
+            page_type: 页面类型
+            
+        Returns:
+            bool: 已入队返回True
+        """
+        if not url or depth > self.max_depth:
+            return False
+        key = self.normalize(url)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        if self.max_pages is not None and self.added >= self.max_pages:
+            return False
+        self._seen.add(key)
+        self.added += 1
+        self._queue.put_nowait({"url": url, "depth": depth, "page_type": page_type, "attempt": 1})
+        return True
+    
+    def retry(self, item: dict) -> bool:
+        """
+        重新入队采集失败的URL
+        
+        Args:
+            item: get() 返回的条目
+            
+        Returns:
+            bool: 已重新入队返回True，超过最多尝试次数返回False
+        """
+        if item["attempt"] >= self.max_attempts:
+            return False
+        self.retried += 1
+        self._queue.put_nowait(dict(item, attempt=item["attempt"] + 1))
+        return True
+    
+    async def get(self, stop_event=None):
+        """
+        取出下一个待采集的URL条目（{"url", "depth", "page_type", "attempt"}）
+        
+        Args:
+            stop_event: asyncio.Event，等待期间被设置时放弃等待
+            
+        Returns:
+            dict: URL条目；stop_event 先被设置时返回None
+        """
+        if stop_event is None:
+            return await self._queue.get()
+        if stop_event.is_set():
+            return None
+        get_task = asyncio.ensure_future(self._queue.get())
+        stop_task = asyncio.ensure_future(stop_event.wait())
+        try:
+            await asyncio.wait({get_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_task.cancel()
+            if not get_task.done():
+                get_task.cancel()
+        if get_task.done() and not get_task.cancelled():
+            return get_task.result()
+        return None
+    
+    def task_done(self):
+        self._queue.task_done()
+    
+    async def join(self):
+        """等待所有已入队的URL处理完成"""
+        await self._queue.join()
+    
+    @property
+    def pending(self) -> int:
+        """等待采集的URL数"""
+        return self._queue.qsize()
+
+
+# 登录页URL特征（批量采集时页面被重定向到这些地址说明登录状态已失效）
+LOGIN_URL_PATTERN = re.compile(r"login|signin|sign-in|passport", re.IGNORECASE)
+
+# 判断页面是否处于未登录状态：当前地址是登录页，或页面上显示了密码输入框（登录弹窗）
+LOGIN_PROBE_JS = """
+    (pattern) => {
+        if (new RegExp(pattern, 'i').test(location.pathname + location.hash)) {
+            return true;
+        }
+        return Array.from(document.querySelectorAll('input[type="password"]'))
+            .some(el => el.offsetParent !== null);
+    }
 """
 
-import asyncio
-import json
-import csv
-import os
-import re
-import sys
-from datetime import datetime
-from pathlib import Path
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+# 复制persistent context目录导出登录状态时跳过的文件（缓存与Chrome的进程锁）
+PROFILE_COPY_IGNORE = ("Singleton*", "lockfile", "*Cache*", "Service Worker", "*.tmp")
+
+
+class LoginRequiredError(RuntimeError):
+    """批量采集时页面处于未登录状态（登录状态缺失或已过期），继续采集只会保存无效数据"""
+
+
+# 采集状态数据库和采集指标默认保存在SVG输出目录下的 .state 中（以 . 开头的目录不会被产业链索引当作产业链）
+STATE_DIRNAME = ".state"
+DEFAULT_STATE_DB_FILENAME = "crawl_state.db"
+# 采集指标文件名（JSON Lines）
+DEFAULT_METRICS_FILENAME = "collection_metrics.jsonl"
+
+# 当前正在记录的采集（由 traced_collection 设置，各阶段通过 metrics_stage/metrics_count 记录到这里）
+_current_trace = contextvars.ContextVar("collection_trace", default=None)
+
+
+class CollectionTrace:
+    """
+    一次采集的各阶段耗时、字节数和结果
+    
+    阶段时间互不重叠：嵌套阶段的时间只计入最内层阶段，未归入任何阶段的时间记为 other
+    """
+    
+    def __init__(self, page_type: str, key: str, loop_monitor=None):
+        self.page_type = page_type
+        self.key = key
+        self.loop_monitor = loop_monitor
+        self.loop_lag = None  # 采集期间事件循环的累计延迟（秒），用于区分循环阻塞和网站响应慢
+        self._loop_lag_start = loop_monitor.total_lag if loop_monitor else 0.0
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.outcome = None
+        self.elapsed = None
+        self.stages = {}
+        self.counters = {}
+        self.bytes_written = 0
+        self._start = time.perf_counter()
+        self._finished = None
+        self._stack = []  # [[阶段名, 开始时间], ...]
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._write_futures = []
+    
+    def enter(self, name: str):
+        """开始一个阶段（暂停外层阶段的计时）"""
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.stages[outer[0]] = self.stages.get(outer[0], 0.0) + now - outer[1]
+        self._stack.append([name, now])
+    
+    def exit(self):
+        """结束当前阶段（恢复外层阶段的计时）"""
+        now = time.perf_counter()
+        name, start = self._stack.pop()
+        self.stages[name] = self.stages.get(name, 0.0) + now - start
+        if self._stack:
+            self._stack[-1][1] = now
+    
+    def count(self, name: str, amount=1):
+        """累加计数（如 bytes_downloaded）"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def begin_write(self, future=None):
+        """文件写入器接收了属于本次采集的一次写入（future为该写入的完成结果）"""
+        with self._lock:
+            self._pending_writes += 1
+            if future is not None:
+                self._write_futures.append(future)
+    
+    def take_write_futures(self) -> list:
+        """取出本次采集已提交写入的完成结果（取出后清空）"""
+        with self._lock:
+            futures, self._write_futures = self._write_futures, []
+            return futures
+    
+    def end_write(self, size: int):
+        """写入完成（size为写入的字节数，被合并或失败时为0）（在写入线程中调用）"""
+        with self._lock:
+            self._pending_writes -= 1
+            self.bytes_written += size
+    
+    @property
+    def writes_pending(self) -> bool:
+        with self._lock:
+            return self._pending_writes > 0
+    
+    def finish(self, outcome: str):
+        """
+        结束记录
+        
+        Args:
+            outcome: 采集结果：collected / skipped / unchanged / error
+        """
+        self._finished = time.perf_counter()
+        self.elapsed = self._finished - self._start
+        if self.loop_monitor:
+            self.loop_lag = self.loop_monitor.total_lag - self._loop_lag_start
+        if self.outcome is None:
+            self.outcome = outcome
+    
+    def to_record(self) -> dict:
+        """转换为指标文件中的一行记录"""
+        stages_ms = {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+        stages_ms["other"] = round(max(0.0, self.elapsed - sum(self.stages.values())) * 1000, 1)
+        counters = dict(self.counters)
+        record = {
+            "time": self.started_at,
+            "page_type": self.page_type,
+            "key": self.key,
+            "outcome": self.outcome,
+            "total_ms": round(self.elapsed * 1000, 1),
+            "stages_ms": stages_ms,
+            "bytes_downloaded": counters.pop("bytes_downloaded", 0),
+            "bytes_written": self.bytes_written,
+            "counters": counters,
+        }
+        if self.loop_lag is not None:
+            record["loop_lag_ms"] = round(self.loop_lag * 1000, 1)
+        return record
+
+
+@contextmanager
+def metrics_stage(name: str):
+    """
+    记录当前采集中一个阶段的耗时（不在采集中时不做任何操作）
+    
+    Args:
+        name: 阶段名称：wait_load / fixed_wait / scroll / extract / download / hash / save
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    trace.enter(name)
+    try:
+        yield
+    finally:
+        trace.exit()
+
+
+def metrics_count(name: str, amount=1):
+    """为当前采集累加计数（不在采集中时不做任何操作）"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.count(name, amount)
+
+
+def metrics_outcome(outcome: str):
+    """设置当前采集的结果（skipped / unchanged / error），不设置时根据返回值判断"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.outcome = outcome
+
+
+def traced_collection(page_type: str):
+    """
+    采集方法装饰器：为每次调用记录一条采集指标，结束后交给 self._on_collection_finished(trace)
+    
+    被装饰方法的第3个位置参数（url / svg_url）作为记录的key；返回值为空时结果记为 skipped
+    
+    Args:
+        page_type: 页面类型
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = args[2] if len(args) > 2 else kwargs.get("url") or kwargs.get("svg_url") or ""
+            trace = CollectionTrace(page_type, key, loop_monitor=self.loop_monitor)
+            token = _current_trace.set(trace)
+            outcome = "error"
+            try:
+                result = await func(self, *args, **kwargs)
+                outcome = "collected" if result else "skipped"
+                return result
+            finally:
+                _current_trace.reset(token)
+                trace.finish(outcome)
+                self._on_collection_finished(trace)
+        return wrapper
+    return decorator
+
+
+class MetricsRecorder:
+    """
+    采集指标记录器 - 每次采集追加一行JSON到指标文件（JSON Lines）
+    
+    等本次采集提交的文件全部写入后才输出记录，使 bytes_written 为实际写入磁盘的字节数
+    （最多等待 max_wait 秒）；追加写入在后台线程中完成，不阻塞事件循环
+    """
+    
+    def __init__(self, path, max_wait=30.0):
+        """
+        初始化记录器
+        
+        Args:
+            path: 指标文件路径
+            max_wait: 等待文件写入完成的最长时间（秒）
+        """
+        self.path = Path(path)
+        self.max_wait = max_wait
+        self.recorded = 0
+        self._waiting = []
+        self._queue = queue.SimpleQueue()  # 待追加的文本，None表示停止
+        self._thread = None
+    
+    def _run(self):
+        while True:
+            lines = self._queue.get()
+            if lines is None:
+                return
+            try:
+                self.path.parent.mkdir(exist_ok=True, parents=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+            except OSError as e:
+                logger.warning("[采集指标] 写入指标文件失败: %s", e)
+    
+    def record(self, trace: CollectionTrace):
+        """登记一次已结束的采集，并输出已经可以输出的记录"""
+        self._waiting.append(trace)
+        self.flush()
+    
+    def flush(self, force=False) -> int:
+        """
+        将文件写入已完成（或等待超时）的记录交给后台线程追加到指标文件
+        
+        Args:
+            force: 不等待文件写入，输出全部记录
+            
+        Returns:
+            int: 输出的记录数
+        """
+        now = time.perf_counter()
+        ready, waiting = [], []
+        for trace in self._waiting:
+            if force or not trace.writes_pending or now - trace._finished > self.max_wait:
+                ready.append(trace)
+            else:
+                waiting.append(trace)
+        self._waiting = waiting
+        if not ready:
+            return 0
+        lines = "".join(json.dumps(trace.to_record(), ensure_ascii=False) + "\n" for trace in ready)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+            self._thread.start()
+        self._queue.put(lines)
+        self.recorded += len(ready)
+        return len(ready)
+    
+    def close(self):
+        """输出剩余的全部记录并等待写入完成（应在文件写入器关闭后调用）"""
+        self.flush(force=True)
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    """最近秩法计算百分位数（sorted_values 已排序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize_metrics(path) -> dict:
+    """
+    汇总指标文件：按页面类型统计采集结果、总耗时和各阶段耗时的 p50/p95/p99
+    （耗时只统计实际执行了采集的记录，不包括 skipped；loop_lag 为采集期间事件循环的累计延迟，与各阶段时间重叠）
+    
+    Args:
+        path: 指标文件路径
+        
+    Returns:
+        dict: {页面类型: {"count", "outcomes", "bytes_downloaded", "bytes_written", "latency_ms": {阶段: {...}}}}
+    """
+    groups = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            group = groups.setdefault(record.get("page_type") or "unknown", {
+                "count": 0, "outcomes": {}, "bytes_downloaded": 0, "bytes_written": 0, "_samples": {},
+            })
+            group["count"] += 1
+            outcome = record.get("outcome") or "unknown"
+            group["outcomes"][outcome] = group["outcomes"].get(outcome, 0) + 1
+            group["bytes_downloaded"] += record.get("bytes_downloaded") or 0
+            group["bytes_written"] += record.get("bytes_written") or 0
+            if outcome == "skipped":
+                continue
+            samples = group["_samples"]
+            samples.setdefault("total", []).append(record.get("total_ms") or 0.0)
+            for stage, ms in (record.get("stages_ms") or {}).items():
+                samples.setdefault(stage, []).append(ms)
+            if "loop_lag_ms" in record:
+                samples.setdefault("loop_lag", []).append(record["loop_lag_ms"])
+    
+    for group in groups.values():
+        latency = {}
+        for stage, values in group.pop("_samples").items():
+            values.sort()
+            latency[stage] = {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+            }
+        group["latency_ms"] = latency
+    return groups
+
+
+def print_metrics_summary(path):
+    """打印指标文件的汇总（按页面类型的 p50/p95/p99）"""
+    path = Path(path)
+    if not path.exists():
+        print(f"[采集指标] 指标文件不存在: {path}")
+        return
+    summary = summarize_metrics(path)
+    print(f"[采集指标] {path}")
+    stage_order = ["total", "wait_load", "fixed_wait", "scroll", "extract", "download", "hash", "save", "other", "loop_lag"]
+    for page_type, group in sorted(summary.items()):
+        outcomes = "，".join(f"{name} {count}" for name, count in sorted(group["outcomes"].items()))
+        print(f"\n{page_type}: {group['count']} 次（{outcomes}），"
+              f"下载 {group['bytes_downloaded'] / 1024:.1f} KB，写入 {group['bytes_written'] / 1024:.1f} KB")
+        latency = group["latency_ms"]
+        if not latency:
+            continue
+        print(f"  {'阶段':<12}{'次数':>6}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}")
+        stages = [s for s in stage_order if s in latency] + sorted(s for s in latency if s not in stage_order)
+        for stage in stages:
+            stats = latency[stage]
+            print(f"  {stage:<12}{stats['count']:>6}{stats['p50']:>12.1f}{stats['p95']:>12.1f}{stats['p99']:>12.1f}")
+
+
+# Prometheus直方图的默认分桶（秒）
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class PrometheusExporter:
+    """
+    进程内指标 - 以Prometheus文本格式输出计数器、直方图和仪表
+    
+    - 计数器和直方图由采集过程直接更新；仪表和部分计数器在输出时通过回调读取（如队列深度、打开的页面数）
+    - serve() 在当前事件循环中启动本地HTTP服务（GET /metrics），
+      run_textfile() 定期写入node-exporter的textfile目录，二者可以同时使用
+    """
+    
+    def __init__(self, namespace="scraper"):
+        """
+        初始化指标
+        
+        Args:
+            namespace: 指标名称前缀
+        """
+        self.namespace = namespace
+        self._meta = OrderedDict()  # 指标名 -> (类型, 说明)
+        self._values = {}  # 指标名 -> {标签元组: 值}
+        self._histograms = {}  # 指标名 -> {标签元组: [各分桶计数..., 总和, 次数]}
+        self._buckets = {}  # 指标名 -> 分桶上界
+        self._callbacks = {}  # 指标名 -> (回调函数, 标签名)，回调返回数值，或 {标签值: 数值}
+        self._server = None
+    
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}"
+    
+    def counter(self, name: str, help_text: str, callback=None, label=None):
+        """
+        注册计数器
+        
+        Args:
+            name: 指标名称（不含前缀）
+            help_text: 说明
+            callback: 输出时从回调读取累计值，None表示由 inc() 更新
+            label: 回调返回 {标签值: 数值} 时使用的标签名
+        """
+        self._register(name, "counter", help_text, callback, label)
+    
+    def gauge(self, name: str, help_text: str, callback=None, label=None):
+        """注册仪表（参数同 counter()，callback 返回当前值）"""
+        self._register(name, "gauge", help_text, callback, label)
+    
+    def histogram(self, name: str, help_text: str, buckets=DEFAULT_LATENCY_BUCKETS):
+        """注册直方图"""
+        self._register(name, "histogram", help_text, None, None)
+        self._buckets[name] = tuple(buckets)
+        self._histograms[name] = {}
+    
+    def _register(self, name, metric_type, help_text, callback, label):
+        self._meta[name] = (metric_type, help_text)
+        if callback is not None:
+            self._callbacks[name] = (callback, label)
+        else:
+            self._values.setdefault(name, {})
+    
+    @staticmethod
+    def _labels_key(labels: dict) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+    
+    def inc(self, name: str, amount=1, **labels):
+        """计数器加上amount"""
+        values = self._values[name]
+        key = self._labels_key(labels)
+        values[key] = values.get(key, 0) + amount
+    
+    def set(self, name: str, value, **labels):
+        """设置仪表的值"""
+        self._values[name][self._labels_key(labels)] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        """向直方图记录一个观测值"""
+        buckets = self._buckets[name]
+        series = self._histograms[name].get(self._labels_key(labels))
+        if series is None:
+            series = [0] * (len(buckets) + 2)
+            self._histograms[name][self._labels_key(labels)] = series
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+    
+    @staticmethod
+    def _format_labels(key: tuple, extra=None) -> str:
+        pairs = list(key) + (list(extra) if extra else [])
+        if not pairs:
+            return ""
+        escaped = []
+        for label, value in pairs:
+            value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+            escaped.append(f'{label}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+    
+    @staticmethod
+    def _format_value(value) -> str:
+        if isinstance(value, float):
+            return repr(value) if value == value else "NaN"
+        return str(value)
+    
+    def render(self) -> str:
+        """
+        输出Prometheus文本格式
+        
+        Returns:
+            str: 指标文本
+        """
+        lines = []
+        for name, (metric_type, help_text) in self._meta.items():
+            full_name = self._name(name)
+            if name in self._callbacks:
+                callback, label = self._callbacks[name]
+                try:
+                    value = callback()
+                except Exception:
+                    continue
+                if isinstance(value, dict):
+                    series = {self._labels_key({label: k}): v for k, v in value.items()}
+                else:
+                    series = {(): value}
+            elif metric_type == "histogram":
+                series = None
+            else:
+                series = self._values.get(name, {})
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            if metric_type == "histogram":
+                buckets = self._buckets[name]
+                for key, counts in self._histograms[name].items():
+                    for bound, count in zip(buckets, counts):
+                        lines.append(f"{full_name}_bucket{self._format_labels(key, [('le', bound)])} {count}")
+                    lines.append(f"{full_name}_bucket{self._format_labels(key, [('le', '+Inf')])} {counts[-1]}")
+                    lines.append(f"{full_name}_sum{self._format_labels(key)} {self._format_value(float(counts[-2]))}")
+                    lines.append(f"{full_name}_count{self._format_labels(key)} {counts[-1]}")
+                continue
+            for key, value in series.items():
+                lines.append(f"{full_name}{self._format_labels(key)} {self._format_value(value)}")
+        return "\n".join(lines) + "\n"
+    
+    async def serve(self, port: int, host: str = "127.0.0.1"):
+        """
+        在当前事件循环中启动本地HTTP指标服务（GET /metrics）
+        
+        Args:
+            port: 端口
+            host: 监听地址，默认只监听本机
+        """
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        logger.info("[指标] Prometheus指标服务: http://%s:%s/metrics", host, port)
+    
+    async def _handle_client(self, reader, writer):
+        """处理一个HTTP请求（只支持 GET /metrics）"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # 读完请求头
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) > 1 else "/"
+            if parts and parts[0] == "GET" and path in ("/metrics", "/"):
+                status, body = "200 OK", self.render().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body, content_type = "404 Not Found", b"not found\n", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+    
+    async def run_textfile(self, path, file_writer, interval=15.0):
+        """
+        定期将指标写入node-exporter的textfile（原子替换，node-exporter不会读到写了一半的文件）
+        
+        Args:
+            path: 指标文件路径（需以 .prom 结尾）
+            file_writer: AtomicFileWriter
+            interval: 写入间隔（秒）
+        """
+        while True:
+            file_writer.write_text(path, self.render())
+            await asyncio.sleep(interval)
+    
+    async def close(self):
+        """关闭HTTP指标服务"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控 - 区分"事件循环被阻塞"和"网站响应慢"
+    
+    - run() 在事件循环中每 interval 秒唤醒一次，唤醒比预期晚的时间即为循环延迟，
+      保留最近 window 个样本用于计算 p50/p95/p99，并累计总延迟（采集记录据此计算采集期间的循环延迟）
+    - 后台看门狗线程发现循环超过 threshold 秒没有唤醒时，抓取事件循环线程当前的调用栈
+      （即阻塞循环的协程或回调），循环恢复后输出警告并保存在 reports 中
+    """
+    
+    def __init__(self, interval=0.1, threshold=0.25, window=3000, max_reports=20, on_sample=None):
+        """
+        初始化监控
+        
+        Args:
+            interval: 测量间隔（秒），默认0.1
+            threshold: 延迟超过该值（秒）时记录阻塞的调用栈，默认0.25
+            window: 计算百分位数的样本数（默认3000，即最近约5分钟）
+            max_reports: 保留的阻塞记录数
+            on_sample: 每次测量后的回调 on_sample(lag)（如写入Prometheus直方图）
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.on_sample = on_sample
+        self.samples = deque(maxlen=window)
+        self.reports = deque(maxlen=max_reports)
+        self.last = 0.0
+        self.max = 0.0
+        self.total_lag = 0.0
+        self.stalls = 0
+        self._beat = time.monotonic()
+        self._loop_thread_id = None
+        self._captured = None  # 看门狗在本次阻塞中抓取的 (位置, 调用栈)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watchdog = None
+    
+    async def run(self):
+        """测量循环延迟（在事件循环中作为后台任务运行，直到被取消）"""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        try:
+            while True:
+                expected = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                self._beat = time.monotonic()
+                self._record(max(0.0, loop.time() - expected))
+        finally:
+            self._stop.set()
+    
+    def _record(self, lag: float):
+        """记录一次测量结果，超过阈值时输出阻塞位置"""
+        self.last = lag
+        self.max = max(self.max, lag)
+        self.total_lag += lag
+        self.samples.append(lag)
+        if self.on_sample:
+            self.on_sample(lag)
+        with self._lock:
+            captured, self._captured = self._captured, None
+        if lag < self.threshold:
+            return
+        self.stalls += 1
+        where, stack = captured or ("未知（阻塞结束前看门狗未能抓取调用栈）", "")
+        self.reports.append({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "lag_ms": round(lag * 1000, 1),
+            "where": where,
+            "stack": stack,
+        })
+        logger.warning("[循环延迟] 事件循环被阻塞 %.0f ms，阻塞位置: %s%s",
+                       lag * 1000, where, f"\n{stack}" if stack else "")
+    
+    def _watch(self):
+        """看门狗线程：事件循环超过阈值没有唤醒时抓取循环线程的调用栈（每次阻塞只抓取一次）"""
+        poll = max(0.02, self.interval / 2)
+        while not self._stop.wait(poll):
+            if time.monotonic() - self._beat < self.interval + self.threshold:
+                continue
+            with self._lock:
+                if self._captured is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            captured = self._describe(frame)
+            with self._lock:
+                self._captured = captured
+    
+    @staticmethod
+    def _describe(frame) -> tuple:
+        """
+        描述阻塞事件循环的位置
+        
+        Returns:
+            tuple: (位置, 调用栈文本)；位置为事件循环正在执行的协程或回调（调用栈中asyncio之外的最外层函数）
+                以及阻塞发生的最内层函数，调用栈从该协程或回调开始
+        """
+        summary = traceback.extract_stack(frame)
+        asyncio_dir = os.path.dirname(asyncio.__file__)
+        start = 0
+        for index, entry in enumerate(summary):
+            if not entry.filename.startswith(asyncio_dir) and entry.name != "<module>":
+                start = index
+                break
+        entries = summary[start:]
+        if not entries:
+            return "未知", ""
+        
+        def describe(entry):
+            return f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+        
+        where = describe(entries[0])
+        if len(entries) > 1:
+            where += f" -> {describe(entries[-1])}"
+        return where, "".join(traceback.StackSummary.from_list(entries).format()).rstrip()
+    
+    def percentiles(self) -> dict:
+        """最近样本的循环延迟百分位数（秒）：{"p50", "p95", "p99", "max"}"""
+        values = sorted(self.samples)
+        return {
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+            "p99": _percentile(values, 99),
+            "max": values[-1] if values else 0.0,
+        }
+    
+    def summary(self) -> str:
+        """延迟统计摘要（用于退出时输出）"""
+        stats = self.percentiles()
+        return (f"p50 {stats['p50'] * 1000:.1f} ms，p95 {stats['p95'] * 1000:.1f} ms，"
+                f"p99 {stats['p99'] * 1000:.1f} ms，最大 {self.max * 1000:.1f} ms，"
+                f"超过 {self.threshold * 1000:.0f} ms 的阻塞 {self.stalls} 次")
+
+
+class ContextRecycler:
+    """
+    浏览器上下文回收策略 - 长时间运行时限制渲染进程内存
+    
+    采集次数或所有页面的JS堆大小（通过CDP Performance.getMetrics测量）超过阈值时，
+    由调用方保存采集状态、关闭页面和上下文，并使用相同的persistent context目录重新启动。
+    
+    - 批量采集：worker完成手头的URL后重启上下文
+    - 交互模式：没有正在进行的采集且用户没有打开网页时重启上下文；用户还打开着网页时不关闭标签页，
+      改为逐页回收（清空进程内的响应缓存和接口拦截结果，重新加载不可见的后台标签页），
+      用户正在查看的标签页不受影响
+    """
+    
+    def __init__(self, max_collections=None, max_renderer_mb=None, check_interval=60.0):
+        """
+        初始化回收策略
+        
+        Args:
+            max_collections: 每个上下文最多完成的采集次数，None或0表示不按次数回收
+            max_renderer_mb: 所有页面JS堆的总大小上限（MB），None或0表示不按内存回收
+            check_interval: 测量内存的最短间隔（秒），默认60
+        """
+        self.max_collections = max_collections
+        self.max_renderer_mb = max_renderer_mb
+        self.check_interval = check_interval
+        self.renderer_mb = 0.0
+        self.recycles = 0
+        self._collections_base = 0
+        self._last_measure = time.monotonic()
+    
+    @classmethod
+    def from_profile(cls, profile: dict):
+        """根据性能配置创建回收策略"""
+        return cls(
+            max_collections=profile.get("recycle_after_collections"),
+            max_renderer_mb=profile.get("recycle_after_renderer_mb"),
+            check_interval=profile.get("recycle_check_interval") or 60.0,
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_collections or self.max_renderer_mb)
+    
+    async def measure(self, context, pages) -> float:
+        """
+        测量页面的JS堆总大小
+        
+        Args:
+            context: 浏览器上下文对象
+            pages: 要测量的页面列表
+            
+        Returns:
+            float: JS堆总大小（MB）
+        """
+        total = 0
+        for page in pages:
+            session = None
+            try:
+                session = await context.new_cdp_session(page)
+                await session.send("Performance.enable")
+                result = await session.send("Performance.getMetrics")
+                metrics = {m.get("name"): m.get("value", 0) for m in result.get("metrics", [])}
+                total += metrics.get("JSHeapTotalSize", 0)
+            except Exception:
+                # 页面已关闭或不支持CDP（非Chromium）时跳过
+                continue
+            finally:
+                if session is not None:
+                    try:
+                        await session.detach()
+                    except Exception:
+                        pass
+        self.renderer_mb = total / (1024 * 1024)
+        return self.renderer_mb
+    
+    async def check(self, context, pages, collections: int):
+        """
+        检查是否需要回收上下文（内存最多每 check_interval 秒测量一次）
+        
+        Args:
+            context: 浏览器上下文对象
+            pages: 当前打开的页面
+            collections: 累计完成的采集次数（单调递增）
+            
+        Returns:
+            str: 需要回收时返回原因，否则返回None
+        """
+        done = collections - self._collections_base
+        if self.max_collections and done >= self.max_collections:
+            return f"本上下文已完成 {done} 次采集"
+        if self.max_renderer_mb and time.monotonic() - self._last_measure >= self.check_interval:
+            self._last_measure = time.monotonic()
+            renderer_mb = await self.measure(context, pages)
+            if renderer_mb >= self.max_renderer_mb:
+                return f"页面JS堆 {renderer_mb:.0f} MB（上限 {self.max_renderer_mb} MB）"
+        return None
+    
+    def reset(self, collections: int):
+        """
+        上下文重启后重新开始计数
+        
+        Args:
+            collections: 当前累计完成的采集次数
+        """
+        self.recycles += 1
+        self.renderer_mb = 0.0
+        self._collections_base = collections
+        self._last_measure = time.monotonic()
+
+
+class PageSupervisor:
+    """
+    单个标签页的后台任务和事件监听器管理
+    
+    - 该页面的事件回调和后台协程都通过 spawn()/on() 创建和注册，由本对象持有引用
+    - 页面关闭（page.on("close")）时取消仍在运行的任务并移除注册的监听器，
+      避免已关闭页面的任务和回调在长时间运行中不断堆积
+    """
+    
+    def __init__(self, page, on_closed=None):
+        """
+        初始化页面管理器
+        
+        Args:
+            page: Playwright页面对象
+            on_closed: 页面关闭并清理完成后的回调，参数为 (本对象, 取消的任务数)
+        """
+        self.page = page
+        self.tasks = set()
+        self.listeners = []
+        self.closed = False
+        self.tasks_started = 0
+        self._on_closed = on_closed
+        page.on("close", self._handle_close)
+    
+    def spawn(self, coro, name=None):
+        """
+        创建属于该页面的后台任务
+        
+        Args:
+            coro: 协程对象
+            name: 任务名称（出错时打印）
+            
+        Returns:
+            asyncio.Task: 创建的任务；页面已关闭时不创建，返回None
+        """
+        if self.closed:
+            coro.close()
+            return None
+        task = asyncio.create_task(coro, name=name)
+        self.tasks.add(task)
+        self.tasks_started += 1
+        task.add_done_callback(self._task_done)
+        return task
+    
+    def on(self, event, handler):
+        """
+        注册页面事件监听，页面关闭时自动移除
+        
+        Args:
+            event: 事件名称，如 "framenavigated"、"load"
+            handler: 回调函数；协程函数的每次调用作为该页面的后台任务运行
+            
+        Returns:
+            实际注册到页面上的回调
+        """
+        if asyncio.iscoroutinefunction(handler):
+            # 与Playwright一致：只传入回调声明的参数个数（例如 "load" 回调可以不接收页面参数）
+            coro_handler = handler
+            arg_count = len(inspect.signature(coro_handler).parameters)
+            handler = lambda *args: self.spawn(
+                coro_handler(*args[:arg_count]), name=f"{event}:{coro_handler.__name__}"
+            )
+        self.page.on(event, handler)
+        self.listeners.append((event, handler))
+        return handler
+    
+    @property
+    def task_count(self) -> int:
+        """正在运行的任务数"""
+        return len(self.tasks)
+    
+    def _task_done(self, task):
+        """任务结束回调：释放引用，打印未处理的异常"""
+        self.tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error("[页面任务错误] %s: %s", task.get_name(), error)
+    
+    def _handle_close(self, *args):
+        """页面关闭事件回调"""
+        self.close()
+    
+    def close(self) -> int:
+        """
+        取消该页面的所有任务并移除监听器
+        
+        Returns:
+            int: 取消的任务数
+        """
+        if self.closed:
+            return 0
+        self.closed = True
+        for event, handler in self.listeners:
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+        self.listeners.clear()
+        try:
+            self.page.remove_listener("close", self._handle_close)
+        except Exception:
+            pass
+        cancelled = 0
+        for task in list(self.tasks):
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+        if self._on_closed:
+            self._on_closed(self, cancelled)
+        return cancelled
+
 
 class ManualBrowserScraper:
     """手动浏览器采集器 - 只在页面加载时采集，人工操作时不采集"""
     
-    def __init__(self, output_dir=None, chain_info_output_dir=None, interaction_timeout=5, use_persistent_context=True, persistent_context_dir=None):
+    def __init__(self, output_dir=None, chain_info_output_dir=None, interaction_timeout=5, use_persistent_context=True, persistent_context_dir=None,
+                 collection_workers=None, collection_queue_size=100, collection_type_limits=None,
+                 readiness_timeouts=None, chain_info_mode="auto", state_db_path=None, watch_output_dir=True,
+                 svg_storage="files", performance_profile=None, profile_overrides=None, metrics_path=None,
+                 metrics_port=None, metrics_textfile=None, loop_lag_threshold=0.25, storage_state_path=None):
         """
         初始化采集器
         
@@ -37,7 +3417,31 @@ class ManualBrowserScraper:
             interaction_timeout: 用户操作后多少秒内不采集，默认5秒（鼠标停止5秒后可继续采集）
             use_persistent_context: 是否使用persistent context来共享缓存，默认True（启用缓存持久化）
             persistent_context_dir: persistent context的目录，如果为None则使用脚本目录下的chrome_cache
+            collection_workers: 全局最大并发采集数，默认为各页面类型并发上限之和
+            collection_queue_size: 采集任务队列的最大长度，默认100
+            collection_type_limits: 各页面类型的并发采集上限，例如 {"chain-info": 5, "chain-detail": 2}
+            readiness_timeouts: 各页面类型的就绪等待时间预算（秒），例如 {"chain-detail": 15}
+            chain_info_mode: chain-info项目列表采集方式：
+                "auto"（默认，拦截到的接口数据与页面表格一致时使用接口数据，否则解析表格）、
+                "api"（不核对，拦截到接口数据就使用）、"dom"（只解析表格）
+            state_db_path: 采集状态数据库路径（SQLite），默认为输出目录下的 .state/crawl_state.db
+                （脚本所在目录下还有旧版本的crawl_state.db时，首次启动会移动过去）
+            watch_output_dir: 是否监听SVG输出目录，同步其他进程写入的文件（需要安装watchdog），默认True
+            svg_storage: SVG保存方式："files"（默认，每次采集保存带时间戳的 .txt/.svg 文件）、
+                "blobs"（内容寻址存储，相同SVG只保存一份，文件夹中保存manifest.json）
+            performance_profile: 性能配置名称（"interactive" 默认 / "fast" / "batch"），见 PERFORMANCE_PROFILES
+            profile_overrides: 覆盖性能配置中的单项，例如 {"scroll_delay": 1.0}
+            metrics_path: 采集指标文件（JSON Lines），默认为输出目录下的 .state/collection_metrics.jsonl，False表示不记录
+            metrics_port: Prometheus指标服务端口（只监听127.0.0.1），None表示不启动
+            metrics_textfile: 定期写入的node-exporter textfile路径（.prom），None表示不写入
+            loop_lag_threshold: 事件循环延迟超过该值（秒）时记录阻塞循环的协程或回调及其调用栈，默认0.25
+            storage_state_path: 批量采集使用的登录状态文件（Playwright storage_state），
+                默认为persistent context目录旁的 <目录名>_storage_state.json，每次批量采集前从persistent context导出
         """
+        # 作为库使用且调用方没有配置日志时，使用默认的日志输出（INFO级别，文本格式）
+        if not logger.handlers:
+            setup_logging()
+        
         if output_dir is None:
             # 默认输出目录为脚本所在目录下的svg_output
             script_dir = Path(__file__).parent
@@ -46,6 +3450,14 @@ class ManualBrowserScraper:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True, parents=True)
         
+        # 已采集产业链索引（启动时遍历一次输出目录，之后随写入更新）
+        self.watch_output_dir = watch_output_dir
+        self.chain_index = ChainFileIndex(self.output_dir)
+        index_start = time.perf_counter()
+        indexed_files = self.chain_index.build()
+        index_ms = (time.perf_counter() - index_start) * 1000
+        logger.info("[产业链索引] 已索引 %s 个产业链、%s 个文件（%.1f ms）", len(self.chain_index), indexed_files, index_ms)
+        
         # 项目列表输出目录
         if chain_info_output_dir is None:
             script_dir = Path(__file__).parent
@@ -54,26 +3466,103 @@ class ManualBrowserScraper:
         self.chain_info_output_dir = Path(chain_info_output_dir)
         self.chain_info_output_dir.mkdir(exist_ok=True, parents=True)
         
-        # 采集状态
-        self.is_collecting = False
+        # 采集调度器（替代全局 is_collecting 标志，支持多个页面并行采集）
+        self.scheduler = CollectionScheduler(
+            workers=collection_workers,
+            queue_size=collection_queue_size,
+            type_limits=collection_type_limits
+        )
+        
+        # 后台文件写入器（所有 _save_* 方法的磁盘写入都在写入线程中完成）
+        self.file_writer = AtomicFileWriter()
+        
+        # SVG内容寻址存储（blob保存在输出目录下的 .blobs 中）
+        self.svg_storage = svg_storage
+        self.svg_blob_store = SvgBlobStore(self.output_dir / ".blobs", self.file_writer)
+        
+        # 浏览器网络流量中捕获的SVG响应（提取SVG时优先使用，避免重复下载）
+        self.svg_response_cache = SvgResponseCache()
+        
+        # chain-info项目列表采集方式，以及按页面URL拦截到的项目列表接口数据
+        self.chain_info_mode = chain_info_mode
+        self.project_list_captures = OrderedDict()
+        # 正在进行的表格行流式采集（key: 规范化的页面URL）
+        self.project_row_streams = {}
+        
+        # 交互模式下每个打开的标签页的任务和监听器管理（key: Playwright页面对象）
+        self.page_supervisors = {}
+        
+        # 性能配置（浏览器操作延迟、固定等待、滚动次数和networkidle超时）
+        self.profile = resolve_performance_profile(performance_profile, profile_overrides)
+        logger.info("[性能配置] %s: slow_mo=%sms，批量采集%s", self.profile['name'], self.profile['slow_mo'],
+                    '无界面' if self.profile['headless'] else '有界面')
+        
+        # 请求拦截策略（由性能配置的 resource_policy 决定，None表示不拦截）
+        self.resource_policy = ResourcePolicy.from_config(self.profile.get("resource_policy"))
+        
+        # 各页面类型的就绪等待时间预算（秒），构造参数优先于性能配置
+        self.readiness_timeouts = dict(DEFAULT_READINESS_TIMEOUTS)
+        self.readiness_timeouts.update(self.profile.get("readiness_timeouts") or {})
+        if readiness_timeouts:
+            self.readiness_timeouts.update(readiness_timeouts)
+        
+        # 浏览器上下文回收策略（长时间运行时按采集次数或页面内存重启上下文）
+        self.context_recycler = ContextRecycler.from_profile(self.profile)
+        
+        # 采集指标（每次采集各阶段的耗时、下载和写入字节数），追加写入JSON Lines文件
+        if metrics_path is None:
+            metrics_path = self.output_dir / STATE_DIRNAME / DEFAULT_METRICS_FILENAME
+        self.metrics = MetricsRecorder(metrics_path) if metrics_path else None
+        
+        # 进程指标（Prometheus文本格式，通过本地HTTP端口或node-exporter textfile输出）
+        self.metrics_port = metrics_port
+        self.metrics_textfile = metrics_textfile
+        self.exporter = PrometheusExporter()
+        self.loop_monitor = LoopLagMonitor(
+            threshold=loop_lag_threshold,
+            on_sample=lambda lag: self.exporter.observe("event_loop_lag_seconds", lag)
+        )
+        self._active_context = None  # 当前浏览器上下文（用于统计打开的页面数）
+        self._last_collection_time = 0.0
+        self._register_exporter_metrics()
+        
+        # 是否无界面运行（批量采集模式下由 _launch_browser 设置）
+        self.headless = False
+        
+        # 用户交互状态
         self.user_interacting = False
         self.last_interaction_time = 0
         self.interaction_timeout = interaction_timeout  # 用户操作后N秒内不采集
         
+        # 采集状态持久化存储（已采集URL集合和数据哈希在重启后保留）
+        if state_db_path is None:
+            state_db_path = self._default_state_db_path()
+        load_start = time.perf_counter()
+        self.state_store = CrawlStateStore(state_db_path)
+        
         # 已采集的URL集合，避免重复采集（用于chain-detail页面）
-        self.collected_urls = set()
+        self.collected_urls = self.state_store.tracked_set("chain-detail")
         
         # 已采集的SVG URL集合（用于industry-chain页面），避免重复采集
-        self.collected_svg_urls = set()
+        self.collected_svg_urls = self.state_store.tracked_set("svg")
         
         # 已采集的项目列表URL集合（用于chain-info页面），避免重复采集
-        self.collected_chain_info_urls = set()
+        self.collected_chain_info_urls = self.state_store.tracked_set("chain-info")
         
         # 详情页数据哈希字典，用于检测数据更新（key: normalized_url, value: data_hash）
-        self.detail_page_data_hashes = {}
+        self.detail_page_data_hashes = self.state_store.tracked_dict("chain-detail")
+        
+        # 详情页上次采集时的SVG URL（key: normalized_url, value: SVG URL），快速检查时先比较URL
+        self.detail_page_svg_urls = self.state_store.tracked_dict("chain-detail-svg")
+        
+        # 浏览器未捕获到SVG响应时的下载客户端（按域名限速、限制并发、失败重试，ETag / Last-Modified 保存在状态存储中）
+        self.download_client = SvgDownloadClient.from_profile(self.profile)
+        if not SvgDownloadClient.pooling_available():
+            logger.warning("[下载] 未安装aiohttp，SVG直接下载不使用独立连接池（keep-alive），改用 context.request；"
+                           "如需连接池请安装: pip install aiohttp")
         
         # chain-info页面数据哈希字典，用于检测数据更新（key: normalized_url, value: data_hash）
-        self.chain_info_page_data_hashes = {}
+        self.chain_info_page_data_hashes = self.state_store.tracked_dict("chain-info")
         
         # product-details页面输出目录
         script_dir = Path(__file__).parent
@@ -81,10 +3570,20 @@ class ManualBrowserScraper:
         self.product_details_output_dir.mkdir(exist_ok=True, parents=True)
         
         # 已采集的product-details页面URL集合，避免重复采集
-        self.collected_product_details_urls = set()
+        self.collected_product_details_urls = self.state_store.tracked_set("product-details")
         
         # product-details页面数据哈希字典，用于检测数据更新（key: normalized_url, value: data_hash）
-        self.product_details_page_data_hashes = {}
+        self.product_details_page_data_hashes = self.state_store.tracked_dict("product-details")
+        
+        # chain_id -> 产业链名称映射（保存数据时写入，chain-info页面缺少产业链名称时直接查询）
+        chain_names = self.state_store.load_chain_names()
+        self.chain_names = {chain_id: name for chain_id, (name, _) in chain_names.items()}
+        self._latest_chain_name = max(chain_names.values(), key=lambda item: item[1])[0] if chain_names else ""
+        
+        load_ms = (time.perf_counter() - load_start) * 1000
+        logger.info("[状态存储] 已加载采集状态（%.1f ms）: chain-detail %s，SVG %s，chain-info %s，product-details %s", load_ms,
+                    len(self.collected_urls), len(self.collected_svg_urls), len(self.collected_chain_info_urls),
+                    len(self.collected_product_details_urls))
         
         # Persistent context选项
         self.use_persistent_context = use_persistent_context
@@ -94,238 +3593,86 @@ class ManualBrowserScraper:
             self.persistent_context_dir = script_dir / "chrome_cache"
         else:
             self.persistent_context_dir = Path(persistent_context_dir)
+        # 批量采集使用独立的浏览器上下文，登录状态（cookies、localStorage）通过该文件从交互模式的persistent context带过去
+        if storage_state_path is None:
+            self.storage_state_path = self.persistent_context_dir.with_name(
+                f"{self.persistent_context_dir.name}_storage_state.json")
+        else:
+            self.storage_state_path = Path(storage_state_path)
+    
+    def _default_state_db_path(self) -> Path:
+        """
+        默认的采集状态数据库路径（输出目录下的 .state/crawl_state.db）
+        
+        旧版本把数据库保存在脚本所在目录下，存在时移动到新位置（连同WAL文件），移动失败时继续使用旧位置
+        """
+        state_db_path = self.output_dir / STATE_DIRNAME / DEFAULT_STATE_DB_FILENAME
+        legacy_path = Path(__file__).parent / DEFAULT_STATE_DB_FILENAME
+        if state_db_path.exists() or not legacy_path.exists():
+            return state_db_path
+        try:
+            state_db_path.parent.mkdir(parents=True, exist_ok=True)
+            for suffix in ("-wal", "-shm", ""):
+                legacy_file = legacy_path.with_name(legacy_path.name + suffix)
+                if legacy_file.exists():
+                    shutil.move(str(legacy_file), str(state_db_path.with_name(state_db_path.name + suffix)))
+            logger.info("[状态存储] 已将采集状态数据库移动到: %s", state_db_path)
+            return state_db_path
+        except OSError as e:
+            logger.warning("[状态存储] 移动旧的采集状态数据库失败，继续使用 %s: %s", legacy_path, e)
+            return legacy_path
     
     async def start(self):
         """
         启动浏览器并开始监听
+        
+        交互模式需要用户在浏览器中操作，始终显示浏览器窗口（性能配置的 headless 只用于批量采集）
         """
+        if self.profile["headless"]:
+            logger.warning("[性能配置] %s 配置为无界面运行，但交互模式需要浏览器窗口，仍以有界面方式启动", self.profile['name'])
         async with async_playwright() as p:
-            import os
-            browser = None
-            context = None
-            is_chrome = False
-            
-            # 如果启用persistent context，直接使用它（不需要先启动browser）
-            if self.use_persistent_context:
-                # 使用固定的缓存目录（在脚本目录下）
-                # 确保目录存在
-                self.persistent_context_dir.mkdir(exist_ok=True, parents=True)
-                user_data_dir = str(self.persistent_context_dir)
-                
-                print(f"[浏览器] 使用Persistent Context（缓存持久化）")
-                print(f"[浏览器] 正在尝试使用系统安装的Chrome浏览器...")
-                print(f"[浏览器] 缓存目录: {user_data_dir}")
-                print(f"[浏览器] 注意：缓存将持久化保存，下次启动时会保留之前的缓存数据")
-                print(f"[浏览器] 注意：使用persistent context时，请确保没有其他Chrome实例在使用相同目录")
-                
-                try:
-                    # 使用launch_persistent_context来创建persistent context
-                    # 这会直接返回context，并且使用Chrome（如果可用）
-                    context = await p.chromium.launch_persistent_context(
-                        user_data_dir=user_data_dir,
-                        headless=False,
-                        slow_mo=100,
-                        channel='chrome',  # 使用系统安装的Chrome浏览器
-                        viewport=None,  # 禁用固定视口，允许窗口最大化
-                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        args=['--start-maximized']  # 启动时最大化窗口
-                    )
-                    
-                    # 对于persistent context，尝试获取browser对象（用于版本检查）
-                    try:
-                        # persistent context的pages[0].context.browser可以获取browser对象
-                        if context.pages:
-                            page_temp = context.pages[0]
-                            browser = page_temp.context.browser if hasattr(page_temp.context, 'browser') else None
-                        else:
-                            browser = None
-                        
-                        # 尝试获取版本信息
-                        if browser:
-                            try:
-                                # 确保 browser.version 是一个方法，而不是字符串
-                                if callable(getattr(browser, 'version', None)):
-                                    browser_version = await browser.version()
-                                else:
-                                    browser_version = "Chrome (通过Persistent Context)"
-                                    print(f"[浏览器] ⚠ 警告：无法通过标准方法获取版本信息")
-                                print(f"[浏览器] 浏览器版本: {browser_version}")
-                                # 检查版本信息确认是Chrome还是Chromium
-                                if 'chrome' in browser_version.lower() and 'chromium' not in browser_version.lower():
-                                    is_chrome = True
-                                    print(f"[浏览器] ✓ 确认使用Chrome浏览器（非Chromium）")
-                            except Exception as ver_err:
-                                print(f"[浏览器] 无法获取浏览器版本信息: {ver_err}")
-                                browser_version = "Chrome (通过Persistent Context)"
-                                is_chrome = True  # 使用channel='chrome'，假设是Chrome
-                        else:
-                            browser_version = "Chrome (通过Persistent Context)"
-                            print(f"[浏览器] 浏览器版本: {browser_version}")
-                            is_chrome = True  # 使用channel='chrome'，假设是Chrome
-                    except Exception as ver_e:
-                        print(f"[浏览器] 无法获取浏览器版本信息: {ver_e}")
-                        browser_version = "Chrome (通过Persistent Context)"
-                        is_chrome = True  # 使用channel='chrome'，假设是Chrome
-                    
-                    print(f"[浏览器] ✓ Persistent Context已创建，缓存将持久化保存")
-                except Exception as e:
-                    print(f"[浏览器] ✗ 使用Chrome创建Persistent Context失败: {e}")
-                    print(f"[浏览器] 回退到使用Chromium...")
-                    try:
-                        context = await p.chromium.launch_persistent_context(
-                            user_data_dir=user_data_dir,
-                            headless=False,
-                            slow_mo=100,
-                            viewport=None,  # 禁用固定视口，允许窗口最大化
-                            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                            args=['--start-maximized']  # 启动时最大化窗口
-                        )
-                        # 对于persistent context，尝试获取browser对象
-                        try:
-                            if context.pages:
-                                page_temp = context.pages[0]
-                                browser = page_temp.context.browser if hasattr(page_temp.context, 'browser') else None
-                            else:
-                                browser = None
-                            
-                            if browser:
-                                try:
-                                    # 确保 browser.version 是一个方法，而不是字符串
-                                    if callable(getattr(browser, 'version', None)):
-                                        browser_version = await browser.version()
-                                    else:
-                                        browser_version = "Chromium (通过Persistent Context)"
-                                except:
-                                    browser_version = "Chromium (通过Persistent Context)"
-                            else:
-                                browser_version = "Chromium (通过Persistent Context)"
-                        except:
-                            browser = None
-                            browser_version = "未知"
-                        
-                        print(f"[浏览器] ✓ 使用Chromium创建Persistent Context")
-                        print(f"[浏览器] 浏览器版本: {browser_version}")
-                    except Exception as e2:
-                        print(f"[浏览器] ✗ Persistent Context创建失败: {e2}")
-                        raise
-            else:
-                # 不使用persistent context，使用常规方式启动
-                print("[浏览器] 正在尝试使用系统安装的Chrome浏览器...")
-                
-                try:
-                    browser = await p.chromium.launch(
-                        headless=False,
-                        slow_mo=100,
-                        channel='chrome',  # 使用系统安装的Chrome浏览器（channel方式）
-                        args=['--start-maximized']  # 启动时最大化窗口
-                    )
-                    
-                    # 验证是否真的在使用Chrome
-                    if browser:
-                        try:
-                            # 安全地获取版本信息
-                            version_attr = getattr(browser, 'version', None)
-                            if version_attr and callable(version_attr):
-                                browser_version = await version_attr()
-                            elif isinstance(version_attr, str):
-                                browser_version = version_attr
-                            else:
-                                browser_version = "Chrome (版本信息不可用)"
-                                print(f"[浏览器] ⚠ 警告：无法通过标准方法获取版本信息")
-                            print(f"[浏览器] ✓ 成功使用系统安装的Chrome浏览器")
-                            print(f"[浏览器] 浏览器版本: {browser_version}")
-                            
-                            # 检查版本信息确认是Chrome还是Chromium
-                            if isinstance(browser_version, str) and 'chrome' in browser_version.lower() and 'chromium' not in browser_version.lower():
-                                is_chrome = True
-                                print(f"[浏览器] ✓ 确认使用Chrome浏览器（非Chromium）")
-                            else:
-                                print(f"[浏览器] ⚠ 警告：可能使用的是Chromium而非Chrome")
-                        except (TypeError, AttributeError) as ver_err:
-                            print(f"[浏览器] ⚠ 获取版本信息时出错: {ver_err}")
-                            browser_version = "Chrome (版本信息获取失败)"
-                            is_chrome = True  # 使用channel='chrome'，假设是Chrome
-                        except Exception as ver_err:
-                            print(f"[浏览器] ⚠ 获取版本信息时出错: {ver_err}")
-                            browser_version = "Chrome (版本信息获取失败)"
-                            is_chrome = True  # 使用channel='chrome'，假设是Chrome
-                    else:
-                        print(f"[浏览器] ⚠ 警告：无法获取浏览器对象")
-                        
-                except Exception as e:
-                    # 如果系统没有安装Chrome，回退到Chromium
-                    print(f"[浏览器] ✗ 未找到系统Chrome: {e}")
-                    print("[浏览器] 回退到使用Chromium浏览器...")
-                    try:
-                        browser = await p.chromium.launch(
-                            headless=False,
-                            slow_mo=100,
-                            args=['--start-maximized']  # 启动时最大化窗口
-                        )
-                        if browser:
-                            try:
-                                # 安全地获取版本信息
-                                version_attr = getattr(browser, 'version', None)
-                                if version_attr and callable(version_attr):
-                                    browser_version = await version_attr()
-                                elif isinstance(version_attr, str):
-                                    browser_version = version_attr
-                                else:
-                                    browser_version = "Chromium (版本信息不可用)"
-                                    print(f"[浏览器] ⚠ 警告：无法通过标准方法获取版本信息")
-                                print(f"[浏览器] ✓ 使用Chromium浏览器")
-                                print(f"[浏览器] 浏览器版本: {browser_version}")
-                            except (TypeError, AttributeError) as ver_err:
-                                print(f"[浏览器] ⚠ 获取版本信息时出错: {ver_err}")
-                                browser_version = "Chromium (版本信息获取失败)"
-                                print(f"[浏览器] ✓ 使用Chromium浏览器")
-                                print(f"[浏览器] 浏览器版本: {browser_version}")
-                            except Exception as ver_err:
-                                print(f"[浏览器] ⚠ 获取版本信息时出错: {ver_err}")
-                                browser_version = "Chromium (版本信息获取失败)"
-                                print(f"[浏览器] ✓ 使用Chromium浏览器")
-                                print(f"[浏览器] 浏览器版本: {browser_version}")
-                        else:
-                            print(f"[浏览器] ⚠ 警告：无法获取浏览器对象")
-                    except Exception as e2:
-                        print(f"[浏览器] ✗ Chromium启动失败: {e2}")
-                        raise
-                
-                if browser is None:
-                    raise Exception("无法启动浏览器")
-                
-                # 创建浏览器上下文
-                context_options = {
-                    'viewport': None,  # 禁用固定视口，允许窗口最大化
-                    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                }
-                
-                # 显示浏览器信息
-                if is_chrome:
-                    print(f"[浏览器] 提示：当前使用独立的用户数据目录，不会与正在运行的Chrome共享缓存")
-                    print(f"[浏览器] 如需共享缓存，可以在初始化时设置 use_persistent_context=True")
-                
-                context = await browser.new_context(**context_options)
+            browser, context = await self._launch_browser(p)
             
             # 创建新页面
             # 对于persistent context，如果已经有页面，使用第一个页面，否则创建新页面
             if self.use_persistent_context and context.pages:
                 page = context.pages[0]
-                print(f"[浏览器] 使用Persistent Context的现有页面")
+                logger.info("[浏览器] 使用Persistent Context的现有页面")
             else:
                 page = await context.new_page()
             
-            # 设置窗口最大化（保持最大化状态）
-            await self._set_window_maximized(page)
+            # 启动采集调度器和状态存储的后台批量写入
+            self.scheduler.start()
+            state_flush_task = asyncio.create_task(self.state_store.run_flusher())
+            exporter_tasks = await self._start_exporter()
             
-            # 存储所有页面，用于在新标签页中设置监听
-            pages = [page]
+            # 监听SVG输出目录，同步其他进程写入的产业链文件
+            if self.watch_output_dir:
+                if self.chain_index.start_watching():
+                    logger.info("[产业链索引] 正在监听输出目录: %s", self.output_dir)
+                else:
+                    logger.info("[产业链索引] 未安装watchdog，不监听输出目录（只跟踪本进程写入的文件）")
+            
+            # 每次页面导航后重新注入监听器（主页面和新标签页共用）
+            async def re_inject_on_navigation(frame, maximize=True):
+                if frame == frame.page.main_frame:
+                    await asyncio.sleep(0.5)  # 等待页面初始化
+                    if maximize:
+                        await self._set_window_maximized(frame.page)  # 恢复窗口最大化
+                    await self._ensure_page_scrollable(frame.page)  # 确保页面可滚动
+                    await self._inject_route_listeners_to_page(frame.page, context)
+                    
+                    # 如果是industry-chain页面，也注入SVG URL监听器
+                    current_url = frame.page.url
+                    if "/industry-chain" in current_url:
+                        logger.debug("[检测到industry-chain页面] 注入SVG URL监听器: %s", current_url)
+                        await self._inject_svg_url_listener_to_page(frame.page, context)
             
             # 监听新标签页创建
             async def handle_new_page(new_page):
                 """处理新打开的标签页"""
-                print(f"\n[新标签页] 检测到新标签页打开: {new_page.url}")
-                pages.append(new_page)
+                logger.info("[新标签页] 检测到新标签页打开: %s（%s）", new_page.url, self._page_task_summary())
+                new_supervisor = self._supervise_page(new_page)
                 
                 # 延迟设置，确保页面已加载
                 await asyncio.sleep(0.5)
@@ -347,9 +3694,7 @@ class ManualBrowserScraper:
                 async def handle_new_page_navigation(frame):
                     await self._handle_navigation(frame, context)
                 
-                new_page.on("framenavigated", lambda frame: asyncio.create_task(
-                    handle_new_page_navigation(frame)
-                ))
+                new_supervisor.on("framenavigated", handle_new_page_navigation)
                 
                 # 监听新标签页的加载事件
                 async def handle_new_page_load():
@@ -357,40 +3702,23 @@ class ManualBrowserScraper:
                         url = new_page.url
                         normalized_url = self._normalize_url(url)
                         if "/chain-detail" in url and normalized_url not in self.collected_urls:
-                            print(f"\n[新标签页加载] 检测到目标URL: {url}")
-                            await asyncio.sleep(3)
+                            logger.info("[新标签页加载] 检测到目标URL: %s", url)
                             await self._handle_navigation(new_page.main_frame, context)
                     except Exception as e:
-                        print(f"[新标签页加载事件错误] {e}")
+                        logger.error("[新标签页加载事件错误] %s", e)
                 
-                new_page.on("load", lambda: asyncio.create_task(handle_new_page_load()))
+                new_supervisor.on("load", handle_new_page_load)
                 
-                # 在新标签页中启动URL检查任务
-                async def check_new_page_url():
-                    last_url = new_page.url
-                    while True:
-                        try:
-                            await asyncio.sleep(0.2)
-                            current_url = new_page.url
-                            if current_url != last_url and "/chain-detail" in current_url:
-                                normalized_url = self._normalize_url(current_url)
-                                if normalized_url not in self.collected_urls:
-                                    print(f"\n[新标签页URL检测] 检测到URL变化: {last_url} -> {current_url}")
-                                    last_url = current_url
-                                    await asyncio.sleep(2)
-                                    await self._handle_navigation(new_page.main_frame, context)
-                            elif current_url != last_url:
-                                last_url = current_url
-                        except Exception as e:
-                            await asyncio.sleep(0.5)
+                # 导航后重新注入监听器，SPA路由变化由注入脚本通过页面事件绑定推送
+                # （新标签页与主窗口共用窗口，不恢复最大化，避免窗口位置被重置）
+                async def re_inject_new_page(frame):
+                    await re_inject_on_navigation(frame, maximize=False)
                 
-                asyncio.create_task(check_new_page_url())
-            
-            # 监听浏览器上下文的新页面事件
-            context.on("page", lambda new_page: asyncio.create_task(handle_new_page(new_page)))
-            
-            # 设置用户交互监听
-            await self._setup_interaction_listeners(page)
+                new_supervisor.on("framenavigated", re_inject_new_page)
+                
+                # 如果新标签页打开时已经是industry-chain页面，立即注入SVG URL监听器
+                if "/industry-chain" in new_page.url:
+                    await self._inject_svg_url_listener_to_page(new_page, context)
             
             # 监听页面导航事件
             async def handle_framenavigated(frame):
@@ -402,34 +3730,71 @@ class ManualBrowserScraper:
                     pass
                 await self._handle_navigation(frame, context)
             
-            page.on("framenavigated", lambda frame: asyncio.create_task(
-                handle_framenavigated(frame)
-            ))
+            # 监听页面加载完成事件
+            async def handle_load():
+                try:
+                    url = page.url
+                    if "/industry-chain" in url:
+                        logger.info("[页面加载完成] 检测到industry-chain页面: %s", url)
+                        await asyncio.sleep(1)
+                        await self._inject_svg_url_listener_to_page(page, context)
+                    elif "chain-info" in url:
+                        logger.info("[页面加载完成] 检测到chain-info页面: %s", url)
+                        await asyncio.sleep(1)
+                        # 检查是否已经采集过
+                        normalized_url = self._normalize_url(url)
+                        if normalized_url not in self.collected_chain_info_urls:
+                            logger.info("[触发采集] 检测到未采集的chain-info页面，开始采集...")
+                            await self._submit_collection(
+                                "chain-info", normalized_url,
+                                lambda: self._handle_chain_info_page(page.main_frame, context, url)
+                            )
+                except Exception as e:
+                    logger.error("[加载事件错误] %s", e)
+            
+            # 浏览器上下文级别的监听（启动时和每次回收上下文后调用）
+            async def setup_context():
+                self._active_context = context
+                
+                # 捕获浏览器加载的SVG响应（所有标签页）
+                context.on("response", self._on_context_response)
+                await self._install_resource_policy(context)
+            
+                # 注册页面事件绑定：注入的路由/SVG监听脚本通过该回调主动推送变化，
+                # 取代此前对 page.url 和 window 标志位的高频轮询
+                await context.expose_binding(
+                    PAGE_EVENT_BINDING,
+                    lambda source, event: self._on_page_event(source, event, context)
+                )
+                
+                # 监听浏览器上下文的新页面事件（初始化任务归属新页面，页面很快关闭时一并取消）
+                context.on("page", lambda new_page: self._supervise_page(new_page).spawn(
+                    handle_new_page(new_page), name="handle_new_page"
+                ))
             
-            # 监听页面URL变化（处理SPA路由跳转）- 作为备用检测
-            last_url = page.url
-            async def check_url_change():
-                nonlocal last_url
-                while True:
-                    try:
-                        await asyncio.sleep(0.5)  # 更频繁地检查
-                        current_url = page.url
-                        if current_url != last_url:
-                            print(f"\n[URL轮询检测] {last_url} -> {current_url}")
-                            last_url = current_url
-                            # 如果是目标URL且未采集过，触发采集
-                            if "/chain-detail" in current_url:
-                                normalized_url = self._normalize_url(current_url)
-                                if normalized_url not in self.collected_urls:
-                                    print(f"[触发采集] 轮询检测到目标URL: {current_url}")
-                                    await asyncio.sleep(3)  # 等待页面加载
-                                    await self._handle_navigation(page.main_frame, context)
-                    except Exception as e:
-                        print(f"[URL监听错误] {e}")
-                        await asyncio.sleep(1)
+            # 主页面的窗口、交互监听和导航监听（启动时和每次回收上下文后调用）
+            async def setup_main_page():
+                # 设置窗口最大化（保持最大化状态）
+                await self._set_window_maximized(page)
+                
+                # 所有打开的页面由各自的 PageSupervisor 管理，页面关闭时取消其任务并移除监听器
+                supervisor = self._supervise_page(page)
+                
+                # 设置用户交互监听
+                await self._setup_interaction_listeners(page)
+                
+                # 监听页面导航和加载完成事件
+                supervisor.on("framenavigated", handle_framenavigated)
+                supervisor.on("load", handle_load)
+                
+                # 为当前页面注入路由监听器
+                await self._inject_route_listeners_to_page(page, context)
+                
+                # 每次页面导航后重新注入监听器
+                supervisor.on("framenavigated", re_inject_on_navigation)
             
-            # 启动URL变化监听任务（备用检测）
-            url_check_task = asyncio.create_task(check_url_change())
+            await setup_context()
+            await setup_main_page()
             
             # 启动详情页数据更新检查任务（定期轮询）
             async def check_detail_page_updates():
@@ -437,32 +3802,41 @@ class ManualBrowserScraper:
                 定期检查详情页、chain-info和product-details页面数据是否有更新
                 每30秒检查一次当前打开的页面
                 """
+                last_summary = None
                 while True:
                     try:
                         await asyncio.sleep(30)  # 每30秒检查一次
                         
+                        # 页面任务数有变化时输出，便于发现任务堆积
+                        summary = self._page_task_summary()
+                        if summary != last_summary:
+                            logger.info("[页面任务] %s", summary)
+                            last_summary = summary
+                        
                         # 检查所有打开的页面
-                        for current_page in pages:
+                        for current_page in self._open_pages():
                             try:
                                 current_url = current_page.url
                                 normalized_url = self._normalize_url(current_url)
                                 
-                                # 如果正在采集，跳过本次检查
-                                if self.is_collecting:
+                                # 如果该页面正在排队或采集中，跳过本次检查
+                                if self.scheduler.is_in_flight(self._collection_key("chain-detail", normalized_url)):
                                     continue
                                 
                                 # 检查chain-detail页面
                                 if "/chain-detail" in current_url:
                                     # 如果已经采集过，检查数据是否有更新
                                     if normalized_url in self.collected_urls:
-                                        print(f"\n[定期检查] 检查详情页数据更新: {normalized_url}")
+                                        logger.info("[定期检查] 检查详情页数据更新: %s", normalized_url)
                                         data_updated = await self._quick_check_data_update(current_page, normalized_url, context)
                                         if data_updated:
-                                            print(f"[定期检查] 检测到数据更新，触发重新采集: {normalized_url}")
-                                            # 等待页面稳定
-                                            await asyncio.sleep(3)
-                                            # 触发重新采集
-                                            await self._handle_chain_detail_page(current_page.main_frame, context, current_url)
+                                            logger.info("[定期检查] 检测到数据更新，触发重新采集: %s", normalized_url)
+                                            
+                                            async def recollect(target_page=current_page, target_url=current_url):
+                                                await self._handle_chain_detail_page(target_page.main_frame, context, target_url)
+                                            
+                                            # 触发重新采集（交给调度器执行，不阻塞定期检查）
+                                            await self._submit_collection("chain-detail", normalized_url, recollect)
                                 
                                 # 检查chain-info页面（chain-info只采集一遍，不进行数据更新检测）
                                 elif "/chain-info" in current_url:
@@ -481,33 +3855,12 @@ class ManualBrowserScraper:
                                 # 单个页面检查失败不影响其他页面
                                 continue
                     except Exception as e:
-                        print(f"[定期检查错误] {e}")
+                        logger.error("[定期检查错误] %s", e)
                         await asyncio.sleep(5)
             
             # 启动数据更新检查任务
             update_check_task = asyncio.create_task(check_detail_page_updates())
             
-            # 监听页面加载完成事件
-            async def handle_load():
-                try:
-                    url = page.url
-                    if "/industry-chain" in url:
-                        print(f"\n[页面加载完成] 检测到industry-chain页面: {url}")
-                        await asyncio.sleep(1)
-                        await self._inject_svg_url_listener_to_page(page, context)
-                    elif "chain-info" in url:
-                        print(f"\n[页面加载完成] 检测到chain-info页面: {url}")
-                        await asyncio.sleep(1)
-                        # 检查是否已经采集过
-                        normalized_url = self._normalize_url(url)
-                        if normalized_url not in self.collected_chain_info_urls:
-                            print(f"[触发采集] 检测到未采集的chain-info页面，开始采集...")
-                            await self._handle_chain_info_page(page.main_frame, context, url)
-                except Exception as e:
-                    print(f"[加载事件错误] {e}")
-            
-            page.on("load", lambda: asyncio.create_task(handle_load()))
-            
             print("=" * 80)
             print("产业链数据采集工具已启动")
             print("=" * 80)
@@ -525,218 +3878,860 @@ class ManualBrowserScraper:
             print("\n等待页面导航...")
             print(f"当前URL: {page.url}\n")
             
-            # 为当前页面注入路由监听器
-            await self._inject_route_listeners_to_page(page, context)
+            # 启动窗口最大化保持任务（仅在窗口被改变时恢复最大化）
+            async def keep_window_maximized():
+                last_window_states = {}  # 记录每个页面的窗口状态
+                while True:
+                    try:
+                        await asyncio.sleep(5)  # 每5秒检查一次（降低频率）
+                        # 检查所有页面的窗口状态（丢弃已关闭页面的记录）
+                        open_pages = self._open_pages()
+                        open_ids = {id(p) for p in open_pages}
+                        for page_id in [k for k in last_window_states if k not in open_ids]:
+                            del last_window_states[page_id]
+                        for p in open_pages:
+                            try:
+                                # 检查窗口是否被改变（不再是最大化）
+                                window_state = await p.evaluate("""
+                                    () => ({
+                                        width: window.outerWidth,
+                                        height: window.outerHeight,
+                                        screenWidth: window.screen.availWidth,
+                                        screenHeight: window.screen.availHeight
+                                    })
+                                """)
+                                
+                                page_id = id(p)
+                                last_state = last_window_states.get(page_id)
+                                
+                                # 只在窗口明显被改变时才恢复最大化（允许用户手动调整）
+                                if window_state:
+                                    is_maximized = (window_state['width'] >= window_state['screenWidth'] - 10 and 
+                                                   window_state['height'] >= window_state['screenHeight'] - 10)
+                                    
+                                    # 如果窗口从最大化变为非最大化，且不是用户刚刚调整的，才恢复
+                                    if last_state and last_state.get('was_maximized') and not is_maximized:
+                                        # 等待一下，确认不是用户正在调整
+                                        await asyncio.sleep(1)
+                                        # 再次检查，如果还是非最大化，才恢复
+                                        current_state = await p.evaluate("""
+                                            () => ({
+                                                width: window.outerWidth,
+                                                height: window.outerHeight,
+                                                screenWidth: window.screen.availWidth,
+                                                screenHeight: window.screen.availHeight
+                                            })
+                                        """)
+                                        if current_state:
+                                            still_not_maximized = (current_state['width'] < current_state['screenWidth'] - 10 or 
+                                                                  current_state['height'] < current_state['screenHeight'] - 10)
+                                            if still_not_maximized:
+                                                await self._set_window_maximized(p)
+                                    
+                                    last_window_states[page_id] = {
+                                        'was_maximized': is_maximized,
+                                        'state': window_state
+                                    }
+                            except:
+                                pass
+                    except:
+                        await asyncio.sleep(1)
+            
+            window_maximize_task = asyncio.create_task(keep_window_maximized())
+            
+            # 打开一个初始页面（可选）
+            await page.goto("about:blank")
+            
+            def user_tabs_open() -> bool:
+                """浏览器中是否还有用户打开的网页（about:blank 等空白页不算）"""
+                for open_page in self._open_pages():
+                    try:
+                        if open_page.url.startswith("http"):
+                            return True
+                    except Exception:
+                        pass
+                return False
+            
+            # 回收浏览器上下文：保存采集状态，关闭页面和上下文，使用相同的persistent context目录重新启动，
+            # 重新注册上下文和主页面的监听（导航后的路由/SVG监听器注入由导航事件自动完成）
+            # 只在用户没有打开任何网页时回收，不会关闭用户正在使用的标签页（有打开的网页时见 recycle_pages）
+            async def recycle_context(reason):
+                nonlocal browser, context, page
+                logger.info("[上下文回收] %s，重启浏览器上下文...", reason)
+                
+                # 保存采集状态和待写入的文件
+                await asyncio.to_thread(self.state_store.flush)
+                await asyncio.to_thread(self.file_writer.flush)
+                
+                for page_supervisor in list(self.page_supervisors.values()):
+                    page_supervisor.close()
+                try:
+                    await context.close()
+                    if browser:
+                        await browser.close()
+                except Exception as e:
+                    logger.warning("[上下文回收] 关闭浏览器上下文出错: %s", e)
+                # 旧上下文的响应缓存和接口拦截结果不再有用
+                self.svg_response_cache.clear()
+                self.project_list_captures.clear()
+                
+                browser, context = await self._launch_browser(p, headless=self.headless)
+                page = context.pages[0] if context.pages else await context.new_page()
+                await setup_context()
+                await setup_main_page()
+                self.context_recycler.reset(self.scheduler.completed)
+                await page.goto("about:blank")
+                logger.info("[上下文回收] 已完成第 %s 次回收（%s）", self.context_recycler.recycles, self._page_task_summary())
+            
+            # 逐页回收：用户还打开着网页时不重启上下文，清空进程内的缓存，
+            # 并重新加载不可见的后台标签页释放其JS堆（用户正在查看的标签页不受影响）
+            async def recycle_pages(reason):
+                self.svg_response_cache.clear()
+                self.project_list_captures.clear()
+                reloaded = 0
+                for open_page in self._open_pages():
+                    try:
+                        if not open_page.url.startswith("http"):
+                            continue
+                        if await open_page.evaluate("document.visibilityState") != "hidden":
+                            continue
+                        await open_page.reload(wait_until="domcontentloaded")
+                        reloaded += 1
+                    except Exception as e:
+                        logger.debug("[上下文回收] 重新加载后台标签页失败: %s", e)
+                self.context_recycler.reset(self.scheduler.completed)
+                logger.info("[上下文回收] %s，浏览器中还有打开的网页，已清空缓存并重新加载 %s 个后台标签页"
+                            "（关闭所有网页后才会重启浏览器上下文）", reason, reloaded)
+            
+            # 非persistent context重启后会丢失登录状态（cookies），交互模式下不回收
+            recycle_enabled = self.context_recycler.enabled and self.use_persistent_context
+            if self.context_recycler.enabled and not self.use_persistent_context:
+                logger.info("[上下文回收] 未使用persistent context，交互模式下不回收浏览器上下文（重启会丢失登录状态）")
+            
+            try:
+                # 保持运行，等待用户操作；没有正在进行的采集时检查是否需要回收：
+                # 用户没有打开网页时重启浏览器上下文，否则逐页回收
+                while True:
+                    await asyncio.sleep(1)
+                    if recycle_enabled and self.scheduler.in_flight_count == 0:
+                        reason = await self.context_recycler.check(context, self._open_pages(), self.scheduler.completed)
+                        if not reason:
+                            continue
+                        if user_tabs_open():
+                            await recycle_pages(reason)
+                        else:
+                            await recycle_context(reason)
+            except KeyboardInterrupt:
+                logger.info("正在关闭浏览器...")
+            finally:
+                # 停止采集调度器和指标服务，写入剩余的文件和采集状态
+                await self.scheduler.stop()
+                await self._stop_exporter(exporter_tasks)
+                await self.download_client.close()
+                await asyncio.to_thread(self.file_writer.close)
+                if self.metrics:
+                    await asyncio.to_thread(self.metrics.close)
+                state_flush_task.cancel()
+                try:
+                    await state_flush_task
+                except asyncio.CancelledError:
+                    pass
+                self.state_store.close()
+                self.chain_index.stop_watching()
+                if self.resource_policy:
+                    logger.info("[请求拦截] %s", self.resource_policy.summary())
+                
+                # 取消所有监听任务
+                update_check_task.cancel()
+                window_maximize_task.cancel()
+                try:
+                    await update_check_task
+                except asyncio.CancelledError:
+                    pass
+                try:
+                    await window_maximize_task
+                except asyncio.CancelledError:
+                    pass
+                
+                # 取消各页面仍在运行的任务
+                logger.info("[页面任务] 关闭前: %s", self._page_task_summary())
+                for page_supervisor in list(self.page_supervisors.values()):
+                    page_supervisor.close()
+                
+                # 关闭浏览器或context
+                if self.use_persistent_context and context:
+                    # 对于persistent context，关闭context即可
+                    await context.close()
+                    logger.info("浏览器已关闭（Persistent Context）")
+                elif browser:
+                    await browser.close()
+                    logger.info("浏览器已关闭")
+                else:
+                    logger.info("浏览器已关闭（无需关闭）")
+    
+    async def run_batch(self, seed_urls, concurrency=4, max_depth=1, max_pages=None, refresh=False,
+                        headless=None, page_timeout=60):
+        """
+        无人值守批量采集：从种子URL开始用N个并发页面采集，并从采集结果中发现后续URL
+        （例如chain-info项目列表中的 project_url），复用交互模式的提取和保存逻辑
+        
+        Args:
+            seed_urls: 种子URL列表（industry-chain / chain-info / chain-detail / product-details 页面）
+            concurrency: 并发页面数，默认4
+            max_depth: 最大发现深度，默认1（种子页面 + 从种子页面发现的页面）
+            max_pages: 最多采集的页面数，None表示不限制
+            refresh: 已采集过的页面也重新采集，默认False
+            headless: 是否无界面运行，None表示使用性能配置
+            page_timeout: 页面导航超时时间（秒），默认60
+            
+        Returns:
+            dict: 批量采集统计
+        """
+        frontier = UrlFrontier(self._normalize_url, max_depth=max_depth, max_pages=max_pages)
+        for url in seed_urls:
+            url = url.strip()
+            if url and not url.startswith('#'):
+                frontier.add(url, 0, self._page_type_from_url(url))
+        
+        stats = {"seeds": frontier.added}
+        if not frontier.added:
+            logger.info("[批量采集] 没有可采集的种子URL")
+            return stats
+        
+        logger.info("[批量采集] 种子URL: %s 个，并发页面: %s，最大深度: %s，%s", frontier.added, concurrency, max_depth,
+                    '重新采集已采集页面' if refresh else '跳过已采集页面')
+        batch_start = time.perf_counter()
+        if headless is None:
+            headless = self.profile["headless"]
+        
+        async with async_playwright() as p:
+            state_flush_task = asyncio.create_task(self.state_store.run_flusher())
+            exporter_tasks = await self._start_exporter()
+            browser = context = None
+            try:
+                storage_state = await self._prepare_batch_login_state(p)
+                while True:
+                    # 使用独立的浏览器上下文，避免与正在运行的交互模式实例争用persistent context目录；
+                    # 登录状态通过从persistent context导出的 storage_state 加载
+                    browser, context = await self._launch_browser(p, headless=headless, persistent=False,
+                                                                  storage_state=storage_state)
+                    self._active_context = context
+                    context.on("response", self._on_context_response)
+                    await self._install_resource_policy(context)
+                    
+                    # 页面事件绑定（chain-info表格行流式采集通过它推送数据）
+                    await context.expose_binding(
+                        PAGE_EVENT_BINDING,
+                        lambda source, event, context=context: self._on_page_event(source, event, context)
+                    )
+                    
+                    reason = await self._run_batch_round(context, frontier, concurrency, refresh, page_timeout)
+                    if reason is None:
+                        break
+                    
+                    # 回收浏览器上下文：保存采集状态后关闭，用新的上下文继续采集剩余URL
+                    logger.info("[上下文回收] %s，重启浏览器上下文（待采集 %s）...", reason, frontier.pending)
+                    await asyncio.to_thread(self.state_store.flush)
+                    await asyncio.to_thread(self.file_writer.flush)
+                    await context.close()
+                    if browser:
+                        await browser.close()
+                    browser = context = None
+                    self.svg_response_cache.clear()
+                    self.project_list_captures.clear()
+                    self.context_recycler.reset(frontier.completed + frontier.failed)
+            finally:
+                # 停止指标服务，写入剩余的文件和采集状态
+                await self._stop_exporter(exporter_tasks)
+                await self.download_client.close()
+                state_flush_task.cancel()
+                try:
+                    await state_flush_task
+                except asyncio.CancelledError:
+                    pass
+                await asyncio.to_thread(self.file_writer.close)
+                if self.metrics:
+                    await asyncio.to_thread(self.metrics.close)
+                self.state_store.close()
+                
+                if context:
+                    await context.close()
+                if browser:
+                    await browser.close()
+        
+        elapsed = time.perf_counter() - batch_start
+        stats.update({
+            "added": frontier.added,
+            "completed": frontier.completed,
+            "failed": frontier.failed,
+            "duplicates": frontier.duplicates,
+            "context_recycles": self.context_recycler.recycles,
+            "elapsed_seconds": round(elapsed, 1),
+        })
+        logger.info("[批量采集] 完成: %s 个页面，失败 %s 个，耗时 %.1f 秒（%.2f 页/秒）", frontier.completed, frontier.failed, elapsed,
+                    frontier.completed / elapsed if elapsed else 0)
+        if self.resource_policy:
+            stats["blocked_requests"] = self.resource_policy.blocked
+            stats["estimated_bytes_saved"] = self.resource_policy.estimated_bytes_saved
+            logger.info("[请求拦截] %s", self.resource_policy.summary())
+        return stats
+    
+    async def _run_batch_round(self, context, frontier, concurrency, refresh, page_timeout):
+        """
+        在一个浏览器上下文中运行批量采集worker，直到所有URL采集完成或需要回收上下文
+        
+        Args:
+            context: 浏览器上下文对象
+            frontier: UrlFrontier
+            concurrency: 并发页面数
+            refresh: 已采集过的页面也重新采集
+            page_timeout: 页面导航超时时间（秒）
+            
+        Returns:
+            str: 需要回收上下文时返回原因（worker已完成手头的URL并退出），全部采集完成返回None；
+                遇到未登录页面时抛出 LoginRequiredError
+        """
+        stop_event = asyncio.Event()
+        login_failure = asyncio.get_running_loop().create_future()
+        attempts_before = frontier.completed + frontier.failed + frontier.retried
+        workers = [
+            asyncio.create_task(self._batch_worker(idx, context, frontier, refresh, page_timeout, stop_event,
+                                                   login_failure))
+            for idx in range(max(1, int(concurrency)))
+        ]
+        join_task = asyncio.create_task(frontier.join())
+        # worker无法创建新页面时会退出，全部退出后不会再有URL完成，不能只等待 frontier.join()
+        workers_task = asyncio.ensure_future(asyncio.gather(*workers, return_exceptions=True))
+        waiters = {join_task, workers_task, login_failure}
+        monitor_task = None
+        if self.context_recycler.enabled:
+            monitor_task = asyncio.create_task(self._watch_batch_recycle(context, frontier, stop_event))
+            waiters.add(monitor_task)
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            if login_failure.done():
+                # 未登录：中止批量采集，不再保存任何页面
+                raise login_failure.exception()
+            if join_task.done():
+                return None
+            if workers_task.done() and not stop_event.is_set():
+                if frontier.pending == 0:
+                    return None
+                if frontier.completed + frontier.failed + frontier.retried == attempts_before:
+                    raise RuntimeError("批量采集worker全部退出且没有采集任何URL，浏览器上下文不可用")
+                return "批量采集worker全部退出（浏览器上下文不可用）"
+            # 需要回收：等待各worker完成手头的URL后退出
+            await asyncio.gather(*workers, return_exceptions=True)
+            if login_failure.done():
+                raise login_failure.exception()
+            if join_task.done() or frontier.pending == 0:
+                return None
+            return monitor_task.result()
+        finally:
+            pending = [task for task in [join_task, monitor_task, workers_task, *workers] if task and not task.done()]
+            if not login_failure.done():
+                login_failure.cancel()
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _watch_batch_recycle(self, context, frontier, stop_event):
+        """
+        批量采集时定期检查是否需要回收浏览器上下文，需要时通知worker停止领取新URL
+        
+        Args:
+            context: 浏览器上下文对象
+            frontier: UrlFrontier
+            stop_event: 通知worker停止的asyncio.Event
+            
+        Returns:
+            str: 回收原因
+        """
+        while True:
+            await asyncio.sleep(min(5.0, self.context_recycler.check_interval))
+            reason = await self.context_recycler.check(context, context.pages, frontier.completed + frontier.failed)
+            if reason:
+                stop_event.set()
+                return reason
+    
+    async def _batch_worker(self, idx, context, frontier, refresh, page_timeout, stop_event=None, login_failure=None):
+        """
+        批量采集worker：使用一个独立页面依次采集队列中的URL
+        
+        Args:
+            idx: worker编号
+            context: 浏览器上下文对象
+            frontier: UrlFrontier
+            refresh: 已采集过的页面也重新采集
+            page_timeout: 页面导航超时时间（秒）
+            stop_event: 被设置后完成手头的URL即退出（回收浏览器上下文）
+            login_failure: 遇到未登录页面时设置异常的Future（通知批量采集中止）
+        """
+        page = await context.new_page()
+        try:
+            while True:
+                item = await frontier.get(stop_event)
+                if item is None:
+                    return
+                try:
+                    discovered = await self._collect_batch_url(page, context, item, refresh, page_timeout)
+                    for url in discovered:
+                        frontier.add(url, item["depth"] + 1, self._page_type_from_url(url))
+                    frontier.completed += 1
+                except asyncio.CancelledError:
+                    raise
+                except LoginRequiredError as e:
+                    # 登录状态失效时其他URL也只会得到未登录页面，通知批量采集中止
+                    logger.error("[批量采集] worker %s 遇到未登录页面，中止批量采集: %s", idx, e)
+                    if login_failure is not None and not login_failure.done():
+                        login_failure.set_exception(e)
+                    return
+                except Exception as e:
+                    logger.warning("[批量采集] worker %s 采集失败（第 %s 次）: %s: %s", idx, item['attempt'], item['url'], e)
+                    if not frontier.retry(item):
+                        frontier.failed += 1
+                    # 页面可能已处于异常状态，换一个新页面继续
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                    try:
+                        page = await context.new_page()
+                    except Exception as e:
+                        # 上下文已不可用（如浏览器被关闭），本worker退出，剩余URL由其他worker或下一个上下文继续采集
+                        logger.error("[批量采集] worker %s 无法创建新页面，退出: %s", idx, e)
+                        page = None
+                        return
+                finally:
+                    frontier.task_done()
+                
+                done = frontier.completed + frontier.failed
+                if done and done % 50 == 0:
+                    logger.info("[批量采集] 进度: 已完成 %s，失败 %s，待采集 %s，已发现 %s", frontier.completed, frontier.failed,
+                                frontier.pending, frontier.added)
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+    
+    async def _collect_batch_url(self, page, context, item, refresh, page_timeout) -> list:
+        """
+        批量模式下采集一个URL
+        
+        Args:
+            page: 该worker使用的页面
+            context: 浏览器上下文对象
+            item: UrlFrontier条目
+            refresh: 已采集过的页面也重新采集
+            page_timeout: 页面导航超时时间（秒）
+            
+        Returns:
+            list: 从采集结果中发现的后续URL
+        """
+        url = item["url"]
+        page_type = item["page_type"] or self._page_type_from_url(url)
+        logger.info("[批量采集] (%s，深度 %s) %s", page_type, item['depth'], url)
+        
+        await page.goto(url, wait_until="domcontentloaded", timeout=page_timeout * 1000)
+        await self._ensure_logged_in(page, url)
+        frame = page.main_frame
+        discovered = []
+        
+        if page_type == "chain-info":
+            result = await self._handle_chain_info_page(frame, context, url, force=refresh)
+            # 项目列表中的项目详情页
+            for project in (result or {}).get("project_list", []):
+                project_url = project.get("project_url")
+                if project_url:
+                    discovered.append(urljoin(url, project_url))
+        elif page_type == "chain-detail":
+            await self._handle_chain_detail_page(frame, context, url, force=refresh)
+        elif page_type == "product-details":
+            await self._handle_product_details_page(frame, context, url, force=refresh)
+        elif page_type == "industry-chain":
+            # 采集当前显示的产业链SVG，并从页面链接中发现chain-info/chain-detail页面
+            svg_url = await self._find_current_svg_url(page)
+            if svg_url:
+                await self._handle_svg_url_change(page, context, svg_url, page.url, force=refresh)
+            else:
+                logger.info("[批量采集] 未找到SVG: %s", url)
+            discovered.extend(await self._find_page_links(page))
+        else:
+            logger.info("[跳过] URL不是目标页面类型，跳过处理: %s", url)
+        
+        return discovered
+    
+    def _page_type_from_url(self, url: str):
+        """
+        根据URL判断页面类型（与 _handle_navigation 的判断顺序一致）
+        
+        Returns:
+            str: "chain-info" / "chain-detail" / "product-details" / "industry-chain"，不是目标页面返回None
+        """
+        for page_type in ("chain-info", "chain-detail", "product-details", "industry-chain"):
+            if page_type in url:
+                return page_type
+        return None
+    
+    async def _find_current_svg_url(self, page):
+        """
+        等待industry-chain页面显示SVG并返回其URL（与SVG URL监听器的查找顺序一致）
+        
+        Args:
+            page: Playwright页面对象
+            
+        Returns:
+            str: SVG的绝对URL，超时未找到返回None
+        """
+        try:
+            handle = await page.wait_for_function("""
+                () => {
+                    const el = document.querySelector('object#svgframe, object[data*=".svg"], object[src*=".svg"]')
+                        || document.querySelector('iframe[src*=".svg"], iframe[src*="data.hanghangcha.com"]')
+                        || document.querySelector('img[src*=".svg"], img[src*="data.hanghangcha.com"]')
+                        || document.querySelector('embed[src*=".svg"], embed[src*="data.hanghangcha.com"]');
+                    const raw = el && (el.getAttribute('data') || el.getAttribute('src'));
+                    return raw ? new URL(raw, location.href).href : null;
+                }
+            """, timeout=self._get_readiness_timeout_ms("svg"), polling=100)
+            return await handle.json_value()
+        except PlaywrightTimeoutError:
+            return None
+    
+    async def _find_page_links(self, page) -> list:
+        """
+        获取页面中指向采集目标页面（chain-info / chain-detail / product-details）的链接
+        
+        Args:
+            page: Playwright页面对象
+            
+        Returns:
+            list: 绝对URL列表（已去重）
+        """
+        try:
+            return await page.evaluate("""
+                () => {
+                    const urls = new Set();
+                    document.querySelectorAll('a[href]').forEach(a => {
+                        const href = a.href;
+                        if (/chain-info|chain-detail|product-details/.test(href)) {
+                            urls.add(href.split('#')[0]);
+                        }
+                    });
+                    return Array.from(urls);
+                }
+            """)
+        except Exception as e:
+            logger.error("[提取页面链接错误] %s", e)
+            return []
+    
+    async def _install_resource_policy(self, context):
+        """
+        在浏览器上下文上启用请求拦截策略（性能配置未启用时不做任何操作）
+        
+        注意：启用路由后Playwright会禁用浏览器的HTTP缓存，因此交互模式默认不启用
+        
+        Args:
+            context: 浏览器上下文对象
+        """
+        if not self.resource_policy:
+            return
+        await context.route("**/*", self.resource_policy.handle)
+        logger.info("[请求拦截] 已启用: 拦截资源类型 %s，拦截域名 %s 条规则", sorted(self.resource_policy.block_types),
+                    len(self.resource_policy.block_hosts))
+    
+    async def _prepare_batch_login_state(self, p):
+        """
+        准备批量采集使用的登录状态：从交互模式的persistent context导出 storage_state
+        
+        交互模式的Chrome可能正在使用persistent context目录，因此复制一份（不含缓存和进程锁）后再打开导出。
+        导出失败时使用上一次导出的文件。
+        
+        Args:
+            p: async_playwright 实例
             
-            # 为当前页面启动URL检查任务
-            async def check_js_url_change():
-                last_checked_url = page.url
-                while True:
-                    try:
-                        await asyncio.sleep(0.2)  # 每200ms检查一次
-                        
-                        # 方法1: 检查标志位
-                        result = await page.evaluate("""
-                            () => {
-                                if (window.__url_changed && window.__new_url) {
-                                    const url = window.__new_url;
-                                    window.__url_changed = false;
-                                    window.__new_url = null;
-                                    return url;
-                                }
-                                return null;
-                            }
-                        """)
-                        
-                        # 方法2: 直接检查当前URL（作为备用）
-                        current_url = page.url
-                        # 检查是否是 industry-chain 页面
-                        if current_url != last_checked_url and "/industry-chain" in current_url:
-                            print(f"\n[检测到industry-chain页面] {current_url}")
-                            last_checked_url = current_url
-                            # 为 industry-chain 页面注入SVG URL监听器
-                            await self._inject_svg_url_listener_to_page(page, context)
-                        elif current_url != last_checked_url:
-                            last_checked_url = current_url
-                    except Exception as e:
-                        await asyncio.sleep(0.5)
+        Returns:
+            str: storage_state文件路径，没有可用的登录状态时返回None
+        """
+        if self.persistent_context_dir.is_dir():
+            profile_copy = await asyncio.to_thread(self._copy_persistent_profile)
+            context = None
+            try:
+                try:
+                    context = await p.chromium.launch_persistent_context(
+                        user_data_dir=profile_copy, headless=True, channel='chrome')
+                except Exception:
+                    context = await p.chromium.launch_persistent_context(user_data_dir=profile_copy, headless=True)
+                self.storage_state_path.parent.mkdir(parents=True, exist_ok=True)
+                await context.storage_state(path=str(self.storage_state_path))
+                logger.info("[批量采集] 已从persistent context导出登录状态: %s", self.storage_state_path)
+            except Exception as e:
+                logger.warning("[批量采集] 从persistent context导出登录状态失败: %s", e)
+            finally:
+                if context:
+                    await context.close()
+                await asyncio.to_thread(shutil.rmtree, profile_copy, True)
+        
+        if self.storage_state_path.is_file():
+            return str(self.storage_state_path)
+        logger.warning("[批量采集] 没有可用的登录状态（%s 不存在），请先在交互模式中登录；"
+                       "遇到未登录页面时批量采集会中止", self.storage_state_path)
+        return None
+    
+    def _copy_persistent_profile(self) -> str:
+        """
+        把persistent context目录复制到临时目录（跳过缓存和Chrome的进程锁），返回临时目录路径
+        """
+        profile_copy = tempfile.mkdtemp(prefix="scraper_profile_")
+        shutil.copytree(self.persistent_context_dir, profile_copy, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns(*PROFILE_COPY_IGNORE))
+        return profile_copy
+    
+    async def _ensure_logged_in(self, page, url):
+        """
+        批量采集时检查页面是否处于登录状态，未登录时抛出 LoginRequiredError（不保存该页面）
+        
+        Args:
+            page: Playwright页面对象
+            url: 正在采集的URL
+        """
+        if LOGIN_URL_PATTERN.search(page.url) or await page.evaluate(LOGIN_PROBE_JS, LOGIN_URL_PATTERN.pattern):
+            raise LoginRequiredError(f"页面处于未登录状态（{page.url}），登录状态缺失或已过期: {url}")
+    
+    async def _launch_browser(self, p, headless=False, persistent=None, storage_state=None):
+        """
+        启动浏览器并创建浏览器上下文（优先使用系统安装的Chrome，失败时回退到Chromium）
+        
+        Args:
+            p: async_playwright 实例
+            headless: 是否无界面运行（批量采集模式），默认False
+            persistent: 是否使用persistent context，None表示使用初始化时的设置
+            storage_state: 非persistent context使用的登录状态文件（Playwright storage_state），None表示不加载
             
-            js_route_check_task = asyncio.create_task(check_js_url_change())
+        Returns:
+            tuple: (browser, context)，使用persistent context时browser可能为None
+        """
+        if persistent is None:
+            persistent = self.use_persistent_context
+        self.headless = headless
+        
+        # 操作延迟由性能配置决定；有界面时最大化窗口，无界面时使用固定视口
+        slow_mo = self.profile["slow_mo"]
+        launch_args = [] if headless else ['--start-maximized']
+        viewport = {'width': 1920, 'height': 1080} if headless else None
+        
+        browser = None
+        context = None
+        is_chrome = False
+        
+        # 如果启用persistent context，直接使用它（不需要先启动browser）
+        if persistent:
+            # 使用固定的缓存目录（在脚本目录下）
+            # 确保目录存在
+            self.persistent_context_dir.mkdir(exist_ok=True, parents=True)
+            user_data_dir = str(self.persistent_context_dir)
+            
+            logger.info("[浏览器] 使用Persistent Context（缓存持久化）")
+            logger.info("[浏览器] 正在尝试使用系统安装的Chrome浏览器...")
+            logger.info("[浏览器] 缓存目录: %s", user_data_dir)
+            logger.info("[浏览器] 注意：缓存将持久化保存，下次启动时会保留之前的缓存数据")
+            logger.info("[浏览器] 注意：使用persistent context时，请确保没有其他Chrome实例在使用相同目录")
             
-            # 每次页面导航后重新注入监听器
-            async def re_inject_on_navigation(frame):
-                if frame == frame.page.main_frame:
-                    await asyncio.sleep(0.5)  # 等待页面初始化
-                    await self._set_window_maximized(frame.page)  # 恢复窗口最大化
-                    await self._ensure_page_scrollable(frame.page)  # 确保页面可滚动
-                    await self._inject_route_listeners_to_page(frame.page, context)
+            try:
+                # 使用launch_persistent_context来创建persistent context
+                # 这会直接返回context，并且使用Chrome（如果可用）
+                context = await p.chromium.launch_persistent_context(
+                    user_data_dir=user_data_dir,
+                    headless=headless,
+                    slow_mo=slow_mo,
+                    channel='chrome',  # 使用系统安装的Chrome浏览器
+                    viewport=viewport,  # 有界面时禁用固定视口，允许窗口最大化
+                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                    args=launch_args  # 有界面时启动即最大化窗口
+                )
+                
+                # 对于persistent context，尝试获取browser对象（用于版本检查）
+                try:
+                    # persistent context的pages[0].context.browser可以获取browser对象
+                    if context.pages:
+                        page_temp = context.pages[0]
+                        browser = page_temp.context.browser if hasattr(page_temp.context, 'browser') else None
+                    else:
+                        browser = None
                     
-                    # 如果是industry-chain页面，也注入SVG URL监听器
-                    current_url = frame.page.url
-                    if "/industry-chain" in current_url:
-                        print(f"[检测到industry-chain页面] 注入SVG URL监听器: {current_url}")
-                        await self._inject_svg_url_listener_to_page(frame.page, context)
-            
-            page.on("framenavigated", lambda frame: asyncio.create_task(
-                re_inject_on_navigation(frame)
-            ))
-            
-            
-            # 监听industry-chain页面的SVG URL变化（自动采集模式）
-            async def check_svg_url_change():
-                last_svg_url = None
-                processing_urls = set()  # 正在处理的URL集合，避免并发重复处理
-                while True:
+                    # 尝试获取版本信息
+                    if browser:
+                        try:
+                            # 确保 browser.version 是一个方法，而不是字符串
+                            if callable(getattr(browser, 'version', None)):
+                                browser_version = await browser.version()
+                            else:
+                                browser_version = "Chrome (通过Persistent Context)"
+                                logger.warning("[浏览器] ⚠ 警告：无法通过标准方法获取版本信息")
+                            logger.info("[浏览器] 浏览器版本: %s", browser_version)
+                            # 检查版本信息确认是Chrome还是Chromium
+                            if 'chrome' in browser_version.lower() and 'chromium' not in browser_version.lower():
+                                is_chrome = True
+                                logger.info("[浏览器] ✓ 确认使用Chrome浏览器（非Chromium）")
+                        except Exception as ver_err:
+                            logger.warning("[浏览器] 无法获取浏览器版本信息: %s", ver_err)
+                            browser_version = "Chrome (通过Persistent Context)"
+                            is_chrome = True  # 使用channel='chrome'，假设是Chrome
+                    else:
+                        browser_version = "Chrome (通过Persistent Context)"
+                        logger.info("[浏览器] 浏览器版本: %s", browser_version)
+                        is_chrome = True  # 使用channel='chrome'，假设是Chrome
+                except Exception as ver_e:
+                    logger.warning("[浏览器] 无法获取浏览器版本信息: %s", ver_e)
+                    browser_version = "Chrome (通过Persistent Context)"
+                    is_chrome = True  # 使用channel='chrome'，假设是Chrome
+                
+                logger.info("[浏览器] ✓ Persistent Context已创建，缓存将持久化保存")
+            except Exception as e:
+                logger.warning("[浏览器] ✗ 使用Chrome创建Persistent Context失败: %s", e)
+                logger.info("[浏览器] 回退到使用Chromium...")
+                try:
+                    context = await p.chromium.launch_persistent_context(
+                        user_data_dir=user_data_dir,
+                        headless=headless,
+                        slow_mo=slow_mo,
+                        viewport=viewport,  # 有界面时禁用固定视口，允许窗口最大化
+                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                        args=launch_args  # 有界面时启动即最大化窗口
+                    )
+                    # 对于persistent context，尝试获取browser对象
                     try:
-                        await asyncio.sleep(0.2)  # 每200ms检查一次，更快响应
-                        current_url = page.url
-                        
-                        # 只在industry-chain页面检查SVG URL变化
-                        if "/industry-chain" in current_url:
-                            # 检查JavaScript标志位
-                            result = await page.evaluate("""
-                                () => {
-                                    if (window.__svg_url_changed && window.__new_svg_url) {
-                                        const url = window.__new_svg_url;
-                                        window.__svg_url_changed = false;
-                                        window.__new_svg_url = null;
-                                        return url;
-                                    }
-                                    return null;
-                                }
-                            """)
-                            
-                            if result and result != last_svg_url:
-                                # 多重检查避免重复
-                                if result not in self.collected_svg_urls and result not in processing_urls:
-                                    print(f"\n[SVG URL变化] 检测到SVG URL变化: {last_svg_url} -> {result}")
-                                    last_svg_url = result
-                                    
-                                    # 标记为正在处理
-                                    processing_urls.add(result)
-                                    
-                                    try:
-                                        print(f"[开始采集] 新的SVG URL: {result}")
-                                        await asyncio.sleep(2)  # 等待SVG加载
-                                        await self._handle_svg_url_change(page, context, result, current_url)
-                                    finally:
-                                        # 处理完成后从处理集合中移除
-                                        processing_urls.discard(result)
-                                elif result in self.collected_svg_urls:
-                                    print(f"[跳过] SVG URL已采集过: {result}")
-                                    last_svg_url = result
-                                elif result in processing_urls:
-                                    print(f"[跳过] SVG URL正在处理中: {result}")
-                                    last_svg_url = result
+                        if context.pages:
+                            page_temp = context.pages[0]
+                            browser = page_temp.context.browser if hasattr(page_temp.context, 'browser') else None
                         else:
-                            # 不在industry-chain页面，重置
-                            last_svg_url = None
-                            processing_urls.clear()  # 清空处理集合
-                    except Exception as e:
-                        print(f"[SVG URL检查错误] {e}")
-                        await asyncio.sleep(1)
-            
-            svg_url_check_task = asyncio.create_task(check_svg_url_change())
-            
-            # 启动窗口最大化保持任务（仅在窗口被改变时恢复最大化）
-            async def keep_window_maximized():
-                last_window_states = {}  # 记录每个页面的窗口状态
-                while True:
-                    try:
-                        await asyncio.sleep(5)  # 每5秒检查一次（降低频率）
-                        # 检查所有页面的窗口状态
-                        for p in pages:
+                            browser = None
+                        
+                        if browser:
                             try:
-                                # 检查窗口是否被改变（不再是最大化）
-                                window_state = await p.evaluate("""
-                                    () => ({
-                                        width: window.outerWidth,
-                                        height: window.outerHeight,
-                                        screenWidth: window.screen.availWidth,
-                                        screenHeight: window.screen.availHeight
-                                    })
-                                """)
-                                
-                                page_id = id(p)
-                                last_state = last_window_states.get(page_id)
-                                
-                                # 只在窗口明显被改变时才恢复最大化（允许用户手动调整）
-                                if window_state:
-                                    is_maximized = (window_state['width'] >= window_state['screenWidth'] - 10 and 
-                                                   window_state['height'] >= window_state['screenHeight'] - 10)
-                                    
-                                    # 如果窗口从最大化变为非最大化，且不是用户刚刚调整的，才恢复
-                                    if last_state and last_state.get('was_maximized') and not is_maximized:
-                                        # 等待一下，确认不是用户正在调整
-                                        await asyncio.sleep(1)
-                                        # 再次检查，如果还是非最大化，才恢复
-                                        current_state = await p.evaluate("""
-                                            () => ({
-                                                width: window.outerWidth,
-                                                height: window.outerHeight,
-                                                screenWidth: window.screen.availWidth,
-                                                screenHeight: window.screen.availHeight
-                                            })
-                                        """)
-                                        if current_state:
-                                            still_not_maximized = (current_state['width'] < current_state['screenWidth'] - 10 or 
-                                                                  current_state['height'] < current_state['screenHeight'] - 10)
-                                            if still_not_maximized:
-                                                await self._set_window_maximized(p)
-                                    
-                                    last_window_states[page_id] = {
-                                        'was_maximized': is_maximized,
-                                        'state': window_state
-                                    }
+                                # 确保 browser.version 是一个方法，而不是字符串
+                                if callable(getattr(browser, 'version', None)):
+                                    browser_version = await browser.version()
+                                else:
+                                    browser_version = "Chromium (通过Persistent Context)"
                             except:
-                                pass
+                                browser_version = "Chromium (通过Persistent Context)"
+                        else:
+                            browser_version = "Chromium (通过Persistent Context)"
                     except:
-                        await asyncio.sleep(1)
-            
-            window_maximize_task = asyncio.create_task(keep_window_maximized())
-            
-            # 打开一个初始页面（可选）
-            await page.goto("about:blank")
+                        browser = None
+                        browser_version = "未知"
+                    
+                    logger.info("[浏览器] ✓ 使用Chromium创建Persistent Context")
+                    logger.info("[浏览器] 浏览器版本: %s", browser_version)
+                except Exception as e2:
+                    logger.error("[浏览器] ✗ Persistent Context创建失败: %s", e2)
+                    raise
+        else:
+            # 不使用persistent context，使用常规方式启动
+            logger.info("[浏览器] 正在尝试使用系统安装的Chrome浏览器...")
             
             try:
-                # 保持运行，等待用户操作
-                while True:
-                    await asyncio.sleep(1)
-            except KeyboardInterrupt:
-                print("\n\n正在关闭浏览器...")
-            finally:
-                # 取消所有监听任务
-                url_check_task.cancel()
-                js_route_check_task.cancel()
-                svg_url_check_task.cancel()
-                window_maximize_task.cancel()
-                try:
-                    await url_check_task
-                except asyncio.CancelledError:
-                    pass
-                try:
-                    await js_route_check_task
-                except asyncio.CancelledError:
-                    pass
-                try:
-                    await svg_url_check_task
-                except asyncio.CancelledError:
-                    pass
-                try:
-                    await window_maximize_task
-                except asyncio.CancelledError:
-                    pass
+                browser = await p.chromium.launch(
+                    headless=headless,
+                    slow_mo=slow_mo,
+                    channel='chrome',  # 使用系统安装的Chrome浏览器（channel方式）
+                    args=launch_args  # 有界面时启动即最大化窗口
+                )
                 
-                # 关闭浏览器或context
-                if self.use_persistent_context and context:
-                    # 对于persistent context，关闭context即可
-                    await context.close()
-                    print("浏览器已关闭（Persistent Context）")
-                elif browser:
-                    await browser.close()
-                    print("浏览器已关闭")
+                # 验证是否真的在使用Chrome
+                if browser:
+                    try:
+                        # 安全地获取版本信息
+                        version_attr = getattr(browser, 'version', None)
+                        if version_attr and callable(version_attr):
+                            browser_version = await version_attr()
+                        elif isinstance(version_attr, str):
+                            browser_version = version_attr
+                        else:
+                            browser_version = "Chrome (版本信息不可用)"
+                            logger.warning("[浏览器] ⚠ 警告：无法通过标准方法获取版本信息")
+                        logger.info("[浏览器] ✓ 成功使用系统安装的Chrome浏览器")
+                        logger.info("[浏览器] 浏览器版本: %s", browser_version)
+                        
+                        # 检查版本信息确认是Chrome还是Chromium
+                        if isinstance(browser_version, str) and 'chrome' in browser_version.lower() and 'chromium' not in browser_version.lower():
+                            is_chrome = True
+                            logger.info("[浏览器] ✓ 确认使用Chrome浏览器（非Chromium）")
+                        else:
+                            logger.warning("[浏览器] ⚠ 警告：可能使用的是Chromium而非Chrome")
+                    except (TypeError, AttributeError) as ver_err:
+                        logger.warning("[浏览器] ⚠ 获取版本信息时出错: %s", ver_err)
+                        browser_version = "Chrome (版本信息获取失败)"
+                        is_chrome = True  # 使用channel='chrome'，假设是Chrome
+                    except Exception as ver_err:
+                        logger.warning("[浏览器] ⚠ 获取版本信息时出错: %s", ver_err)
+                        browser_version = "Chrome (版本信息获取失败)"
+                        is_chrome = True  # 使用channel='chrome'，假设是Chrome
                 else:
-                    print("浏览器已关闭（无需关闭）")
+                    logger.warning("[浏览器] ⚠ 警告：无法获取浏览器对象")
+                    
+            except Exception as e:
+                # 如果系统没有安装Chrome，回退到Chromium
+                logger.warning("[浏览器] ✗ 未找到系统Chrome: %s", e)
+                logger.info("[浏览器] 回退到使用Chromium浏览器...")
+                try:
+                    browser = await p.chromium.launch(
+                        headless=headless,
+                        slow_mo=slow_mo,
+                        args=launch_args  # 有界面时启动即最大化窗口
+                    )
+                    if browser:
+                        try:
+                            # 安全地获取版本信息
+                            version_attr = getattr(browser, 'version', None)
+                            if version_attr and callable(version_attr):
+                                browser_version = await version_attr()
+                            elif isinstance(version_attr, str):
+                                browser_version = version_attr
+                            else:
+                                browser_version = "Chromium (版本信息不可用)"
+                                logger.warning("[浏览器] ⚠ 警告：无法通过标准方法获取版本信息")
+                            logger.info("[浏览器] ✓ 使用Chromium浏览器")
+                            logger.info("[浏览器] 浏览器版本: %s", browser_version)
+                        except (TypeError, AttributeError) as ver_err:
+                            logger.warning("[浏览器] ⚠ 获取版本信息时出错: %s", ver_err)
+                            browser_version = "Chromium (版本信息获取失败)"
+                            logger.info("[浏览器] ✓ 使用Chromium浏览器")
+                            logger.info("[浏览器] 浏览器版本: %s", browser_version)
+                        except Exception as ver_err:
+                            logger.warning("[浏览器] ⚠ 获取版本信息时出错: %s", ver_err)
+                            browser_version = "Chromium (版本信息获取失败)"
+                            logger.info("[浏览器] ✓ 使用Chromium浏览器")
+                            logger.info("[浏览器] 浏览器版本: %s", browser_version)
+                    else:
+                        logger.warning("[浏览器] ⚠ 警告：无法获取浏览器对象")
+                except Exception as e2:
+                    logger.error("[浏览器] ✗ Chromium启动失败: %s", e2)
+                    raise
+            
+            if browser is None:
+                raise Exception("无法启动浏览器")
+            
+            # 创建浏览器上下文
+            context_options = {
+                'viewport': viewport,  # 有界面时禁用固定视口，允许窗口最大化
+                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            }
+            
+            # 显示浏览器信息
+            if is_chrome:
+                logger.info("[浏览器] 提示：当前使用独立的用户数据目录，不会与正在运行的Chrome共享缓存")
+                logger.info("[浏览器] 如需共享缓存，可以在初始化时设置 use_persistent_context=True")
+            
+            if storage_state:
+                context_options['storage_state'] = storage_state
+            
+            context = await browser.new_context(**context_options)
+        
+        return browser, context
     
     async def _setup_interaction_listeners(self, page):
         """
@@ -745,31 +4740,6 @@ class ManualBrowserScraper:
         Args:
             page: Playwright页面对象
         """
-        # 监听鼠标移动
-        async def handle_mousemove(event):
-            self.user_interacting = True
-            self.last_interaction_time = asyncio.get_event_loop().time()
-            # 如果正在采集，暂停
-            if self.is_collecting:
-                print("\n[检测到用户操作] 暂停采集...")
-                self.is_collecting = False
-        
-        # 监听鼠标点击
-        async def handle_click(event):
-            self.user_interacting = True
-            self.last_interaction_time = asyncio.get_event_loop().time()
-            if self.is_collecting:
-                print("\n[检测到用户操作] 暂停采集...")
-                self.is_collecting = False
-        
-        # 监听键盘输入
-        async def handle_keypress(event):
-            self.user_interacting = True
-            self.last_interaction_time = asyncio.get_event_loop().time()
-            if self.is_collecting:
-                print("\n[检测到用户操作] 暂停采集...")
-                self.is_collecting = False
-        
         # 使用JavaScript注入监听器
         timeout_ms = self.interaction_timeout * 1000  # 转换为毫秒
         await page.evaluate(f"""
@@ -808,6 +4778,10 @@ class ManualBrowserScraper:
         Args:
             page: Playwright页面对象
         """
+        # 无界面运行时没有窗口可最大化
+        if self.headless:
+            return
+        
         try:
             # 尝试通过CDP协议最大化窗口（更可靠的方法）
             try:
@@ -924,12 +4898,12 @@ class ManualBrowserScraper:
                             'width': viewport_width,
                             'height': viewport_height
                         })
-                        print(f"[窗口最大化] 设置viewport为: {viewport_width}x{viewport_height}")
+                        logger.debug("[窗口最大化] 设置viewport为: %sx%s", viewport_width, viewport_height)
             except Exception as e:
-                print(f"[窗口最大化] 无法通过API最大化: {e}")
+                logger.debug("[窗口最大化] 无法通过API最大化: %s", e)
                 
         except Exception as e:
-            print(f"[窗口最大化设置错误] {e}")
+            logger.error("[窗口最大化设置错误] %s", e)
     
     async def _set_fixed_window_size(self, page):
         """
@@ -1012,111 +4986,267 @@ class ManualBrowserScraper:
                     console.log('[滚动修复] 页面高度:', document.documentElement.scrollHeight, '视口高度:', window.innerHeight);
                     console.log('[滚动修复] 页面显示修复完成');
                 }
-            """)
-        except Exception as e:
-            print(f"[确保页面可滚动错误] {e}")
+            """)
+        except Exception as e:
+            logger.error("[确保页面可滚动错误] %s", e)
+    
+    async def _scroll_to_load_all_content(self, page, max_scrolls=None, scroll_delay=None, force_scroll=False, row_target=None):
+        """
+        滚动页面以加载所有懒加载内容
+        
+        整个滚动过程在页面内的一个异步函数中完成（一次 page.evaluate）：每次滚动到底部后，
+        用MutationObserver等待新内容出现并安静下来，页面高度和表格行数都不再增长时停止
+        
+        Args:
+            page: Playwright页面对象
+            max_scrolls: 最大滚动次数，None表示使用性能配置（默认50次，通常在内容不再增长时提前停止）
+            scroll_delay: 每次滚动后等待新内容出现的最长时间（秒），None表示使用性能配置
+            force_scroll: 是否在内容不再增长后再多确认一次（适合加载较慢的列表），默认False
+            row_target: 表格行数达到该值时停止滚动，None表示不限制
+        """
+        if max_scrolls is None:
+            max_scrolls = self.profile["max_scrolls"]
+        if scroll_delay is None:
+            scroll_delay = self.profile["scroll_delay"]
+        
+        try:
+            logger.debug("[滚动加载] 开始滚动页面，最多滚动 %s 次...", max_scrolls)
+            result = await page.evaluate("""
+                async ({ maxScrolls, firstChangeMs, maxWaitMs, quietMs, stableRounds, rowTarget }) => {
+                    const countRows = () => {
+                        const table = document.querySelector('table.shadow-table, table');
+                        const tbody = table ? table.querySelector('tbody.table-tbody, tbody') : null;
+                        return tbody ? tbody.querySelectorAll('tr').length : 0;
+                    };
+                    const scrollHeight = () => Math.max(
+                        document.documentElement.scrollHeight,
+                        document.body ? document.body.scrollHeight : 0
+                    );
+                    
+                    // 滚动后等待DOM变化：firstChangeMs内没有变化直接返回；有变化则等到安静quietMs（最多maxWaitMs）
+                    const waitForNewContent = () => new Promise((resolve) => {
+                        const started = performance.now();
+                        let lastMutation = 0;
+                        const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+                        observer.observe(document.body || document.documentElement, { childList: true, subtree: true });
+                        const timer = setInterval(() => {
+                            const now = performance.now();
+                            const done = lastMutation
+                                ? (now - lastMutation >= quietMs || now - started >= maxWaitMs)
+                                : now - started >= firstChangeMs;
+                            if (done) {
+                                observer.disconnect();
+                                clearInterval(timer);
+                                resolve(Math.round(now - started));
+                            }
+                        }, 50);
+                    });
+                    
+                    const started = performance.now();
+                    let height = scrollHeight();
+                    let rows = countRows();
+                    let scrolls = 0;
+                    let unchanged = 0;
+                    let reason = 'max_scrolls';
+                    while (scrolls < maxScrolls) {
+                        if (rowTarget && rows >= rowTarget) {
+                            reason = 'row_target';
+                            break;
+                        }
+                        window.scrollTo(0, scrollHeight());
+                        scrolls += 1;
+                        await waitForNewContent();
+                        const newHeight = scrollHeight();
+                        const newRows = countRows();
+                        const grew = newHeight > height + 10 || newRows > rows;
+                        height = newHeight;
+                        rows = newRows;
+                        unchanged = grew ? 0 : unchanged + 1;
+                        if (unchanged >= stableRounds) {
+                            reason = 'no_growth';
+                            break;
+                        }
+                    }
+                    return {
+                        scrolls, rows, reason,
+                        scroll_height: height,
+                        elapsed_ms: Math.round(performance.now() - started)
+                    };
+                }
+            """, {
+                "maxScrolls": max_scrolls,
+                "firstChangeMs": int(scroll_delay * 1000),
+                "maxWaitMs": int((scroll_delay + self.profile["scroll_idle_timeout"]) * 1000),
+                "quietMs": 400,
+                "stableRounds": 2 if force_scroll else 1,
+                "rowTarget": row_target or 0,
+            })
+            
+            reasons = {"no_growth": "内容不再增长", "row_target": "已达到目标行数", "max_scrolls": "已达到最大滚动次数"}
+            logger.info("[滚动加载] 滚动完成，共滚动 %s 次（%s），表格 %s 行，耗时 %.1f 秒", result['scrolls'],
+                        reasons.get(result['reason'], result['reason']), result['rows'], result['elapsed_ms'] / 1000)
+            return result
+            
+        except Exception as e:
+            logger.exception("[滚动加载错误] %s", e)
+            return None
+    
+    def _get_readiness_timeout_ms(self, page_type: str) -> int:
+        """
+        获取页面类型的就绪等待时间预算
+        
+        Args:
+            page_type: 页面类型
+            
+        Returns:
+            int: 超时时间（毫秒）
+        """
+        return int(self.readiness_timeouts.get(page_type, 10.0) * 1000)
+    
+    async def _wait_for_svg_ready(self, page, page_type: str, svg_url: str = None) -> bool:
+        """
+        等待SVG加载完成：object的contentDocument中出现svg元素，或SVG资源请求已完成
+        
+        Args:
+            page: Playwright页面对象
+            page_type: 页面类型（用于选择时间预算）
+            svg_url: 指定的SVG URL，为None时使用 object#svgframe 的 data/src 属性
+            
+        Returns:
+            bool: 在时间预算内就绪返回True，超时返回False
+        """
+        timeout_ms = self._get_readiness_timeout_ms(page_type)
+        start_time = asyncio.get_running_loop().time()
+        logger.debug("[等待SVG就绪] 最多等待 %.0f 秒...", timeout_ms / 1000)
+        try:
+            await page.wait_for_function("""
+                (svgUrl) => {
+                    // 找到承载SVG的元素
+                    let el = null;
+                    if (svgUrl) {
+                        el = Array.from(document.querySelectorAll('object, iframe, embed, img')).find(node =>
+                            (node.getAttribute('data') || node.getAttribute('src')) === svgUrl
+                        ) || null;
+                    } else {
+                        el = document.querySelector('object#svgframe');
+                        if (!el) return false;
+                        svgUrl = el.getAttribute('data') || el.getAttribute('src');
+                    }
+                    
+                    // 条件1: object的contentDocument中已有svg元素（同源时可用）
+                    if (el && el.tagName === 'OBJECT') {
+                        try {
+                            const doc = el.contentDocument;
+                            if (doc && doc.querySelector('svg')) return true;
+                        } catch (e) {}
+                    }
+                    
+                    // 条件2: img已完成解码
+                    if (el && el.tagName === 'IMG' && el.complete && el.naturalWidth > 0) return true;
+                    
+                    // 条件3: SVG资源请求已完成（Resource Timing）
+                    if (!svgUrl) return false;
+                    try {
+                        const absUrl = new URL(svgUrl, window.location.href).href;
+                        return performance.getEntriesByName(absUrl).some(entry => entry.responseEnd > 0);
+                    } catch (e) {
+                        return false;
+                    }
+                }
+            """, arg=svg_url, timeout=timeout_ms, polling=100)
+            elapsed = asyncio.get_running_loop().time() - start_time
+            logger.debug("[SVG就绪] SVG已加载完成（等待 %.1f 秒）", elapsed)
+            return True
+        except PlaywrightError as e:
+            logger.warning("[警告] 等待SVG就绪超时或失败: %s", e)
+            return False
     
-    async def _scroll_to_load_all_content(self, page, max_scrolls=4, scroll_delay=2.0, force_scroll=False):
+    async def _wait_for_table_stable(self, page, page_type: str, quiet_ms: int = 800) -> bool:
         """
-        滚动页面以加载所有懒加载内容
+        等待表格行数稳定：表格中已有数据行，并且在quiet_ms内行数不再变化
         
         Args:
             page: Playwright页面对象
-            max_scrolls: 最大滚动次数，默认4次
-            scroll_delay: 每次滚动后的等待时间（秒）
-            force_scroll: 是否强制滚动指定次数（不提前停止），默认False
+            page_type: 页面类型（用于选择时间预算）
+            quiet_ms: 行数保持不变的时长（毫秒），默认800
+            
+        Returns:
+            bool: 在时间预算内稳定返回True，超时返回False
         """
+        timeout_ms = self._get_readiness_timeout_ms(page_type)
+        logger.debug("[等待表格稳定] 最多等待 %.0f 秒...", timeout_ms / 1000)
         try:
-            if force_scroll:
-                print(f"  [滚动加载] 开始滚动页面，固定滚动 {max_scrolls} 次...")
-            else:
-                print(f"  [滚动加载] 开始滚动页面，最多滚动 {max_scrolls} 次...")
-            
-            scroll_count = 0
-            previous_scroll_top = 0
-            
-            while scroll_count < max_scrolls:
-                # 获取当前滚动位置
-                current_scroll_top = await page.evaluate("""
-                    () => {
-                        return window.pageYOffset || document.documentElement.scrollTop || document.body.scrollTop || 0;
-                    }
-                """)
-                
-                # 获取页面总高度和视口高度
-                page_info = await page.evaluate("""
-                    () => {
-                        return {
-                            scrollHeight: Math.max(
-                                document.documentElement.scrollHeight,
-                                document.body.scrollHeight
-                            ),
-                            clientHeight: window.innerHeight || document.documentElement.clientHeight,
-                            scrollTop: window.pageYOffset || document.documentElement.scrollTop || document.body.scrollTop || 0
-                        };
-                    }
-                """)
-                
-                # 如果不是强制滚动，检查是否已经滚动到底部（无法继续滚动）
-                if not force_scroll:
-                    can_scroll = page_info["scrollHeight"] > page_info["clientHeight"] + page_info["scrollTop"] + 10
-                    
-                    if not can_scroll and scroll_count > 0:
-                        print(f"  [滚动加载] 已滚动到底部，无法继续滚动，停止滚动")
-                        break
-                
-                # 滚动到底部
-                await page.evaluate("""
-                    () => {
-                        window.scrollTo({
-                            top: document.documentElement.scrollHeight,
-                            behavior: 'smooth'
+            result = await page.evaluate("""
+                async ({ quietMs, timeoutMs }) => {
+                    const countRows = () => {
+                        const table = document.querySelector('table.shadow-table, table');
+                        const tbody = table ? table.querySelector('tbody.table-tbody, tbody') : null;
+                        return tbody ? tbody.querySelectorAll('tr').length : 0;
+                    };
+                    const started = performance.now();
+                    return await new Promise((resolve) => {
+                        let lastCount = countRows();
+                        let lastChange = performance.now();
+                        const observer = new MutationObserver(() => {
+                            const count = countRows();
+                            if (count !== lastCount) {
+                                lastCount = count;
+                                lastChange = performance.now();
+                            }
                         });
-                    }
-                """)
-                
-                # 等待内容加载
-                await asyncio.sleep(scroll_delay)
-                
-                # 尝试等待网络请求完成（但不要等待太久）
-                try:
-                    await page.wait_for_load_state("networkidle", timeout=3000)
-                except:
-                    pass  # 如果超时，继续执行
-                
-                # 检查滚动位置是否变化
-                new_scroll_top = await page.evaluate("""
-                    () => {
-                        return window.pageYOffset || document.documentElement.scrollTop || document.body.scrollTop || 0;
-                    }
-                """)
-                
-                scroll_count += 1
-                print(f"  [滚动加载] 第 {scroll_count} 次滚动完成")
-                
-                # 如果不是强制滚动，检查滚动位置是否变化
-                if not force_scroll:
-                    if abs(new_scroll_top - previous_scroll_top) < 10 and scroll_count > 1:
-                        print(f"  [滚动加载] 滚动位置未变化，已到底部，停止滚动")
-                        break
-                
-                previous_scroll_top = new_scroll_top
-            
-            # 最后等待一次，确保所有内容都已加载
-            try:
-                await page.wait_for_load_state("networkidle", timeout=5000)
-            except:
-                pass
-            
-            if force_scroll:
-                print(f"  [滚动加载] 滚动完成，固定滚动 {scroll_count} 次")
-            else:
-                print(f"  [滚动加载] 滚动完成，共滚动 {scroll_count} 次，保持在底部")
+                        observer.observe(document.body || document.documentElement, { childList: true, subtree: true });
+                        const timer = setInterval(() => {
+                            const now = performance.now();
+                            const stable = lastCount > 0 && now - lastChange >= quietMs;
+                            if (stable || now - started >= timeoutMs) {
+                                observer.disconnect();
+                                clearInterval(timer);
+                                resolve({ rows: lastCount, waited_ms: Math.round(now - started), timed_out: !stable });
+                            }
+                        }, 50);
+                    });
+                }
+            """, {"quietMs": quiet_ms, "timeoutMs": timeout_ms})
+            if result.get("timed_out"):
+                logger.warning("[警告] 等待表格稳定超时（当前 %s 行）", result.get('rows', 0))
+                return False
+            logger.debug("[表格稳定] 表格已有 %s 行（等待 %.1f 秒）", result.get('rows', 0), result.get('waited_ms', 0) / 1000)
+            return True
+        except PlaywrightError as e:
+            logger.warning("[警告] 等待表格稳定失败: %s", e)
+            return False
+    
+    async def _wait_for_product_details_ready(self, page) -> bool:
+        """
+        等待product-details页面的项目名称和工商信息渲染完成
+        
+        Args:
+            page: Playwright页面对象
             
-        except Exception as e:
-            print(f"  [滚动加载错误] {e}")
-            import traceback
-            traceback.print_exc()
+        Returns:
+            bool: 在时间预算内就绪返回True，超时返回False
+        """
+        timeout_ms = self._get_readiness_timeout_ms("product-details")
+        start_time = asyncio.get_running_loop().time()
+        logger.debug("[等待页面就绪] 等待项目信息和工商信息渲染，最多 %.0f 秒...", timeout_ms / 1000)
+        try:
+            await page.wait_for_function("""
+                () => {
+                    const nameEl = document.querySelector('.bodies-header-info p');
+                    if (!nameEl || !nameEl.textContent.trim()) return false;
+                    // 没有工商信息模块的页面只需要项目名称就绪
+                    const business = document.querySelector('#business');
+                    if (!business) return true;
+                    const businessMain = business.querySelector('.business-main');
+                    return !!(businessMain && businessMain.children.length > 0);
+                }
+            """, timeout=timeout_ms, polling=100)
+            elapsed = asyncio.get_running_loop().time() - start_time
+            logger.debug("[页面就绪] 产品详情已渲染（等待 %.1f 秒）", elapsed)
+            return True
+        except PlaywrightError as e:
+            logger.warning("[警告] 等待产品详情就绪超时或失败: %s", e)
+            return False
     
     async def _inject_route_listeners_to_page(self, target_page, ctx):
         """注入路由监听器到指定页面（类方法）"""
@@ -1148,56 +5278,40 @@ class ManualBrowserScraper:
                         console.log('[窗口保护] 阻止 resizeBy 调用');
                     };
                     
+                    // 将路由变化推送给Python端（通过页面事件绑定，无需Python轮询）
+                    const notifyRouteChange = (source) => {
+                        const url = window.location.href;
+                        console.log('[路由变化] ' + source + ' ->', url);
+                        window.dispatchEvent(new Event('__url_changed'));
+                        if (typeof window.__scraper_notify === 'function') {
+                            window.__scraper_notify({ type: 'route', source: source, url: url }).catch(() => {});
+                        }
+                    };
+                    
                     // 监听 SPA 路由变化（pushState 和 popState）
                     const originalPushState = history.pushState;
                     const originalReplaceState = history.replaceState;
                     
                     history.pushState = function() {
                         originalPushState.apply(history, arguments);
-                        const url = window.location.href;
-                        console.log('[路由变化] pushState ->', url);
-                        if (url.includes('/chain-detail')) {
-                            window.__url_changed = true;
-                            window.__new_url = url;
-                            window.dispatchEvent(new Event('__url_changed'));
-                        }
+                        notifyRouteChange('pushState');
                     };
                     
                     history.replaceState = function() {
                         originalReplaceState.apply(history, arguments);
-                        const url = window.location.href;
-                        console.log('[路由变化] replaceState ->', url);
-                        if (url.includes('/chain-detail')) {
-                            window.__url_changed = true;
-                            window.__new_url = url;
-                            window.dispatchEvent(new Event('__url_changed'));
-                        }
+                        notifyRouteChange('replaceState');
                     };
                     
                     window.addEventListener('popstate', function(event) {
-                        const url = window.location.href;
-                        console.log('[路由变化] popstate ->', url);
-                        if (url.includes('/chain-detail')) {
-                            window.__url_changed = true;
-                            window.__new_url = url;
-                            window.dispatchEvent(new Event('__url_changed'));
-                        }
+                        notifyRouteChange('popstate');
                     });
                     
                     // 监听 hash 变化
                     window.addEventListener('hashchange', function(event) {
-                        const url = window.location.href;
-                        console.log('[路由变化] hashchange ->', url);
-                        if (url.includes('/chain-detail')) {
-                            window.__url_changed = true;
-                            window.__new_url = url;
-                            window.dispatchEvent(new Event('__url_changed'));
-                        }
+                        notifyRouteChange('hashchange');
                     });
                     
                     // 初始化标志
-                    window.__url_changed = false;
-                    window.__new_url = null;
                     window.__manual_trigger = false;
                     window.__route_listeners_injected = true;
                     
@@ -1206,7 +5320,7 @@ class ManualBrowserScraper:
                 }
             """)
         except Exception as e:
-            print(f"[注入路由监听器错误] {e}")
+            logger.error("[注入路由监听器错误] %s", e)
     
     async def _inject_svg_url_listener_to_page(self, target_page, ctx):
         """注入SVG URL监听器到industry-chain页面"""
@@ -1255,18 +5369,18 @@ class ManualBrowserScraper:
                     const checkSvgUrlChange = () => {
                         const currentSvgUrl = getCurrentSvgUrl();
                         if (currentSvgUrl && currentSvgUrl !== lastSvgUrl) {
-                            // 避免重复触发：如果标志位已经设置且URL相同，则不重复设置
-                            if (window.__svg_url_changed && window.__new_svg_url === currentSvgUrl) {
-                                return; // 已经触发过，跳过
-                            }
-                            
                             console.log('[SVG监听器] 检测到SVG URL变化:', lastSvgUrl, '->', currentSvgUrl);
                             lastSvgUrl = currentSvgUrl;
                             
-                            // 触发SVG URL变化事件（只设置一次）
-                            window.__svg_url_changed = true;
-                            window.__new_svg_url = currentSvgUrl;
+                            // 触发SVG URL变化事件，并推送给Python端（每个URL只推送一次）
                             window.dispatchEvent(new Event('__svg_url_changed'));
+                            if (typeof window.__scraper_notify === 'function') {
+                                window.__scraper_notify({
+                                    type: 'svg_url',
+                                    url: currentSvgUrl,
+                                    page_url: window.location.href
+                                }).catch(() => {});
+                            }
                         }
                     };
                     
@@ -1284,8 +5398,6 @@ class ManualBrowserScraper:
                     });
                     
                     // 初始化标志
-                    window.__svg_url_changed = false;
-                    window.__new_svg_url = null;
                     window.__svg_url_listener_injected = true;
                     
                     // 立即检查一次
@@ -1322,7 +5434,370 @@ class ManualBrowserScraper:
                 }
             """)
         except Exception as e:
-            print(f"[注入SVG URL监听器错误] {e}")
+            logger.error("[注入SVG URL监听器错误] %s", e)
+    
+    def _on_context_response(self, response):
+        """
+        浏览器上下文的响应事件回调：捕获SVG响应体写入缓存
+        在回调中只做轻量过滤，响应体读取放到后台任务中
+        
+        Args:
+            response: Playwright响应对象
+        """
+        try:
+            if response.status != 200:
+                return
+            if self.resource_policy:
+                self.resource_policy.observe_response(
+                    response.request.resource_type, response.headers.get("content-length")
+                )
+            content_type = response.headers.get("content-type", "")
+            if SvgResponseCache.is_svg_response(response.url, content_type):
+                self.svg_response_cache.begin(response.url)
+                if not self._spawn_for_response(response, self._capture_svg_response(response), "capture_svg"):
+                    self.svg_response_cache.fail(response.url)
+            elif ("json" in content_type
+                  and response.request.resource_type in ("xhr", "fetch")
+                  and self.chain_info_mode != "dom"):
+                page_url = response.frame.page.url
+                if "chain-info" in page_url:
+                    self._spawn_for_response(
+                        response, self._capture_project_list_response(response, page_url), "capture_project_list"
+                    )
+        except Exception:
+            return
+    
+    def _spawn_for_response(self, response, coro, name):
+        """
+        作为响应所属页面的后台任务运行（由页面的任务管理器持有引用并记录异常）
+        
+        Args:
+            response: Playwright响应对象
+            coro: 协程对象
+            name: 任务名称
+            
+        Returns:
+            bool: 已创建任务返回True；响应不属于任何页面（如Service Worker）或页面已关闭时返回False
+        """
+        try:
+            page = response.frame.page
+        except Exception:
+            page = None
+        if page is None:
+            coro.close()
+            return False
+        return self._supervise_page(page).spawn(coro, name=name) is not None
+    
+    async def _capture_project_list_response(self, response, page_url):
+        """
+        解析chain-info页面的接口JSON，如果是项目列表数据则合并到该页面的拦截结果中
+        
+        Args:
+            response: Playwright响应对象
+            page_url: 发起请求的页面URL
+        """
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        normalized_url = self._normalize_url(page_url)
+        capture = self.project_list_captures.get(normalized_url)
+        if capture is None:
+            capture = ProjectListCapture()
+        added = capture.merge(payload)
+        if added < 0:
+            return
+        self.project_list_captures[normalized_url] = capture
+        self.project_list_captures.move_to_end(normalized_url)
+        # 只保留最近的页面，避免未采集页面的拦截结果一直占用内存
+        while len(self.project_list_captures) > 20:
+            self.project_list_captures.popitem(last=False)
+        total_text = f"/{capture.total}" if capture.total is not None else ""
+        logger.debug("[接口拦截] 项目列表接口 +%s 条（共 %s%s 条）: %s", added, len(capture.records), total_text, response.url)
+    
+    async def _capture_svg_response(self, response):
+        """
+        读取SVG响应体并写入缓存（连同 ETag / Last-Modified 和内容指纹，使用该响应的采集保存成功后才记录）
+        
+        Args:
+            response: Playwright响应对象
+        """
+        try:
+            content = await response.text()
+            fingerprint = await asyncio.to_thread(SvgFingerprint.of, content)
+            self.svg_response_cache.put(response.url, content, {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "fingerprint": fingerprint,
+            })
+        except Exception as e:
+            # 页面关闭或响应体已被浏览器丢弃时无法读取，提取时会回退到下载
+            self.svg_response_cache.fail(response.url)
+    
+    def _register_exporter_metrics(self):
+        """注册进程指标（采集计数和耗时由 _on_collection_finished 更新，其余在输出时读取）"""
+        exporter = self.exporter
+        exporter.counter("collections_total", "采集次数（按页面类型和结果）")
+        exporter.counter("download_bytes_total", "采集时通过网络下载的字节数")
+        exporter.counter("download_retries_total", "SVG下载的重试次数", lambda: self.download_client.retried)
+        exporter.counter("download_not_modified_total", "条件请求返回304（SVG未修改）的次数",
+                         lambda: self.download_client.not_modified)
+        exporter.counter("download_throttled_seconds_total", "SVG下载因按域名限速而等待的总时间",
+                         lambda: self.download_client.throttled_seconds)
+        exporter.gauge("downloads_in_flight", "正在进行的SVG下载数", lambda: self.download_client.in_flight)
+        exporter.histogram("collection_duration_seconds", "每次采集的总耗时")
+        exporter.histogram("stage_duration_seconds", "采集各阶段的耗时（save 即保存耗时）")
+        exporter.histogram("event_loop_lag_seconds", "事件循环延迟")
+        exporter.counter("written_bytes_total", "写入磁盘的字节数", lambda: self.file_writer.bytes_written)
+        exporter.counter("dedup_hits_total", "去重命中次数", lambda: {
+            "svg_response_cache": self.svg_response_cache.hits,
+            "svg_blob": self.svg_blob_store.blobs_reused,
+            "scheduler_duplicate": self.scheduler.duplicates,
+            "file_write_coalesced": self.file_writer.coalesced,
+        }, label="kind")
+        exporter.counter("collections_dropped_total", "等待采集队列空位超时而放弃的任务数", lambda: self.scheduler.dropped)
+        exporter.counter("context_recycles_total", "浏览器上下文回收次数", lambda: self.context_recycler.recycles)
+        exporter.gauge("queue_depth", "等待执行的采集任务数", lambda: self.scheduler.queue_depth)
+        exporter.gauge("collections_in_flight", "正在排队或执行中的采集任务数",
+                       lambda: self.scheduler.in_flight_by_type(), label="page_type")
+        exporter.gauge("open_pages", "打开的页面数",
+                       lambda: len(self._active_context.pages) if self._active_context else 0)
+        exporter.gauge("page_tasks", "各页面的后台任务数", lambda: self.page_task_stats()["tasks"])
+        exporter.gauge("asyncio_tasks", "事件循环中的任务总数", lambda: len(asyncio.all_tasks()))
+        exporter.gauge("file_writer_pending", "等待写入磁盘的文件数", lambda: self.file_writer.pending_count)
+        exporter.gauge("event_loop_lag_last_seconds", "最近一次测量的事件循环延迟", lambda: self.loop_monitor.last)
+        exporter.gauge("event_loop_lag_quantile_seconds", "最近约5分钟事件循环延迟的百分位数", lambda: {
+            quantile: self.loop_monitor.percentiles()[key]
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))
+        }, label="quantile")
+        exporter.counter("event_loop_stalls_total", "事件循环延迟超过阈值的次数", lambda: self.loop_monitor.stalls)
+        exporter.gauge("last_collection_timestamp_seconds", "最近一次采集结束的时间（Unix时间戳）",
+                       lambda: self._last_collection_time)
+    
+    def _on_collection_finished(self, trace: CollectionTrace):
+        """
+        一次采集结束：更新进程指标，写入采集指标文件
+        
+        Args:
+            trace: 本次采集的记录
+        """
+        self._last_collection_time = time.time()
+        self.exporter.inc("collections_total", page_type=trace.page_type, outcome=trace.outcome)
+        downloaded = trace.counters.get("bytes_downloaded", 0)
+        if downloaded:
+            self.exporter.inc("download_bytes_total", downloaded, page_type=trace.page_type)
+        if trace.outcome != "skipped":
+            self.exporter.observe("collection_duration_seconds", trace.elapsed, page_type=trace.page_type)
+            for stage, seconds in trace.stages.items():
+                self.exporter.observe("stage_duration_seconds", seconds, page_type=trace.page_type, stage=stage)
+        if self.metrics:
+            self.metrics.record(trace)
+    
+    async def _wait_for_writes(self):
+        """
+        等待当前采集提交的文件全部写入磁盘（不阻塞事件循环），任一文件写入失败时抛出该异常
+        
+        采集状态（已采集标记、数据哈希）只在数据确实写入后才记录，写入失败的页面下次会重新采集
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            await asyncio.to_thread(self.file_writer.flush)
+            return
+        futures = trace.take_write_futures()
+        if futures:
+            await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+    
+    async def _start_exporter(self) -> list:
+        """
+        启动进程指标的后台任务（事件循环延迟测量、HTTP指标服务、textfile写入）
+        
+        Returns:
+            list: 后台任务列表，退出时传给 _stop_exporter()
+        """
+        tasks = [asyncio.create_task(self.loop_monitor.run())]
+        if self.metrics_port:
+            try:
+                await self.exporter.serve(self.metrics_port)
+            except OSError as e:
+                logger.warning("[指标] 无法启动指标服务（端口 %s）: %s", self.metrics_port, e)
+        if self.metrics_textfile:
+            tasks.append(asyncio.create_task(self.exporter.run_textfile(self.metrics_textfile, self.file_writer)))
+            logger.info("[指标] 定期写入指标文件: %s", self.metrics_textfile)
+        return tasks
+    
+    async def _stop_exporter(self, tasks: list):
+        """停止进程指标的后台任务和HTTP服务"""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.exporter.close()
+        if self.loop_monitor.samples:
+            logger.info("[循环延迟] %s", self.loop_monitor.summary())
+    
+    def _supervise_page(self, page) -> PageSupervisor:
+        """
+        获取页面的任务管理器，不存在时创建（页面关闭时自动清理并移除）
+        
+        Args:
+            page: Playwright页面对象
+            
+        Returns:
+            PageSupervisor: 该页面的任务管理器
+        """
+        supervisor = self.page_supervisors.get(page)
+        if supervisor is None:
+            supervisor = PageSupervisor(page, on_closed=self._on_page_closed)
+            self.page_supervisors[page] = supervisor
+        return supervisor
+    
+    def _on_page_closed(self, supervisor, cancelled):
+        """
+        页面关闭回调：移除页面的任务管理器
+        
+        Args:
+            supervisor: 已关闭页面的 PageSupervisor
+            cancelled: 关闭时取消的任务数
+        """
+        self.page_supervisors.pop(supervisor.page, None)
+        try:
+            url = supervisor.page.url
+        except Exception:
+            url = ""
+        logger.info("[页面关闭] %s: 取消 %s 个任务（该页面共创建 %s 个），%s", url, cancelled, supervisor.tasks_started,
+                    self._page_task_summary())
+    
+    def _open_pages(self) -> list:
+        """返回当前打开的（由 PageSupervisor 管理的）页面"""
+        return [s.page for s in self.page_supervisors.values() if not s.closed]
+    
+    def page_task_stats(self) -> dict:
+        """
+        统计各页面的后台任务和监听器数量
+        
+        Returns:
+            dict: {"pages": 打开的页面数, "tasks": 页面任务数, "listeners": 监听器数, "loop_tasks": 事件循环中的任务总数}
+        """
+        supervisors = list(self.page_supervisors.values())
+        try:
+            loop_tasks = len(asyncio.all_tasks())
+        except RuntimeError:
+            loop_tasks = 0
+        return {
+            "pages": len(supervisors),
+            "tasks": sum(s.task_count for s in supervisors),
+            "listeners": sum(len(s.listeners) for s in supervisors),
+            "loop_tasks": loop_tasks,
+        }
+    
+    def _page_task_summary(self) -> str:
+        """页面任务统计的单行描述"""
+        stats = self.page_task_stats()
+        return (f"打开页面 {stats['pages']} 个，页面任务 {stats['tasks']} 个，"
+                f"监听器 {stats['listeners']} 个，事件循环任务 {stats['loop_tasks']} 个")
+    
+    def _collection_key(self, page_type: str, key: str) -> str:
+        """
+        生成调度器使用的任务去重key
+        
+        Args:
+            page_type: 页面类型
+            key: 规范化URL或SVG URL
+            
+        Returns:
+            str: 任务key
+        """
+        return f"{page_type}:{key}"
+    
+    async def _submit_collection(self, page_type: str, key: str, job) -> bool:
+        """
+        将采集任务提交给调度器（队列已满时等待空位，超时放弃后页面保持未采集状态）
+        
+        Args:
+            page_type: 页面类型（chain-detail / chain-info / product-details / svg）
+            key: 规范化URL或SVG URL（用于去重）
+            job: 无参数的协程函数
+            
+        Returns:
+            bool: 任务已入队返回True
+        """
+        submitted = await self.scheduler.submit(page_type, self._collection_key(page_type, key), job)
+        if submitted:
+            logger.debug("[调度] 已提交%s采集任务（排队 %s，进行中 %s）: %s", page_type, self.scheduler.queue_depth, self.scheduler.in_flight_count, key)
+        return submitted
+    
+    def _on_page_event(self, source, event, context):
+        """
+        页面事件绑定回调（由注入脚本调用 window.__scraper_notify 触发）
+        立即返回，不阻塞页面脚本，实际处理放到后台任务中执行
+        
+        Args:
+            source: 绑定来源信息（包含 page、frame、context）
+            event: 页面推送的事件数据，如 {"type": "route", "url": ...}
+            context: 浏览器上下文对象
+        """
+        page = source.get("page") if isinstance(source, dict) else None
+        if page is None or not isinstance(event, dict):
+            return
+        if event.get("type") == "project_rows":
+            self._on_project_rows(event)
+            return
+        # 任务由页面的任务管理器持有引用（不会被提前回收，异常会被记录），页面关闭时取消
+        self._supervise_page(page).spawn(
+            self._dispatch_page_event(page, context, event), name=f"page_event:{event.get('type')}"
+        )
+    
+    async def _dispatch_page_event(self, page, context, event):
+        """
+        分发页面推送的事件
+        
+        Args:
+            page: 推送事件的Playwright页面对象
+            context: 浏览器上下文对象
+            event: 事件数据
+        """
+        event_type = event.get("type")
+        url = event.get("url") or ""
+        try:
+            if event_type == "route":
+                if "/industry-chain" in url:
+                    logger.info("[检测到industry-chain页面] %s", url)
+                    await self._inject_svg_url_listener_to_page(page, context)
+                elif "/chain-detail" in url:
+                    normalized_url = self._normalize_url(url)
+                    if normalized_url not in self.collected_urls:
+                        logger.info("[路由事件] 检测到目标URL: %s", url)
+                        await self._handle_navigation(page.main_frame, context)
+            elif event_type == "svg_url":
+                await self._handle_svg_url_event(page, context, url, event.get("page_url") or page.url)
+        except Exception as e:
+            logger.error("[页面事件处理错误] %s", e)
+    
+    async def _handle_svg_url_event(self, page, context, svg_url, page_url):
+        """
+        处理页面推送的SVG URL变化事件（自动采集模式）
+        
+        Args:
+            page: Playwright页面对象
+            context: 浏览器上下文对象
+            svg_url: 新的SVG URL
+            page_url: 当前页面URL
+        """
+        # 只处理industry-chain页面的SVG URL变化
+        if not svg_url or "/industry-chain" not in page_url:
+            return
+        
+        # 多重检查避免重复（正在处理中的URL由调度器去重）
+        if svg_url in self.collected_svg_urls:
+            logger.info("[跳过] SVG URL已采集过: %s", svg_url)
+            return
+        
+        logger.info("[SVG URL变化] 检测到新的SVG URL: %s", svg_url)
+        
+        async def collect():
+            logger.info("[开始采集] 新的SVG URL: %s", svg_url)
+            await self._handle_svg_url_change(page, context, svg_url, page_url)
+        
+        await self._submit_collection("svg", svg_url, collect)
     
     async def _check_user_interacting(self, page):
         """
@@ -1351,7 +5826,8 @@ class ManualBrowserScraper:
         except:
             return False
     
-    async def _handle_svg_url_change(self, page, context, svg_url, page_url):
+    @traced_collection("svg")
+    async def _handle_svg_url_change(self, page, context, svg_url, page_url, force=False):
         """
         处理industry-chain页面的SVG URL变化
         
@@ -1360,11 +5836,13 @@ class ManualBrowserScraper:
             context: 浏览器上下文对象
             svg_url: 新的SVG URL
             page_url: 当前页面URL
+            force: 已采集过也重新采集（批量刷新模式），默认False
+            
+        Returns:
+            dict: 采集结果，跳过时返回None（采集失败时抛出异常，由调度器或批量采集worker记录并重试）
         """
-        print(f"\n{'='*80}")
-        print(f"[SVG URL变化] 检测到SVG URL变化: {svg_url}")
-        print(f"页面URL: {page_url}")
-        print(f"{'='*80}")
+        logger.info("[SVG URL变化] 检测到SVG URL变化: %s", svg_url)
+        logger.debug("页面URL: %s", page_url)
         
         # 检查是否已经采集过（通过检查文件夹中的文件）
         # 先尝试获取产业链名称
@@ -1379,51 +5857,41 @@ class ManualBrowserScraper:
                 pass
         
         # 如果获取到产业链名称，检查文件夹中是否已存在文件
-        if chain_name:
+        if chain_name and not force:
             if self._check_chain_already_collected(chain_name):
                 chain_name_clean = re.sub(r'[<>:"/\\|?*]', '_', chain_name).strip()
                 chain_dir = self.output_dir / chain_name_clean
-                existing_files = list(chain_dir.glob("*.txt")) + list(chain_dir.glob("*.svg"))
-                print(f"\n[跳过] 该产业链已采集过（文件夹中存在文件）: {chain_name}")
-                print(f"  文件夹路径: {chain_dir}")
-                print(f"  已有文件数: {len(existing_files)}")
+                existing_files = self.chain_index.files(chain_name_clean)
+                logger.info("[跳过] 该产业链已采集过（文件夹中存在文件）: %s", chain_name)
+                logger.debug("文件夹路径: %s", chain_dir)
+                logger.debug("已有文件数: %s", len(existing_files))
                 # 仍然添加到集合中，避免重复检查
-                self.collected_svg_urls.add(svg_url)
+                self.collected_svg_urls.record(svg_url)
+                metrics_outcome("skipped")
                 return
         
         # 检查内存集合（双重检查，确保不重复）
-        if svg_url in self.collected_svg_urls:
-            print(f"\n[跳过] 该SVG URL已采集过: {svg_url}")
+        if svg_url in self.collected_svg_urls and not force:
+            logger.info("[跳过] 该SVG URL已采集过: %s", svg_url)
+            metrics_outcome("skipped")
             return
         
-        # 立即标记为已采集，避免并发重复采集
-        self.collected_svg_urls.add(svg_url)
-        print(f"[标记] SVG URL已标记为已采集: {svg_url}")
-        
-        # 如果正在采集，等待完成
-        if self.is_collecting:
-            print(f"[等待] 等待当前采集完成...")
-            while self.is_collecting:
-                await asyncio.sleep(0.5)
+        # 保存成功后才标记为已采集（采集失败的URL下次仍会采集；并发重复采集由调度器按URL去重）
         
         # 等待页面稳定
-        print(f"[等待页面稳定] {svg_url}")
-        try:
-            await page.wait_for_load_state("networkidle", timeout=10000)
-            print("[页面稳定] networkidle状态已到达")
-        except Exception as e:
-            print(f"[警告] 等待networkidle超时: {e}")
-        
-        # 等待SVG加载
-        print("[等待SVG加载] 等待3秒确保SVG加载...")
-        await asyncio.sleep(3)
+        logger.debug("[等待页面稳定] %s", svg_url)
+        with metrics_stage("wait_load"):
+            try:
+                await page.wait_for_load_state("networkidle", timeout=self.profile["svg_settle_timeout"] * 1000)
+                logger.debug("[页面稳定] networkidle状态已到达")
+            except Exception as e:
+                logger.warning("[警告] 等待networkidle超时: %s", e)
+            
+            # 等待SVG加载完成（SVG资源请求完成或object内容可用即返回）
+            await self._wait_for_svg_ready(page, "svg", svg_url)
         
         # 开始采集
-        print(f"\n{'='*80}")
-        print(f"[开始采集] SVG URL: {svg_url}")
-        print(f"{'='*80}")
-        
-        self.is_collecting = True
+        logger.info("[开始采集] SVG URL: %s", svg_url)
         
         try:
             # 从SVG URL中提取标识符（用于文件名）
@@ -1433,10 +5901,12 @@ class ManualBrowserScraper:
             chain_name = self._extract_chain_name_from_svg_url(svg_url)
             
             # 采集SVG数据
-            svg_data = await self._extract_svg_data_from_url(page, context, svg_url)
+            with metrics_stage("extract"):
+                svg_data = await self._extract_svg_data_from_url(page, context, svg_url)
             
             # 提取页面信息
-            page_info = await self._extract_page_info(page)
+            with metrics_stage("extract"):
+                page_info = await self._extract_page_info(page)
             
             # 如果从页面信息中没有提取到产业链名称，使用从SVG URL提取的
             if chain_name and not page_info.get("chain_title"):
@@ -1454,20 +5924,21 @@ class ManualBrowserScraper:
             }
             
             # 保存数据
-            output_file = self._save_svg_data(result, svg_id)
-            print(f"[采集完成] 数据已保存到: {output_file}")
-            print(f"{'='*80}\n")
+            with metrics_stage("save"):
+                output_file = self._save_svg_data(result, svg_id)
+                await self._wait_for_writes()
+            logger.info("[采集完成] 数据已保存到: %s", output_file)
+            self.collected_svg_urls.record(svg_url, output_path=output_file)
+            return result
             
         except Exception as e:
-            print(f"[采集错误] {str(e)}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            self.is_collecting = False
+            metrics_outcome("error")
+            logger.error("[采集错误] %s", str(e))
+            raise
     
     def _check_chain_already_collected(self, chain_name: str) -> bool:
         """
-        检查产业链是否已经采集过（通过检查文件夹中的文件）
+        检查产业链是否已经采集过（通过产业链索引检查文件夹中的文件）
         
         Args:
             chain_name: 产业链名称
@@ -1483,14 +5954,8 @@ class ManualBrowserScraper:
         if not chain_name_clean:
             return False
         
-        # 检查文件夹是否存在
-        chain_dir = self.output_dir / chain_name_clean
-        if not chain_dir.exists() or not chain_dir.is_dir():
-            return False
-        
-        # 检查文件夹中是否有文件（.txt 或 .svg 文件）
-        existing_files = list(chain_dir.glob("*.txt")) + list(chain_dir.glob("*.svg"))
-        return len(existing_files) > 0
+        # 检查文件夹中是否有文件（.txt/.svg 文件或manifest.json），只查内存索引，不访问文件系统
+        return self.chain_index.has_files(chain_name_clean)
     
     def _extract_svg_id_from_url(self, svg_url: str) -> str:
         """
@@ -1506,7 +5971,6 @@ class ManualBrowserScraper:
             # 从URL中提取文件名（不含扩展名）
             # 例如: https://data.hanghangcha.com/report/automaticdriving_1671181526.svg
             # 返回: automaticdriving_1671181526
-            from urllib.parse import urlparse
             parsed = urlparse(svg_url)
             filename = parsed.path.split('/')[-1]
             if filename.endswith('.svg'):
@@ -1529,7 +5993,6 @@ class ManualBrowserScraper:
             # 从URL中提取文件名
             # 例如: https://data.hanghangcha.com/report/automaticdriving_1671181526.svg
             # 返回: automaticdriving
-            from urllib.parse import urlparse
             parsed = urlparse(svg_url)
             filename = parsed.path.split('/')[-1]
             if filename.endswith('.svg'):
@@ -1575,19 +6038,19 @@ class ManualBrowserScraper:
         
         try:
             # 检查URL是否是SVG格式
-            from urllib.parse import urlparse
             parsed = urlparse(svg_url)
             url_path = parsed.path.lower()
             
             # 只处理SVG格式的URL
             if not url_path.endswith('.svg'):
-                print(f"  [跳过] URL不是SVG格式: {svg_url}")
-                print(f"  [跳过] 只下载SVG文件，跳过其他格式")
+                logger.info("[跳过] URL不是SVG格式: %s", svg_url)
+                logger.info("[跳过] 只下载SVG文件，跳过其他格式")
                 return svg_data
             
-            # 直接下载SVG内容
-            print(f"  [下载SVG] 从URL下载: {svg_url}")
-            svg_content = await self._download_svg(context, svg_url)
+            # 获取SVG内容（优先使用浏览器已加载的响应，未捕获到时再下载）
+            logger.debug("[获取SVG] %s", svg_url)
+            with metrics_stage("download"):
+                svg_content = await self._download_svg(context, svg_url)
             
             # 验证内容是否是SVG格式
             if svg_content:
@@ -1600,11 +6063,11 @@ class ManualBrowserScraper:
                         "size": len(svg_content)
                     })
                     svg_data["svg_count"] = 1
-                    print(f"  ✓ [下载成功] SVG内容 ({len(svg_content)} 字符)")
+                    logger.debug("✓ [下载成功] SVG内容 (%s 字符)", len(svg_content))
                 else:
-                    print(f"  ✗ [跳过] 下载的内容不是SVG格式，跳过保存")
+                    logger.warning("✗ [跳过] 下载的内容不是SVG格式，跳过保存")
             else:
-                print(f"  ✗ [下载失败] 无法下载SVG内容")
+                logger.warning("✗ [下载失败] 无法下载SVG内容")
             
             # 同时尝试从页面中查找SVG元素
             try:
@@ -1625,12 +6088,10 @@ class ManualBrowserScraper:
                         "method": "url_download"
                     })
             except Exception as e:
-                print(f"  [警告] 查找object标签时出错: {e}")
+                logger.warning("[警告] 查找object标签时出错: %s", e)
             
         except Exception as e:
-            print(f"  提取SVG数据时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("提取SVG数据时出错: %s", e)
         
         return svg_data
     
@@ -1665,14 +6126,25 @@ class ManualBrowserScraper:
             chain_name = svg_id
         
         # 清理文件名中的非法字符
-        import re
         chain_name = re.sub(r'[<>:"/\\|?*]', '_', chain_name)
         chain_name = chain_name.strip()
         
+        # 记录页面URL中的 chain_id -> 产业链名称映射（供chain-info页面查询）
+        page_url = data.get("page_url", "")
+        if "id=" in page_url:
+            self._record_chain_name(self._extract_chain_id(page_url), chain_name)
+        
         # 创建以产业链名命名的文件夹
         chain_dir = self.output_dir / chain_name
         chain_dir.mkdir(exist_ok=True, parents=True)
         
+        # 内容寻址存储：SVG内容保存为blob，产业链文件夹中只保存manifest
+        if self.svg_storage == "blobs":
+            manifest_path = chain_dir / SvgBlobStore.MANIFEST_NAME
+            self._save_svg_snapshot(manifest_path, chain_name, data)
+            self.chain_index.add(manifest_path)
+            return manifest_path
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # 保存SVG的HTML代码，使用产业链名称命名
@@ -1680,14 +6152,12 @@ class ManualBrowserScraper:
         if svg_data.get("svg_content"):
             html_filename = f"{chain_name}_{timestamp}.txt"
             html_filepath = chain_dir / html_filename
-            with open(html_filepath, 'w', encoding='utf-8') as f:
-                for idx, svg_html in enumerate(svg_data["svg_content"], 1):
-                    f.write(f"\n{'='*80}\n")
-                    f.write(f"SVG #{idx + 1}\n")
-                    f.write(f"{'='*80}\n")
-                    f.write(svg_html)
-                    f.write("\n")
-            print(f"    [保存] SVG代码已保存: {html_filepath}")
+            self.file_writer.submit(html_filepath, lambda svg_content=svg_data["svg_content"]: "".join(
+                f"\n{'='*80}\nSVG #{idx + 1}\n{'='*80}\n{svg_html}\n"
+                for idx, svg_html in enumerate(svg_content, 1)
+            ))
+            self.chain_index.add(html_filepath)
+            logger.debug("[保存] SVG代码已提交写入: %s", html_filepath)
         
         # 保存SVG文件（从URL下载的），使用产业链名称命名
         if svg_data.get("svg_files"):
@@ -1695,18 +6165,17 @@ class ManualBrowserScraper:
                 svg_url = svg_file["url"]
                 
                 # 只保存SVG格式的文件
-                from urllib.parse import urlparse
                 parsed = urlparse(svg_url)
                 url_path = parsed.path.lower()
                 
                 if not url_path.endswith('.svg'):
-                    print(f"    [跳过] 非SVG文件，不保存: {svg_url}")
+                    logger.info("[跳过] 非SVG文件，不保存: %s", svg_url)
                     continue
                 
                 # 验证内容是否是SVG格式
                 content = svg_file.get("content", "")
                 if not content or ('<svg' not in content.lower() and not content.strip().startswith('<?xml')):
-                    print(f"    [跳过] 内容不是SVG格式，不保存: {svg_url}")
+                    logger.info("[跳过] 内容不是SVG格式，不保存: %s", svg_url)
                     continue
                 
                 # 使用产业链名称命名SVG文件
@@ -1718,9 +6187,9 @@ class ManualBrowserScraper:
                     svg_filename = f"{chain_name}_{timestamp}_{idx}.svg"
                 
                 svg_filepath = chain_dir / svg_filename
-                with open(svg_filepath, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                print(f"    [保存] SVG文件已保存: {svg_filepath}")
+                self.file_writer.write_text(svg_filepath, content)
+                self.chain_index.add(svg_filepath)
+                logger.debug("[保存] SVG文件已提交写入: %s", svg_filepath)
         
         # 返回保存的txt文件路径（如果没有txt文件，返回第一个SVG文件路径）
         if svg_data.get("svg_content"):
@@ -1730,6 +6199,52 @@ class ManualBrowserScraper:
         else:
             return chain_dir / f"{chain_name}_{timestamp}.txt"
     
+    def _save_svg_snapshot(self, manifest_path: Path, chain_name: str, data: dict):
+        """
+        把一次采集的SVG写入内容寻址存储，并在manifest中记录本次采集
+        
+        Args:
+            manifest_path: manifest文件路径
+            chain_name: 清理后的产业链名称
+            data: 要保存的数据（包含 svg_data、svg_url、page_url）
+            
+        Returns:
+            dict: manifest中的快照记录
+        """
+        svg_data = data.get("svg_data", {})
+        blobs = []
+        created = 0
+        
+        # SVG代码（页面中的内联SVG）
+        for svg_html in svg_data.get("svg_content") or []:
+            if not svg_html:
+                continue
+            blob = self.svg_blob_store.put(svg_html)
+            created += blob["created"]
+            blobs.append({"blob_id": blob["blob_id"], "kind": "inline", "bytes": blob["bytes"]})
+        
+        # SVG文件（从URL下载的），只保存SVG格式的文件
+        for svg_file in svg_data.get("svg_files") or []:
+            svg_url = svg_file.get("url", "")
+            if not urlparse(svg_url).path.lower().endswith('.svg'):
+                logger.info("[跳过] 非SVG文件，不保存: %s", svg_url)
+                continue
+            content = svg_file.get("content", "")
+            if not content or ('<svg' not in content.lower() and not content.strip().startswith('<?xml')):
+                logger.info("[跳过] 内容不是SVG格式，不保存: %s", svg_url)
+                continue
+            blob = self.svg_blob_store.put(content)
+            created += blob["created"]
+            blobs.append({"blob_id": blob["blob_id"], "kind": "file", "bytes": blob["bytes"], "source_url": svg_url})
+        
+        info = {key: data[key] for key in ("svg_url", "page_url") if data.get(key)}
+        snapshot = self.svg_blob_store.add_snapshot(manifest_path, chain_name, blobs, info)
+        if snapshot.get("times_seen", 1) > 1:
+            logger.debug("[保存] SVG内容未变化，已更新manifest: %s", manifest_path)
+        else:
+            logger.debug("[保存] SVG已提交写入（%s 个blob，其中新增 %s 个）: %s", len(blobs), created, manifest_path)
+        return snapshot
+    
     async def _handle_navigation(self, frame, context):
         """
         处理页面导航事件
@@ -1743,39 +6258,39 @@ class ManualBrowserScraper:
             return
         
         url = frame.url
-        print(f"\n{'='*80}")
-        print(f"[导航事件] 检测到导航: {url}")
-        print(f"{'='*80}")
+        logger.debug("[导航事件] 检测到导航: %s", url)
         
         # 规范化URL，用于去重检查
         normalized_url = self._normalize_url(url)
         
-        # 判断页面类型并处理
+        # 判断页面类型并交给调度器处理（同一URL正在排队或采集中时由调度器跳过重复触发）
         if "chain-info" in url:
             # 处理 chain-info 页面（项目列表采集）
-            await self._handle_chain_info_page(frame, context, url)
+            await self._submit_collection(
+                "chain-info", normalized_url,
+                lambda: self._handle_chain_info_page(frame, context, url)
+            )
         elif "chain-detail" in url:
             # 处理 chain-detail 页面（SVG采集，原有逻辑）
-            # 如果正在采集同一个URL，跳过（避免重复触发）
-            if self.is_collecting and normalized_url in self.collected_urls:
-                print(f"[跳过] 该URL正在采集中，跳过重复触发: {normalized_url}")
-                return
-            await self._handle_chain_detail_page(frame, context, url)
+            await self._submit_collection(
+                "chain-detail", normalized_url,
+                lambda: self._handle_chain_detail_page(frame, context, url)
+            )
         elif "product-details" in url:
             # 处理 product-details 页面（产品详情采集）
-            # 如果正在采集同一个URL，跳过（避免重复触发）
-            if self.is_collecting and normalized_url in self.collected_product_details_urls:
-                print(f"[跳过] 该URL正在采集中，跳过重复触发: {normalized_url}")
-                return
-            await self._handle_product_details_page(frame, context, url)
+            await self._submit_collection(
+                "product-details", normalized_url,
+                lambda: self._handle_product_details_page(frame, context, url)
+            )
         elif "industry-chain" in url:
             # industry-chain 页面，只提示，不采集（SVG采集通过SVG URL变化监听）
-            print(f"[提示] 检测到 industry-chain 页面，请点击产业链按钮")
-            print(f"      工具会自动监听SVG URL变化并采集数据")
+            logger.info("[提示] 检测到 industry-chain 页面，请点击产业链按钮")
+            logger.info("工具会自动监听SVG URL变化并采集数据")
         else:
-            print(f"[跳过] URL不是目标页面类型，跳过处理")
+            logger.debug("[跳过] URL不是目标页面类型，跳过处理")
     
-    async def _handle_chain_detail_page(self, frame, context, url):
+    @traced_collection("chain-detail")
+    async def _handle_chain_detail_page(self, frame, context, url, force=False):
         """
         处理 chain-detail 页面（原有SVG采集逻辑）
         
@@ -1783,53 +6298,45 @@ class ManualBrowserScraper:
             frame: 导航的frame对象
             context: 浏览器上下文对象
             url: 页面URL
+            force: 已采集过也重新采集，不检查数据是否有更新（批量刷新模式），默认False
+            
+        Returns:
+            dict: 采集结果，跳过时返回None（采集失败时抛出异常，由调度器或批量采集worker记录并重试）
         """
-        print(f"[目标URL] 确认是chain-detail页面，开始处理...")
+        logger.debug("[目标URL] 确认是chain-detail页面，开始处理...")
         
         # 规范化URL（去除可能的尾随斜杠和查询参数顺序差异）
         normalized_url = self._normalize_url(url)
         
-        # 检查是否正在采集（防止并发重复采集）
-        if self.is_collecting:
-            print(f"[跳过] 正在采集其他页面，等待完成: {normalized_url}")
-            # 等待当前采集完成
-            while self.is_collecting:
-                await asyncio.sleep(0.5)
-            # 采集完成后，再次检查是否已采集
-            if normalized_url in self.collected_urls:
-                print(f"[跳过] 该URL已在其他任务中采集: {normalized_url}")
-                return
-        
         # 立即检查并标记，避免并发重复采集（在页面加载之前就检查）
-        if normalized_url in self.collected_urls:
+        if normalized_url in self.collected_urls and not force:
             # 已采集过，检查数据是否有更新（不加载页面，只获取URL）
-            print(f"\n[检查] 该URL已采集过，检查数据是否有更新: {normalized_url}")
+            logger.info("[检查] 该URL已采集过，检查数据是否有更新: %s", normalized_url)
             page = frame.page
             # 快速检查（不下载内容，只获取URL）
             data_updated = await self._quick_check_data_update(page, normalized_url, context)
             if not data_updated:
-                print(f"[跳过] 数据未更新，跳过采集（未执行任何下载操作）: {normalized_url}")
+                logger.info("[跳过] 数据未更新，跳过采集（未执行任何下载操作）: %s", normalized_url)
+                metrics_outcome("unchanged")
                 return
-            print(f"[数据已更新] 检测到数据变化，将重新采集: {normalized_url}")
-        else:
-            # 首次采集，立即标记为已采集（在开始处理前就标记，避免并发问题）
-            self.collected_urls.add(normalized_url)
-            print(f"[标记] URL已标记为已采集: {normalized_url}")
+            logger.info("[数据已更新] 检测到数据变化，将重新采集: %s", normalized_url)
+        # 首次采集的URL在保存成功后才标记为已采集（并发重复采集由调度器按URL去重）
         
         # 检查通过后，才开始页面加载和下载操作
         page = frame.page
         user_interacting = await self._check_user_interacting(page)
         if user_interacting:
-            print(f"[警告] 检测到用户操作，但继续尝试采集: {url}")
+            logger.warning("[警告] 检测到用户操作，但继续尝试采集: %s", url)
             # 不返回，继续采集
         
-        print(f"[等待页面加载] {url}")
+        logger.debug("[等待页面加载] %s", url)
         # 等待页面加载完成
-        try:
-            await page.wait_for_load_state("networkidle", timeout=20000)
-            print("[页面加载] networkidle状态已到达")
-        except Exception as e:
-            print(f"[警告] 等待networkidle超时: {e}")
+        with metrics_stage("wait_load"):
+            try:
+                await page.wait_for_load_state("networkidle", timeout=self.profile["page_load_timeout"] * 1000)
+                logger.debug("[页面加载] networkidle状态已到达")
+            except Exception as e:
+                logger.warning("[警告] 等待networkidle超时: %s", e)
         
         # 恢复窗口最大化（保持最大化状态）
         await self._set_window_maximized(page)
@@ -1837,53 +6344,38 @@ class ManualBrowserScraper:
         # 确保页面可以滚动
         await self._ensure_page_scrollable(page)
         
-        # 等待更长时间确保页面完全渲染，特别是object#svgframe元素
-        print("[等待页面渲染] 等待8秒确保SVG加载...")
-        await asyncio.sleep(8)
-        
-        # 等待 object#svgframe 元素出现（最多等待15秒）
-        element_found = False
-        try:
-            print("[等待元素] 等待 object#svgframe 元素加载...")
-            await page.wait_for_selector('object#svgframe', timeout=15000, state='attached')
-            print("[元素就绪] object#svgframe 元素已加载")
-            element_found = True
-        except Exception as e:
-            print(f"[警告] 等待 object#svgframe 元素超时: {e}")
-            # 继续尝试，可能元素已经存在但选择器有问题
-            # 尝试查找元素是否存在
+        # 等待 object#svgframe 的SVG加载完成（条件满足立即返回，最多等待chain-detail的时间预算）
+        with metrics_stage("wait_load"):
+            element_found = await self._wait_for_svg_ready(page, "chain-detail")
+        if not element_found:
+            # 继续尝试，可能元素已经存在但SVG加载状态无法判断
             element = await page.query_selector('object#svgframe')
             if element:
-                print("[元素检查] object#svgframe 元素已存在")
-                element_found = True
-        
-        if not element_found:
-            print("[警告] 未找到 object#svgframe 元素，但继续尝试采集...")
+                logger.debug("[元素检查] object#svgframe 元素已存在")
+            else:
+                logger.warning("[警告] 未找到 object#svgframe 元素，但继续尝试采集...")
         
         # 不再检查用户操作，直接开始采集
         
         # 滚动页面以加载所有懒加载内容
-        print("[滚动加载] 开始滚动页面以加载所有内容...")
-        await self._scroll_to_load_all_content(page)
+        logger.debug("[滚动加载] 开始滚动页面以加载所有内容...")
+        with metrics_stage("scroll"):
+            await self._scroll_to_load_all_content(page)
         
         # 开始采集
-        print(f"\n{'='*80}")
-        print(f"[开始采集] {normalized_url}")
-        print(f"原始URL: {url}")
-        print(f"{'='*80}")
-        
-        self.is_collecting = True
-        # URL已经在前面标记过了，这里不需要再次添加
+        logger.info("[开始采集] %s", normalized_url)
+        logger.debug("原始URL: %s", url)
         
         try:
             # 提取chain_id
             chain_id = self._extract_chain_id(url)
             
             # 采集SVG数据
-            svg_data = await self._extract_svg_data(page, context)
-            
-            # 提取页面信息
-            page_info = await self._extract_page_info(page)
+            with metrics_stage("extract"):
+                svg_data = await self._extract_svg_data(page, context)
+                
+                # 提取页面信息
+                page_info = await self._extract_page_info(page)
             
             # 组合结果
             result = {
@@ -1895,23 +6387,37 @@ class ManualBrowserScraper:
             }
             
             # 保存数据
-            output_file = self._save_data(result, chain_id)
-            print(f"[采集完成] 数据已保存到: {output_file}")
+            with metrics_stage("save"):
+                output_file = self._save_data(result, chain_id)
+                await self._wait_for_writes()
+            logger.info("[采集完成] 数据已保存到: %s", output_file)
             
             # 更新数据哈希（用于后续检测数据更新）
-            data_hash = self._calculate_data_hash(svg_data)
+            with metrics_stage("hash"):
+                data_hash = await asyncio.to_thread(self._calculate_data_hash, svg_data)
             self.detail_page_data_hashes[normalized_url] = data_hash
-            print(f"[数据哈希] 已更新数据哈希: {data_hash[:8]}...")
-            print(f"{'='*80}\n")
+            svg_url = self._detail_svg_url(svg_data)
+            if svg_url:
+                self.detail_page_svg_urls[normalized_url] = svg_url
+                # 保存的内容来自SVG响应时，记录该响应的 ETag / Last-Modified 和内容指纹；
+                # 内容来自页面DOM时缓存中的响应不一定是同一版本，清除上次的记录
+                validators = {}
+                if any(tag.get("method") == "download" for tag in svg_data.get("object_tags") or []):
+                    validators = self.svg_response_cache.validators(svg_url) or {}
+                self.state_store.record_validators(
+                    normalized_url, validators.get("etag"), validators.get("last_modified"), validators.get("fingerprint")
+                )
+            self.collected_urls.record(normalized_url, content_hash=data_hash, output_path=output_file)
+            logger.debug("[数据哈希] 已更新数据哈希: %s...", data_hash[:8])
+            return result
             
         except Exception as e:
-            print(f"[采集错误] {str(e)}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            self.is_collecting = False
+            metrics_outcome("error")
+            logger.error("[采集错误] %s", str(e))
+            raise
     
-    async def _handle_chain_info_page(self, frame, context, url):
+    @traced_collection("chain-info")
+    async def _handle_chain_info_page(self, frame, context, url, force=False):
         """
         处理 chain-info 页面，提取项目列表
         
@@ -1919,65 +6425,81 @@ class ManualBrowserScraper:
             frame: 导航的frame对象
             context: 浏览器上下文对象
             url: 页面URL
+            force: 已采集过也重新采集（批量刷新模式），默认False
+            
+        Returns:
+            dict: 采集结果，跳过时返回None（采集失败时抛出异常，由调度器或批量采集worker记录并重试）
         """
         normalized_url = self._normalize_url(url)
         
-        # 检查是否正在采集（防止并发重复采集）
-        if self.is_collecting:
-            print(f"[跳过] 正在采集其他页面，等待完成: {normalized_url}")
-            # 等待当前采集完成
-            while self.is_collecting:
-                await asyncio.sleep(0.5)
-            # 采集完成后，再次检查是否已采集
-            if normalized_url in self.collected_chain_info_urls:
-                print(f"[跳过] 该URL已在其他任务中采集: {normalized_url}")
-                return
-        
         # 检查是否已经采集过（在页面加载之前就检查）
         is_first_collection = normalized_url not in self.collected_chain_info_urls
         
-        if not is_first_collection:
+        if not is_first_collection and not force:
             # 已采集过，直接跳过（chain-info只采集一遍，不执行任何下载操作）
-            print(f"[跳过] 该chain-info页面已采集过，跳过采集（未执行任何下载操作）: {normalized_url}")
+            logger.info("[跳过] 该chain-info页面已采集过，跳过采集（未执行任何下载操作）: %s", normalized_url)
+            self.project_list_captures.pop(normalized_url, None)
+            metrics_outcome("skipped")
             return
-        else:
-            # 首次采集，立即标记为已采集（在开始处理前就标记，避免并发问题）
-            self.collected_chain_info_urls.add(normalized_url)
-            print(f"[标记] URL已标记为已采集: {normalized_url}")
+        # 首次采集的URL在保存成功后才标记为已采集
         
         # 检查通过后，才开始页面加载和下载操作
         page = frame.page
-        print(f"[等待页面加载] {url}")
+        logger.debug("[等待页面加载] %s", url)
         
-        try:
-            await page.wait_for_load_state("networkidle", timeout=20000)
-            print("[页面加载] networkidle状态已到达")
-        except Exception as e:
-            print(f"[警告] 等待networkidle超时: {e}")
+        with metrics_stage("wait_load"):
+            try:
+                await page.wait_for_load_state("networkidle", timeout=self.profile["page_load_timeout"] * 1000)
+                logger.debug("[页面加载] networkidle状态已到达")
+            except Exception as e:
+                logger.warning("[警告] 等待networkidle超时: %s", e)
         
         # 确保页面可以滚动
         await self._ensure_page_scrollable(page)
         
-        # 等待表格加载
-        print("[等待表格加载] 等待3秒确保表格渲染...")
-        await asyncio.sleep(3)
-        
-        # 滚动页面以加载所有懒加载内容（固定滚动4次）
-        print("[滚动加载] 开始滚动页面以加载所有项目数据（固定滚动4次）...")
-        await self._scroll_to_load_all_content(page, max_scrolls=4, scroll_delay=2.0, force_scroll=True)
-        
-        print(f"\n{'='*80}")
-        print(f"[开始采集项目列表] {normalized_url}")
-        print(f"{'='*80}")
+        # 等待表格加载（表格行数稳定后立即返回）
+        with metrics_stage("wait_load"):
+            await self._wait_for_table_stable(page, "chain-info")
+        
+        # 优先使用拦截到的项目列表接口数据（API模式），未拦截到时回退到滚动+解析表格（DOM模式）
+        project_capture = self.project_list_captures.get(normalized_url)
+        use_api = self.chain_info_mode != "dom" and project_capture is not None and len(project_capture.records) > 0
+        if use_api and self.chain_info_mode == "auto":
+            # auto模式下先与页面表格比对，确认拦截到的确实是表格的数据
+            rendered_rows = await self._rendered_project_rows(page)
+            if not project_capture.matches_table(rendered_rows):
+                logger.warning("[API模式] 拦截到的接口数据与页面表格不一致（表格 %s 行），改为解析表格", len(rendered_rows))
+                use_api = False
+        if use_api:
+            logger.info("[API模式] 已拦截到项目列表接口数据（%s 条），滚动加载剩余分页...", len(project_capture.records))
+            with metrics_stage("scroll"):
+                await self._load_all_project_pages(page, project_capture)
+        else:
+            if self.chain_info_mode == "api":
+                logger.warning("[警告] 未拦截到项目列表接口数据，回退到解析表格")
+            # 滚动期间流式收集表格行（虚拟滚动移除的行不会丢失）
+            await self._start_project_row_stream(page, normalized_url)
+            # 滚动页面以加载所有懒加载内容（内容连续两次不再增长时提前停止）
+            logger.debug("[滚动加载] 开始滚动页面以加载所有项目数据...")
+            with metrics_stage("scroll"):
+                await self._scroll_to_load_all_content(page, force_scroll=True)
         
-        self.is_collecting = True
+        logger.info("[开始采集项目列表] %s", normalized_url)
         
         try:
-            # 提取项目列表
-            project_list = await self._extract_project_list(page)
-            
-            # 提取页面信息
-            page_info = await self._extract_chain_info_page_info(page, url)
+            with metrics_stage("extract"):
+                # 提取项目列表
+                if use_api:
+                    project_list = project_capture.to_list()
+                else:
+                    row_capture = await self._finish_project_row_stream(page, normalized_url)
+                    if row_capture is not None and row_capture.records:
+                        project_list = row_capture.to_list()
+                    else:
+                        project_list = await self._extract_project_list(page)
+                
+                # 提取页面信息
+                page_info = await self._extract_chain_info_page_info(page, url)
             
             # 组合结果
             result = {
@@ -1986,7 +6508,8 @@ class ManualBrowserScraper:
                 "scrape_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "page_info": page_info,
                 "project_list": project_list,
-                "project_count": len(project_list)
+                "project_count": len(project_list),
+                "data_source": "api" if use_api else "dom"
             }
             
             # 保存数据
@@ -2002,24 +6525,30 @@ class ManualBrowserScraper:
             if not sub_chain_name:
                 sub_chain_name = main_chain_name or "unknown"
             
-            output_file = self._save_chain_info_data(result, main_chain_name, sub_chain_name)
-            print(f"[采集完成] 数据已保存到: {output_file}")
-            print(f"[项目数量] 共采集 {len(project_list)} 个项目")
+            with metrics_stage("save"):
+                output_file = self._save_chain_info_data(result, main_chain_name, sub_chain_name)
+                await self._wait_for_writes()
+            logger.info("[采集完成] 数据已保存到: %s", output_file)
+            logger.info("[项目数量] 共采集 %s 个项目", len(project_list))
             
             # 更新数据哈希（用于后续检测数据更新）
-            data_hash = self._calculate_chain_info_data_hash(project_list)
+            with metrics_stage("hash"):
+                data_hash = self._calculate_chain_info_data_hash(project_list)
             self.chain_info_page_data_hashes[normalized_url] = data_hash
-            print(f"[数据哈希] 已更新数据哈希: {data_hash[:8]}...")
-            print(f"{'='*80}\n")
+            self.collected_chain_info_urls.record(normalized_url, content_hash=data_hash, output_path=output_file)
+            logger.debug("[数据哈希] 已更新数据哈希: %s...", data_hash[:8])
+            return result
             
         except Exception as e:
-            print(f"[采集错误] {str(e)}")
-            import traceback
-            traceback.print_exc()
+            metrics_outcome("error")
+            logger.error("[采集错误] %s", str(e))
+            raise
         finally:
-            self.is_collecting = False
+            self.project_list_captures.pop(normalized_url, None)
+            self.project_row_streams.pop(normalized_url, None)
     
-    async def _handle_product_details_page(self, frame, context, url):
+    @traced_collection("product-details")
+    async def _handle_product_details_page(self, frame, context, url, force=False):
         """
         处理 product-details 页面，提取产品详情数据
         
@@ -2027,52 +6556,40 @@ class ManualBrowserScraper:
             frame: 导航的frame对象
             context: 浏览器上下文对象
             url: 页面URL
+            force: 已采集过也重新采集（批量刷新模式），默认False
+            
+        Returns:
+            dict: 采集结果，跳过时返回None（采集失败时抛出异常，由调度器或批量采集worker记录并重试）
         """
         normalized_url = self._normalize_url(url)
         
-        # 检查是否正在采集（防止并发重复采集）
-        if self.is_collecting:
-            print(f"[跳过] 正在采集其他页面，等待完成: {normalized_url}")
-            # 等待当前采集完成
-            while self.is_collecting:
-                await asyncio.sleep(0.5)
-            # 采集完成后，再次检查是否已采集
-            if normalized_url in self.collected_product_details_urls:
-                print(f"[跳过] 该URL已在其他任务中采集: {normalized_url}")
-                return
-        
         # 检查是否已经采集过（在页面加载之前就检查）
         is_first_collection = normalized_url not in self.collected_product_details_urls
         
-        if not is_first_collection:
+        if not is_first_collection and not force:
             # 已采集过，直接跳过（product-details只采集一遍，不进行数据更新检测）
-            print(f"[跳过] 该product-details页面已采集过，跳过采集（未执行任何下载操作）: {normalized_url}")
+            logger.info("[跳过] 该product-details页面已采集过，跳过采集（未执行任何下载操作）: %s", normalized_url)
+            metrics_outcome("skipped")
             return
-        else:
-            # 首次采集，立即标记为已采集（在开始处理前就标记，避免并发问题）
-            self.collected_product_details_urls.add(normalized_url)
-            print(f"[标记] URL已标记为已采集: {normalized_url}")
+        # 首次采集的URL在保存成功后才标记为已采集
         
         # 检查通过后，才开始页面加载和下载操作
         page = frame.page
-        print(f"[等待页面加载] {url}")
+        logger.debug("[等待页面加载] %s", url)
         
-        # 无感采集：等待3秒后自动采集，不进行滚动操作，不影响用户使用
-        print("[无感采集] 等待3秒后自动采集，不进行滚动操作...")
-        await asyncio.sleep(3)
+        # 无感采集：项目信息和工商信息渲染完成后自动采集，不进行滚动操作，不影响用户使用
+        with metrics_stage("wait_load"):
+            await self._wait_for_product_details_ready(page)
         
-        print(f"\n{'='*80}")
-        print(f"[开始采集产品详情] {normalized_url}")
-        print(f"{'='*80}")
-        
-        self.is_collecting = True
+        logger.info("[开始采集产品详情] %s", normalized_url)
         
         try:
             # 提取产品详情数据（项目名称、公司名称和工商信息）
-            product_data = await self._extract_product_details_data(page)
-            
-            # 提取页面信息
-            page_info = await self._extract_product_details_page_info(page, url)
+            with metrics_stage("extract"):
+                product_data = await self._extract_product_details_data(page)
+                
+                # 提取页面信息
+                page_info = await self._extract_product_details_page_info(page, url)
             
             # 组合结果
             result = {
@@ -2087,27 +6604,243 @@ class ManualBrowserScraper:
             
             # 保存数据
             project_name = product_data.get("project_name") or page_info.get("project_name", "unknown")
-            output_file = self._save_product_details_data(result, project_name)
-            print(f"[采集完成] 数据已保存到: {output_file}")
+            with metrics_stage("save"):
+                output_file = self._save_product_details_data(result, project_name)
+                await self._wait_for_writes()
+            logger.info("[采集完成] 数据已保存到: %s", output_file)
             
             # 更新数据哈希（用于后续检测数据更新）
-            data_hash = self._calculate_product_details_data_hash(product_data)
+            with metrics_stage("hash"):
+                data_hash = self._calculate_product_details_data_hash(product_data)
             self.product_details_page_data_hashes[normalized_url] = data_hash
-            print(f"[数据哈希] 已更新数据哈希: {data_hash[:8]}...")
-            print(f"{'='*80}\n")
+            self.collected_product_details_urls.record(normalized_url, content_hash=data_hash, output_path=output_file)
+            logger.debug("[数据哈希] 已更新数据哈希: %s...", data_hash[:8])
+            return result
             
         except Exception as e:
-            print(f"[采集错误] {str(e)}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            self.is_collecting = False
+            metrics_outcome("error")
+            logger.error("[采集错误] %s", str(e))
+            raise
+    
+    async def _load_all_project_pages(self, page, capture, idle_timeout=3.0, max_scrolls=200):
+        """
+        API模式：滚动到底部触发下一页接口请求，直到接口数据全部到达或不再有新的接口响应
+        
+        Args:
+            page: Playwright页面对象
+            capture: 该页面的项目列表接口拦截结果
+            idle_timeout: 滚动后等待下一页接口数据的最长时间（秒）
+            max_scrolls: 最大滚动次数
+        """
+        scroll_count = 0
+        while scroll_count < max_scrolls and not capture.is_complete:
+            capture.clear_update()
+            try:
+                await page.evaluate("""
+                    () => {
+                        window.scrollTo(0, Math.max(
+                            document.documentElement.scrollHeight,
+                            document.body.scrollHeight
+                        ));
+                    }
+                """)
+            except Exception as e:
+                logger.warning("[API模式] 滚动失败: %s", e)
+                break
+            scroll_count += 1
+            if not await capture.wait_for_update(idle_timeout):
+                break
+        total_text = f"/{capture.total}" if capture.total is not None else ""
+        logger.info("[API模式] 接口数据加载完成：%s%s 条，%s 个接口响应，滚动 %s 次", len(capture.records), total_text, capture.responses,
+                    scroll_count)
+    
+    async def _start_project_row_stream(self, page, stream_key: str, batch_size: int = 50, flush_ms: int = 250):
+        """
+        启动表格行流式采集：页面内的MutationObserver在行被插入或内容被替换（虚拟滚动复用行）时解析该行，
+        按项目链接去重后分批通过页面事件绑定推送到Python，页面内只保留去重key，不保留行数据
+        
+        Args:
+            page: Playwright页面对象
+            stream_key: 流式采集key（规范化的页面URL）
+            batch_size: 每批推送的最多行数，默认50
+            flush_ms: 未满一批时的推送间隔（毫秒），默认250
+            
+        Returns:
+            ProjectListCapture: 收集推送行的对象，启动失败返回None
+        """
+        capture = ProjectListCapture()
+        self.project_row_streams[stream_key] = capture
+        try:
+            initial = await page.evaluate("""
+                ({ streamKey, columns, batchSize, flushMs }) => {
+                    if (window.__projectRowStream) {
+                        window.__projectRowStream.stop();
+                    }
+                    const parseRow = """ + PROJECT_ROW_PARSER_JS + """;
+                    const seen = new Set();
+                    let buffer = [];
+                    let total = 0;
+                    
+                    const flush = () => {
+                        // 页面事件绑定不可用时保留在缓冲区，由stop()一次性返回
+                        if (!buffer.length || typeof window.__scraper_notify !== 'function') {
+                            return;
+                        }
+                        const rows = buffer;
+                        buffer = [];
+                        window.__scraper_notify({ type: 'project_rows', key: streamKey, columns, rows }).catch(() => {});
+                    };
+                    const take = (row) => {
+                        if (!row || row.tagName !== 'TR' || !row.closest('tbody')) {
+                            return;
+                        }
+                        let project = null;
+                        try {
+                            project = parseRow(row);
+                        } catch (e) {
+                            return;
+                        }
+                        if (!project) {
+                            return;
+                        }
+                        const key = project[7] || project[0];  // project_url，没有链接时用 project_name
+                        if (seen.has(key)) {
+                            return;
+                        }
+                        seen.add(key);
+                        buffer.push(project);
+                        total += 1;
+                        if (buffer.length >= batchSize) {
+                            flush();
+                        }
+                    };
+                    
+                    document.querySelectorAll('table.shadow-table tbody tr, table tbody tr').forEach(take);
+                    
+                    const observer = new MutationObserver((mutations) => {
+                        for (const mutation of mutations) {
+                            mutation.addedNodes.forEach((node) => {
+                                if (node.nodeType !== 1) {
+                                    return;
+                                }
+                                if (node.tagName === 'TR') {
+                                    take(node);
+                                } else if (node.querySelectorAll) {
+                                    node.querySelectorAll('tr').forEach(take);
+                                }
+                            });
+                            // 行内容被替换（虚拟滚动复用行节点）时重新解析所在的行
+                            const target = mutation.target.nodeType === 1 ? mutation.target : mutation.target.parentElement;
+                            if (target && target.closest) {
+                                take(target.closest('tr'));
+                            }
+                        }
+                    });
+                    observer.observe(document.body || document.documentElement, {
+                        childList: true, subtree: true, characterData: true
+                    });
+                    const timer = setInterval(flush, flushMs);
+                    
+                    window.__projectRowStream = {
+                        stop: () => {
+                            observer.disconnect();
+                            clearInterval(timer);
+                            const rows = buffer;
+                            buffer = [];
+                            window.__projectRowStream = null;
+                            return { columns, rows, total };
+                        }
+                    };
+                    flush();
+                    return total;
+                }
+            """, {"streamKey": stream_key, "columns": list(PROJECT_ROW_COLUMNS), "batchSize": batch_size, "flushMs": flush_ms})
+            logger.info("[流式采集] 已启动表格行流式采集（当前 %s 行）", initial)
+            return capture
+        except Exception as e:
+            logger.warning("[流式采集] 启动失败，将在滚动结束后解析表格: %s", e)
+            self.project_row_streams.pop(stream_key, None)
+            return None
+    
+    async def _finish_project_row_stream(self, page, stream_key: str):
+        """
+        停止表格行流式采集，合并页面内缓冲区中剩余的行
+        
+        Args:
+            page: Playwright页面对象
+            stream_key: 流式采集key
+            
+        Returns:
+            ProjectListCapture: 收集到的项目行，未启动流式采集时返回None
+        """
+        capture = self.project_row_streams.pop(stream_key, None)
+        if capture is None:
+            return None
+        try:
+            result = await page.evaluate("""
+                () => window.__projectRowStream ? window.__projectRowStream.stop() : { columns: [], rows: [], total: null }
+            """)
+            if result.get("rows"):
+                capture.merge(decode_row_tuples(result))
+            logger.info("[流式采集] 共收到 %s 行（分 %s 批推送）", len(capture.records), capture.responses)
+        except Exception as e:
+            logger.warning("[流式采集] 停止失败: %s", e)
+        return capture
+    
+    def _on_project_rows(self, event):
+        """
+        合并页面推送的一批表格行（在绑定回调中同步执行，保证先于停止时返回的剩余行合并）
+        
+        Args:
+            event: {"type": "project_rows", "key": 流式采集key, "columns": [...], "rows": [[...], ...]}
+        """
+        capture = self.project_row_streams.get(event.get("key"))
+        if capture is not None and event.get("rows"):
+            capture.merge(decode_row_tuples(event))
+    
+    async def _rendered_project_rows(self, page, limit: int = 20) -> list:
+        """
+        读取页面表格当前显示的前几行的项目名称和链接（用于核对拦截到的接口数据）
+        
+        Args:
+            page: Playwright页面对象
+            limit: 最多读取的行数
+            
+        Returns:
+            list: [(项目名称, 项目链接), ...]，读取失败返回空列表
+        """
+        try:
+            rows = await page.evaluate("""
+                (limit) => {
+                    const table = document.querySelector('table.shadow-table, table');
+                    const tbody = table ? table.querySelector('tbody.table-tbody, tbody') : null;
+                    if (!tbody) {
+                        return [];
+                    }
+                    const parseRow = """ + PROJECT_ROW_PARSER_JS + """;
+                    const result = [];
+                    for (const row of tbody.querySelectorAll('tr')) {
+                        const project = parseRow(row);
+                        if (project) {
+                            result.push([project[0], project[7]]);
+                            if (result.length >= limit) {
+                                break;
+                            }
+                        }
+                    }
+                    return result;
+                }
+            """, limit)
+        except Exception as e:
+            logger.debug("[API模式] 读取表格行失败: %s", e)
+            return []
+        return [(name, url) for name, url in rows]
     
     async def _extract_project_list(self, page):
         """从页面提取项目列表"""
         project_list = await page.evaluate("""
             () => {
-                const projects = [];
+                const projects = { columns: """ + json.dumps(list(PROJECT_ROW_COLUMNS) + ["row_index"]) + """, rows: [] };
                 
                 // 查找表格
                 const table = document.querySelector('table.shadow-table, table');
@@ -2127,73 +6860,13 @@ class ManualBrowserScraper:
                 const rows = tbody.querySelectorAll('tr');
                 console.log(`找到 ${rows.length} 行数据`);
                 
+                const parseRow = """ + PROJECT_ROW_PARSER_JS + """;
                 rows.forEach((row, index) => {
                     try {
-                        const cells = row.querySelectorAll('td');
-                        if (cells.length < 7) {
-                            return; // 跳过不完整的行
-                        }
-                        
-                        // 提取项目名称
-                        const nameCell = cells[0];
-                        const nameLink = nameCell.querySelector('a');
-                        const projectName = nameLink ? (nameLink.textContent || nameLink.getAttribute('title') || '').trim() : '';
-                        
-                        // 提取业务简述
-                        const businessCell = cells[1];
-                        const businessText = businessCell ? (businessCell.textContent || '').trim() : '';
-                        
-                        // 提取项目地区
-                        const regionCell = cells[2];
-                        const region = regionCell ? (regionCell.textContent || '').trim() : '';
-                        
-                        // 提取轮次
-                        const roundCell = cells[3];
-                        const round = roundCell ? (roundCell.textContent || '').trim() : '';
-                        
-                        // 提取时间
-                        const timeCell = cells[4];
-                        const time = timeCell ? (timeCell.textContent || '').trim() : '';
-                        
-                        // 提取金额
-                        const amountCell = cells[5];
-                        const amount = amountCell ? (amountCell.textContent || '').trim() : '';
-                        
-                        // 提取投资方
-                        const investorCell = cells[6];
-                        const investors = investorCell ? (investorCell.textContent || '').trim() : '';
-                        
-                        // 提取链接
-                        let projectUrl = '';
-                        if (nameLink) {
-                            // 获取href属性
-                            projectUrl = nameLink.getAttribute('href') || '';
-                            // 如果是相对路径，转换为绝对路径
-                            if (projectUrl && !projectUrl.startsWith('http')) {
-                                if (projectUrl.startsWith('/')) {
-                                    projectUrl = 'https://www.hanghangcha.com' + projectUrl;
-                                } else {
-                                    projectUrl = 'https://www.hanghangcha.com/' + projectUrl;
-                                }
-                            }
-                            // 如果还是没有，尝试从其他属性获取
-                            if (!projectUrl) {
-                                projectUrl = nameLink.getAttribute('data-url') || nameLink.getAttribute('data-href') || '';
-                            }
-                        }
-                        
-                        if (projectName) {
-                            projects.push({
-                                project_name: projectName,
-                                business_description: businessText,
-                                region: region,
-                                round: round,
-                                time: time,
-                                amount: amount,
-                                investors: investors,
-                                project_url: projectUrl,
-                                row_index: index + 1
-                            });
+                        const project = parseRow(row);
+                        if (project) {
+                            project.push(index + 1);
+                            projects.rows.push(project);
                         }
                     } catch (e) {
                         console.error(`提取第 ${index + 1} 行数据时出错:`, e);
@@ -2204,7 +6877,7 @@ class ManualBrowserScraper:
             }
         """)
         
-        return project_list or []
+        return decode_row_tuples(project_list)
     
     async def _extract_chain_info_page_info(self, page, url):
         """提取chain-info页面信息（区分产业链名称和细分领域名称）"""
@@ -2214,7 +6887,6 @@ class ManualBrowserScraper:
             page_info["title"] = await page.title()
             page_info["url"] = url
             
-            from urllib.parse import urlparse, parse_qs
             parsed = urlparse(url)
             params = parse_qs(parsed.query)
             
@@ -2315,9 +6987,7 @@ class ManualBrowserScraper:
                 page_info["description"] = description
                 
         except Exception as e:
-            print(f"[提取页面信息错误] {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[提取页面信息错误] %s", e)
         
         return page_info
     
@@ -2453,9 +7123,7 @@ class ManualBrowserScraper:
             product_data["business_info"] = business_info
             
         except Exception as e:
-            print(f"[提取产品详情数据错误] {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[提取产品详情数据错误] %s", e)
         
         return product_data
     
@@ -2482,7 +7150,7 @@ class ManualBrowserScraper:
                 page_info["project_name"] = project_name
                 
         except Exception as e:
-            print(f"[提取页面信息错误] {e}")
+            logger.error("[提取页面信息错误] %s", e)
         
         return page_info
     
@@ -2509,17 +7177,15 @@ class ManualBrowserScraper:
         if not sub_chain_name:
             sub_chain_name = "unknown"
         
-        # 在chain_info_output_dir下创建以产业链名称命名的子目录
+        # chain_info_output_dir下以产业链名称命名的子目录（由写入线程创建）
         chain_dir = self.chain_info_output_dir / main_chain_name
-        chain_dir.mkdir(exist_ok=True, parents=True)
         
-        # 不使用时间戳，使用固定文件名，新数据会覆盖旧数据
+        # 不使用时间戳，使用固定文件名，新数据会覆盖旧数据（尚未写入的旧数据直接被替换）
         # 保存JSON文件（使用细分领域名称作为文件名）
         json_filename = f"{sub_chain_name}.json"
         json_filepath = chain_dir / json_filename
-        with open(json_filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"    [保存] JSON数据已保存（覆盖）: {json_filepath}")
+        self.file_writer.write_json(json_filepath, data)
+        logger.debug("[保存] JSON数据已提交写入（覆盖）: %s", json_filepath)
         
         # 保存CSV文件（使用细分领域名称作为文件名）
         csv_filename = f"{sub_chain_name}.csv"
@@ -2532,16 +7198,9 @@ class ManualBrowserScraper:
                 "round", "time", "amount", "investors", "project_url", "row_index"
             ]
             
-            with open(csv_filepath, 'w', encoding='utf-8-sig', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                # 只写入fieldnames中定义的字段
-                filtered_list = []
-                for item in project_list:
-                    filtered_item = {k: v for k, v in item.items() if k in fieldnames}
-                    filtered_list.append(filtered_item)
-                writer.writerows(filtered_list)
-            print(f"    [保存] CSV数据已保存: {csv_filepath}")
+            # 只写入fieldnames中定义的字段
+            self.file_writer.write_csv(csv_filepath, fieldnames, project_list)
+            logger.debug("[保存] CSV数据已提交写入: %s", csv_filepath)
         
         return json_filepath
     
@@ -2558,9 +7217,8 @@ class ManualBrowserScraper:
         # 保存JSON文件
         json_filename = f"{project_name}.json"
         json_filepath = self.product_details_output_dir / json_filename
-        with open(json_filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"    [保存] JSON数据已保存（覆盖）: {json_filepath}")
+        self.file_writer.write_json(json_filepath, data)
+        logger.debug("[保存] JSON数据已提交写入（覆盖）: %s", json_filepath)
         
         return json_filepath
     
@@ -2574,9 +7232,6 @@ class ManualBrowserScraper:
         Returns:
             str: 数据哈希值
         """
-        import hashlib
-        import json
-        
         try:
             # 提取关键数据用于哈希计算（项目名称、公司名称和工商信息）
             business_info = product_data.get("business_info", {})
@@ -2587,12 +7242,9 @@ class ManualBrowserScraper:
                 "business_info_values": sorted(business_info.values())
             }
             
-            # 将数据转换为JSON字符串并计算哈希
-            data_str = json.dumps(hash_data, sort_keys=True, ensure_ascii=False)
-            hash_obj = hashlib.md5(data_str.encode('utf-8'))
-            return hash_obj.hexdigest()
+            return data_digest(hash_data)
         except Exception as e:
-            print(f"[警告] 计算product-details数据哈希失败: {e}")
+            logger.warning("[警告] 计算product-details数据哈希失败: %s", e)
             return ""
     
     async def _quick_check_product_details_data_update(self, page, normalized_url: str) -> bool:
@@ -2608,8 +7260,9 @@ class ManualBrowserScraper:
             bool: 如果数据有更新返回True，否则返回False
         """
         try:
-            # 无感检查：等待2秒后直接提取数据，不进行滚动操作，不影响用户使用
-            await asyncio.sleep(2)
+            # 无感检查：等待片刻后直接提取数据，不进行滚动操作，不影响用户使用
+            with metrics_stage("fixed_wait"):
+                await asyncio.sleep(self.profile["quick_check_delay"])
             
             # 快速提取产品详情数据（用于哈希计算）
             product_data = await self._extract_product_details_data(page)
@@ -2631,16 +7284,16 @@ class ManualBrowserScraper:
             
             # 比较哈希值
             if current_hash != previous_hash:
-                print(f"[数据更新检测] 检测到product-details页面数据变化: {normalized_url}")
-                print(f"  旧哈希: {previous_hash[:8]}...")
-                print(f"  新哈希: {current_hash[:8]}...")
+                logger.info("[数据更新检测] 检测到product-details页面数据变化: %s", normalized_url)
+                logger.debug("旧哈希: %s...", previous_hash[:8])
+                logger.debug("新哈希: %s...", current_hash[:8])
                 # 更新哈希值
                 self.product_details_page_data_hashes[normalized_url] = current_hash
                 return True
             
             return False
         except Exception as e:
-            print(f"[product-details数据更新检测错误] {e}")
+            logger.error("[product-details数据更新检测错误] %s", e)
             return False
     
     def _normalize_url(self, url: str) -> str:
@@ -2654,8 +7307,6 @@ class ManualBrowserScraper:
             str: 规范化后的URL
         """
         try:
-            from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
-            
             # 解析URL
             parsed = urlparse(url)
             
@@ -2687,7 +7338,7 @@ class ManualBrowserScraper:
             return normalized
         except Exception as e:
             # 如果规范化失败，返回原始URL
-            print(f"[警告] URL规范化失败: {e}, 使用原始URL")
+            logger.warning("[警告] URL规范化失败: %s, 使用原始URL", e)
             return url
     
     def _extract_chain_id(self, url: str) -> str:
@@ -2701,7 +7352,6 @@ class ManualBrowserScraper:
             str: chain_id
         """
         try:
-            from urllib.parse import urlparse, parse_qs
             parsed = urlparse(url)
             params = parse_qs(parsed.query)
             chain_id = params.get('id', ['unknown'])[0]
@@ -2711,8 +7361,7 @@ class ManualBrowserScraper:
     
     def _find_chain_name_from_svg_output(self, url: str, sub_chain_name: str = None) -> str:
         """
-        从SVG输出目录（output_dir）中查找产业链名称
-        output_dir下的每个文件夹名就是产业链名称
+        从 chain_id -> 产业链名称映射中查找产业链名称（映射由 _save_data / _save_svg_data 在保存时写入）
         
         Args:
             url: chain-info页面的URL
@@ -2722,67 +7371,103 @@ class ManualBrowserScraper:
             str: 产业链名称，如果找不到返回空字符串
         """
         try:
-            import json
-            from urllib.parse import urlparse, parse_qs
-            
             # 方法1: 通过chain_id查找
-            chain_id = None
-            if "id=" in url:
-                parsed = urlparse(url)
-                params = parse_qs(parsed.query)
-                if "id" in params:
-                    chain_id = params["id"][0]
-            
-            # 从output_dir的文件夹中查找
-            # output_dir下的每个文件夹名就是产业链名称
-            if not self.output_dir.exists():
-                return ""
-            
-            # 获取所有子目录（每个目录名就是一个产业链名称）
-            chain_dirs = [d for d in self.output_dir.iterdir() if d.is_dir()]
-            if not chain_dirs:
-                return ""
-            
-            # 如果只有一个文件夹，直接使用
-            if len(chain_dirs) == 1:
-                chain_name = chain_dirs[0].name
-                print(f"    [从SVG输出目录] 找到产业链名称: {chain_name}")
-                return chain_name
-            
-            # 如果有多个文件夹，尝试通过chain_id匹配
+            chain_id = self._extract_chain_id(url) if "id=" in url else None
             if chain_id:
-                for chain_dir in chain_dirs:
-                    # 查找该文件夹下的JSON文件，看是否包含该chain_id
-                    json_files = list(chain_dir.glob("*.json"))
-                    for json_file in json_files:
-                        try:
-                            with open(json_file, 'r', encoding='utf-8') as f:
-                                json_data = json.load(f)
-                                if json_data.get("chain_id") == chain_id:
-                                    chain_name = chain_dir.name
-                                    print(f"    [从SVG输出目录] 通过chain_id找到产业链名称: {chain_name}")
-                                    return chain_name
-                        except:
-                            continue
+                chain_name = self.chain_names.get(chain_id)
+                if chain_name:
+                    logger.debug("[从SVG输出目录] 通过chain_id找到产业链名称: %s", chain_name)
+                    return chain_name
             
-            # 如果chain_id匹配失败，使用最近修改的文件夹（通常是最新采集的产业链）
-            chain_dirs_sorted = sorted(chain_dirs, key=lambda x: x.stat().st_mtime, reverse=True)
-            if chain_dirs_sorted:
-                chain_name = chain_dirs_sorted[0].name
-                print(f"    [从SVG输出目录] 使用最近修改的产业链文件夹: {chain_name}")
+            # 如果chain_id匹配失败，使用最近保存的产业链（通常是最新采集的产业链）
+            if self._latest_chain_name:
+                logger.debug("[从SVG输出目录] 使用最近保存的产业链: %s", self._latest_chain_name)
+                return self._latest_chain_name
+            
+            # 还没有保存过任何产业链时，如果输出目录中只有一个产业链文件夹，直接使用
+            if len(self.chain_index) == 1:
+                chain_name = self.chain_index.chain_names()[0]
+                logger.debug("[从SVG输出目录] 找到产业链名称: %s", chain_name)
                 return chain_name
             
             return ""
             
         except Exception as e:
-            print(f"    [从SVG输出目录查找错误] {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[从SVG输出目录查找错误] %s", e)
             return ""
     
+    def _record_chain_name(self, chain_id: str, chain_name: str):
+        """
+        记录 chain_id 对应的产业链名称（保存数据时调用）
+        
+        Args:
+            chain_id: 产业链ID
+            chain_name: 清理后的产业链名称
+        """
+        if not chain_id or chain_id == "unknown" or not chain_name or chain_name == chain_id:
+            return
+        self.chain_names[chain_id] = chain_name
+        self._latest_chain_name = chain_name
+        self.state_store.record_chain_name(chain_id, chain_name)
+    
+    def rebuild_chain_id_index(self) -> int:
+        """
+        从已有的输出目录和采集记录重建 chain_id -> 产业链名称映射
+        
+        来源：产业链文件夹中包含 chain_id 的JSON文件（旧版本输出），
+        以及chain-detail采集记录的输出文件路径（文件夹名或 "<产业链名>_<时间戳>" 文件名前缀）
+        
+        Returns:
+            int: 重建后的映射条数
+        """
+        mapping = {}
+        
+        # 采集记录：key是chain-detail页面的规范化URL，输出文件名/文件夹名就是产业链名称
+        self.state_store.flush()
+        for key, record in self.state_store.load_records("chain-detail").items():
+            output_path = record.get("output_path")
+            chain_id = self._extract_chain_id(key)
+            if not output_path or not chain_id or chain_id == "unknown":
+                continue
+            output_path = Path(output_path)
+            if output_path.parent != self.output_dir and output_path.parent.parent == self.output_dir:
+                chain_name = output_path.parent.name
+            else:
+                chain_name = re.sub(r'(?:_\d{8}_\d{6}(?:_\d+)?|\.manifest)$', '', output_path.stem)
+            if chain_name and chain_name != chain_id:
+                mapping[chain_id] = (chain_name, record.get("last_seen") or 0)
+        
+        # 旧版本输出：产业链文件夹中包含 chain_id 的JSON文件
+        try:
+            with os.scandir(self.output_dir) as chain_entries:
+                for chain_entry in chain_entries:
+                    if chain_entry.name.startswith('.') or not chain_entry.is_dir():
+                        continue
+                    with os.scandir(chain_entry.path) as file_entries:
+                        for file_entry in file_entries:
+                            if not file_entry.name.endswith(".json"):
+                                continue
+                            try:
+                                with open(file_entry.path, 'r', encoding='utf-8') as f:
+                                    chain_id = json.load(f).get("chain_id")
+                                mtime = file_entry.stat().st_mtime
+                            except Exception:
+                                continue
+                            if chain_id and (chain_id not in mapping or mapping[chain_id][1] < mtime):
+                                mapping[chain_id] = (chain_entry.name, mtime)
+        except FileNotFoundError:
+            pass
+        
+        self.state_store.replace_chain_names(mapping)
+        self.chain_names = {chain_id: name for chain_id, (name, _) in mapping.items()}
+        self._latest_chain_name = max(mapping.values(), key=lambda item: item[1])[0] if mapping else ""
+        logger.info("[产业链映射] 已重建 chain_id -> 产业链名称映射: %s 条", len(mapping))
+        return len(mapping)
+    
     def _calculate_data_hash(self, svg_data: dict) -> str:
         """
-        计算数据哈希值，用于检测数据是否更新
+        计算数据哈希值，用于检测数据是否更新（基于SVG URL和每个SVG内容的指纹，内容相同长度不同或长度相同内容不同都能区分）
+        内容较大时耗时较长，在线程中调用（BLAKE2b计算时释放GIL）
         
         Args:
             svg_data: SVG数据字典
@@ -2790,23 +7475,13 @@ class ManualBrowserScraper:
         Returns:
             str: 数据哈希值
         """
-        import hashlib
-        import json
-        
         try:
-            # 提取关键数据用于哈希计算
-            hash_data = {
-                "svg_count": svg_data.get("svg_count", 0),
-                "svg_urls": sorted(svg_data.get("svg_urls", [])),
-                "svg_content_lengths": [len(content) for content in svg_data.get("svg_content", [])]
-            }
-            
-            # 将数据转换为JSON字符串并计算哈希
-            data_str = json.dumps(hash_data, sort_keys=True, ensure_ascii=False)
-            hash_obj = hashlib.md5(data_str.encode('utf-8'))
-            return hash_obj.hexdigest()
+            parts = [str(svg_data.get("svg_count", 0))]
+            parts.extend(sorted(svg_data.get("svg_urls", [])))
+            parts.extend(SvgFingerprint.of(content) for content in svg_data.get("svg_content", []))
+            return content_digest("\n".join(parts))
         except Exception as e:
-            print(f"[警告] 计算数据哈希失败: {e}")
+            logger.warning("[警告] 计算数据哈希失败: %s", e)
             return ""
     
     def _calculate_chain_info_data_hash(self, project_list: list) -> str:
@@ -2819,9 +7494,6 @@ class ManualBrowserScraper:
         Returns:
             str: 数据哈希值
         """
-        import hashlib
-        import json
-        
         try:
             # 提取关键数据用于哈希计算
             hash_data = {
@@ -2830,31 +7502,65 @@ class ManualBrowserScraper:
                 "project_urls": sorted([p.get("project_url", "") for p in project_list])
             }
             
-            # 将数据转换为JSON字符串并计算哈希
-            data_str = json.dumps(hash_data, sort_keys=True, ensure_ascii=False)
-            hash_obj = hashlib.md5(data_str.encode('utf-8'))
-            return hash_obj.hexdigest()
+            return data_digest(hash_data)
         except Exception as e:
-            print(f"[警告] 计算项目列表数据哈希失败: {e}")
+            logger.warning("[警告] 计算项目列表数据哈希失败: %s", e)
             return ""
     
+    @staticmethod
+    def _absolute_svg_url(svg_url: str) -> str:
+        """将 object#svgframe 的 data/src 属性转换为绝对URL"""
+        if not svg_url:
+            return svg_url
+        if svg_url.startswith('//'):
+            return 'https:' + svg_url
+        if svg_url.startswith('/'):
+            return 'https://www.hanghangcha.com' + svg_url
+        if not svg_url.startswith('http'):
+            return 'https://www.hanghangcha.com/' + svg_url
+        return svg_url
+    
+    def _detail_svg_url(self, svg_data: dict):
+        """
+        获取详情页采集结果中 object#svgframe 的SVG URL
+        
+        Args:
+            svg_data: _extract_svg_data 的返回值
+            
+        Returns:
+            str: SVG URL，没有找到返回None
+        """
+        for tag in svg_data.get("object_tags") or []:
+            attrs = tag.get("attributes") or {}
+            svg_url = tag.get("svg_url") or attrs.get("data") or attrs.get("src")
+            if svg_url:
+                return self._absolute_svg_url(svg_url)
+        svg_urls = svg_data.get("svg_urls") or []
+        return svg_urls[0] if svg_urls else None
+    
     async def _quick_check_data_update(self, page, normalized_url: str, context=None) -> bool:
         """
-        快速检查详情页数据是否有更新（不完整采集，只检查SVG URL，不下载内容）
+        快速检查详情页数据是否有更新（不完整采集）
+        
+        1. 比较 object#svgframe 的SVG URL与上次采集时的URL，URL变化说明数据已更新
+        2. URL未变化时，用上次采集记录的 ETag / Last-Modified 发送条件请求：304表示未修改（只传输响应头）；
+           200时比较下载时计算的内容指纹和上次采集记录的指纹，相同表示未修改，不同表示内容已变化
+           （响应内容放入SVG响应缓存，重新采集时不再下载；检查本身不更新记录，重新采集保存成功后才更新）
         
         Args:
             page: Playwright页面对象
             normalized_url: 规范化后的URL
-            context: 浏览器上下文对象（可选，但不使用，避免下载）
+            context: 浏览器上下文对象（用于条件请求，None时只比较URL）
             
         Returns:
             bool: 如果数据有更新返回True，否则返回False
         """
         try:
             # 等待页面稳定
-            await asyncio.sleep(1)
+            with metrics_stage("fixed_wait"):
+                await asyncio.sleep(self.profile["quick_check_delay"] / 2)
             
-            # 只获取SVG URL，不下载内容（轻量级检查）
+            # 只获取SVG URL（轻量级检查）
             svg_url = None
             try:
                 # 查找 id='svgframe' 的 object 标签
@@ -2863,73 +7569,53 @@ class ManualBrowserScraper:
                     svgframe_object = await page.query_selector('object[id="svgframe"]')
                 
                 if svgframe_object:
-                    # 只获取URL，不下载内容
-                    obj_attrs = await svgframe_object.evaluate('''el => {
-                        const attrs = {};
-                        for (let attr of el.attributes) {
-                            attrs[attr.name] = attr.value;
-                        }
-                        return attrs;
-                    }''')
-                    svg_url = obj_attrs.get('data') or obj_attrs.get('src')
-                    
-                    # 处理相对URL（仅用于哈希计算，不实际下载）
-                    if svg_url:
-                        if svg_url.startswith('//'):
-                            svg_url = 'https:' + svg_url
-                        elif svg_url.startswith('/'):
-                            svg_url = 'https://www.hanghangcha.com' + svg_url
-                        elif not svg_url.startswith('http'):
-                            svg_url = 'https://www.hanghangcha.com/' + svg_url
+                    svg_url = self._absolute_svg_url(
+                        await svgframe_object.evaluate("el => el.getAttribute('data') || el.getAttribute('src')")
+                    )
             except Exception as e:
-                # 如果获取URL失败，使用normalized_url作为标识
-                svg_url = normalized_url
+                logger.debug("[数据更新检测] 获取SVG URL失败: %s", e)
             
-            # 使用SVG URL作为哈希标识（不下载内容）
-            # 如果SVG URL变化，说明数据可能更新了
-            current_hash = self._calculate_simple_hash(svg_url or normalized_url)
+            if not svg_url:
+                # 无法获取SVG URL，不触发重新采集
+                return False
             
-            if not current_hash:
-                # 如果无法计算哈希，返回False（不触发重新采集）
+            previous_url = self.detail_page_svg_urls.get(normalized_url)
+            if previous_url is None:
+                # 之前的采集没有记录SVG URL：保存当前URL，不触发采集
+                self.detail_page_svg_urls[normalized_url] = svg_url
                 return False
             
-            # 获取之前保存的哈希
-            previous_hash = self.detail_page_data_hashes.get(normalized_url)
+            if svg_url != previous_url:
+                logger.info("[数据更新检测] 检测到SVG URL变化: %s", normalized_url)
+                logger.debug("旧URL: %s", previous_url)
+                logger.debug("新URL: %s", svg_url)
+                return True
             
-            if previous_hash is None:
-                # 第一次检查，保存哈希但不触发采集
-                self.detail_page_data_hashes[normalized_url] = current_hash
+            validators = self.state_store.get_validators(normalized_url)
+            if context is None or not validators or not any(validators.values()):
+                # 上次采集没有记录 ETag / Last-Modified 和内容指纹，无法判断内容是否变化，URL未变化视为未更新
                 return False
             
-            # 比较哈希值
-            if current_hash != previous_hash:
-                print(f"[数据更新检测] 检测到SVG URL变化: {normalized_url}")
-                print(f"  旧哈希: {previous_hash[:8]}...")
-                print(f"  新哈希: {current_hash[:8]}...")
-                # 更新哈希值
-                self.detail_page_data_hashes[normalized_url] = current_hash
-                return True
+            with metrics_stage("download"):
+                result = await self.download_client.fetch(context, svg_url, validators=validators)
+            if result is None:
+                return False
+            status, content, current = result
+            if status == 304:
+                logger.info("[数据更新检测] SVG未修改（304）: %s", normalized_url)
+                return False
+            if validators.get("fingerprint") and current["fingerprint"] == validators["fingerprint"]:
+                # 服务器不支持条件请求或验证器变化，但内容相同
+                logger.info("[数据更新检测] SVG内容指纹未变化: %s", normalized_url)
+                return False
             
-            return False
+            logger.info("[数据更新检测] SVG内容已变化: %s", normalized_url)
+            self.svg_response_cache.put(svg_url, content, current)
+            return True
         except Exception as e:
-            print(f"[数据更新检测错误] {e}")
+            logger.error("[数据更新检测错误] %s", e)
             return False
     
-    def _calculate_simple_hash(self, text: str) -> str:
-        """
-        计算简单哈希值（用于快速检查，不涉及文件下载）
-        
-        Args:
-            text: 要计算哈希的文本
-            
-        Returns:
-            str: 哈希值
-        """
-        import hashlib
-        if not text:
-            return ""
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
-    
     async def _quick_check_chain_info_data_update(self, page, normalized_url: str) -> bool:
         """
         快速检查chain-info页面数据是否有更新（不完整采集，只检查哈希）
@@ -2943,13 +7629,15 @@ class ManualBrowserScraper:
         """
         try:
             # 等待页面稳定
-            await asyncio.sleep(2)
+            with metrics_stage("fixed_wait"):
+                await asyncio.sleep(self.profile["quick_check_delay"])
             
             # 确保页面可以滚动
             await self._ensure_page_scrollable(page)
             
             # 滚动页面以加载所有懒加载内容（快速滚动，减少等待时间）
-            await self._scroll_to_load_all_content(page, max_scrolls=4, scroll_delay=1.5)
+            with metrics_stage("scroll"):
+                await self._scroll_to_load_all_content(page, scroll_delay=self.profile["quick_check_scroll_delay"])
             
             # 快速提取项目列表（用于哈希计算）
             project_list = await self._extract_project_list(page)
@@ -2971,16 +7659,16 @@ class ManualBrowserScraper:
             
             # 比较哈希值
             if current_hash != previous_hash:
-                print(f"[数据更新检测] 检测到chain-info页面数据变化: {normalized_url}")
-                print(f"  旧哈希: {previous_hash[:8]}...")
-                print(f"  新哈希: {current_hash[:8]}...")
+                logger.info("[数据更新检测] 检测到chain-info页面数据变化: %s", normalized_url)
+                logger.debug("旧哈希: %s...", previous_hash[:8])
+                logger.debug("新哈希: %s...", current_hash[:8])
                 # 更新哈希值
                 self.chain_info_page_data_hashes[normalized_url] = current_hash
                 return True
             
             return False
         except Exception as e:
-            print(f"[chain-info数据更新检测错误] {e}")
+            logger.error("[chain-info数据更新检测错误] %s", e)
             return False
     
     async def _extract_svg_data(self, page, context):
@@ -3015,7 +7703,7 @@ class ManualBrowserScraper:
             if not svgframe_object:
                 # 尝试查找所有object标签，然后筛选
                 all_objects = await page.query_selector_all('object')
-                print(f"  页面中共有 {len(all_objects)} 个object标签")
+                logger.debug("页面中共有 %s 个object标签", len(all_objects))
                 for obj in all_objects:
                     obj_id = await obj.get_attribute('id')
                     if obj_id == 'svgframe':
@@ -3023,19 +7711,16 @@ class ManualBrowserScraper:
                         break
             
             if not svgframe_object:
-                print("  [错误] 未找到 id='svgframe' 的 object 标签")
-                print("  [调试] 尝试查找所有object标签的id属性...")
+                logger.error("[错误] 未找到 id='svgframe' 的 object 标签")
+                logger.debug("[调试] 尝试查找所有object标签的id属性...")
                 all_objects = await page.query_selector_all('object')
                 for idx, obj in enumerate(all_objects):
                     obj_id = await obj.get_attribute('id')
                     obj_type = await obj.get_attribute('type')
-                    print(f"    object #{idx}: id={obj_id}, type={obj_type}")
+                    logger.debug("object #%s: id=%s, type=%s", idx, obj_id, obj_type)
                 return svg_data
             
-            print("  [成功] 找到 id='svgframe' 的 object 标签")
-            
-            # 等待object标签加载完成
-            await asyncio.sleep(2)
+            logger.debug("[成功] 找到 id='svgframe' 的 object 标签")
             
             # 获取object标签的属性
             obj_attrs = await svgframe_object.evaluate('''el => {
@@ -3046,11 +7731,11 @@ class ManualBrowserScraper:
                 return attrs;
             }''')
             
-            print(f"    object标签属性: {obj_attrs}")
+            logger.debug("object标签属性: %s", obj_attrs)
             
             # 方法1: 尝试从object的contentDocument中获取SVG（最直接的方法）
             try:
-                print("    [方法1] 尝试从object.contentDocument获取SVG...")
+                logger.debug("[方法1] 尝试从object.contentDocument获取SVG...")
                 svg_content = await svgframe_object.evaluate('''el => {
                     try {
                         // 获取object的contentDocument
@@ -3073,7 +7758,7 @@ class ManualBrowserScraper:
                 if svg_content:
                     svg_data["svg_content"].append(svg_content)
                     svg_data["svg_count"] = 1
-                    print(f"    ✓ [方法1成功] 从contentDocument获取SVG ({len(svg_content)} 字符)")
+                    logger.debug("✓ [方法1成功] 从contentDocument获取SVG (%s 字符)", len(svg_content))
                     svg_data["object_tags"].append({
                         "index": 0,
                         "attributes": obj_attrs,
@@ -3081,9 +7766,9 @@ class ManualBrowserScraper:
                     })
                     return svg_data
                 else:
-                    print("    ✗ [方法1失败] contentDocument为空或无法访问")
+                    logger.debug("✗ [方法1失败] contentDocument为空或无法访问")
             except Exception as e:
-                print(f"    ✗ [方法1失败] 错误: {e}")
+                logger.debug("✗ [方法1失败] 错误: %s", e)
             
             # 方法2: 尝试从data/src URL下载
             svg_url = obj_attrs.get('data') or obj_attrs.get('src')
@@ -3097,11 +7782,12 @@ class ManualBrowserScraper:
                 elif not svg_url.startswith('http'):
                     svg_url = 'https://www.hanghangcha.com/' + svg_url
                 
-                print(f"    [方法2] 发现SVG URL: {svg_url}")
+                logger.debug("[方法2] 发现SVG URL: %s", svg_url)
                 svg_data["svg_urls"].append(svg_url)
                 
                 # 尝试下载SVG内容
-                svg_content = await self._download_svg(context, svg_url)
+                with metrics_stage("download"):
+                    svg_content = await self._download_svg(context, svg_url)
                 if svg_content:
                     svg_data["svg_content"].append(svg_content)
                     svg_data["svg_files"].append({
@@ -3110,7 +7796,7 @@ class ManualBrowserScraper:
                         "size": len(svg_content)
                     })
                     svg_data["svg_count"] = 1
-                    print(f"    ✓ [方法2成功] 下载SVG内容 ({len(svg_content)} 字符)")
+                    logger.debug("✓ [方法2成功] 下载SVG内容 (%s 字符)", len(svg_content))
                     svg_data["object_tags"].append({
                         "index": 0,
                         "attributes": obj_attrs,
@@ -3119,10 +7805,10 @@ class ManualBrowserScraper:
                     })
                     return svg_data
                 else:
-                    print(f"    ✗ [方法2失败] 下载SVG失败")
+                    logger.debug("✗ [方法2失败] 下载SVG失败")
             
             # 方法3: 尝试获取object标签的innerHTML/content
-            print("    [方法3] 尝试从object标签内容中提取SVG...")
+            logger.debug("[方法3] 尝试从object标签内容中提取SVG...")
             try:
                 # 获取object标签的内容
                 object_content = await svgframe_object.inner_html()
@@ -3130,14 +7816,13 @@ class ManualBrowserScraper:
                     object_content = await svgframe_object.evaluate('el => el.innerHTML')
                 
                 if object_content:
-                    import re
                     # 从内容中提取SVG
                     svg_match = re.search(r'<svg[^>]*>.*?</svg>', object_content, re.DOTALL)
                     if svg_match:
                         svg_content = svg_match.group(0)
                         svg_data["svg_content"].append(svg_content)
                         svg_data["svg_count"] = 1
-                        print(f"    ✓ [方法3成功] 从object内容中提取SVG ({len(svg_content)} 字符)")
+                        logger.debug("✓ [方法3成功] 从object内容中提取SVG (%s 字符)", len(svg_content))
                         svg_data["object_tags"].append({
                             "index": 0,
                             "attributes": obj_attrs,
@@ -3145,13 +7830,13 @@ class ManualBrowserScraper:
                         })
                         return svg_data
                     else:
-                        print(f"    ✗ [方法3失败] object内容中未找到SVG标签")
-                        print(f"    [调试] object内容预览: {object_content[:200]}...")
+                        logger.debug("✗ [方法3失败] object内容中未找到SVG标签")
+                        logger.debug("[调试] object内容预览: %s...", object_content[:200])
             except Exception as e:
-                print(f"    ✗ [方法3失败] 错误: {e}")
+                logger.debug("✗ [方法3失败] 错误: %s", e)
             
             # 如果所有方法都失败
-            print("    [错误] 所有方法都失败，无法获取SVG内容")
+            logger.error("[错误] 所有方法都失败，无法获取SVG内容")
             svg_data["object_tags"].append({
                 "index": 0,
                 "attributes": obj_attrs,
@@ -3159,16 +7844,34 @@ class ManualBrowserScraper:
             })
             
         except Exception as e:
-            print(f"  提取SVG数据时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("提取SVG数据时出错: %s", e)
         
         return svg_data
     
+    def _extract_svg_markup(self, content: str):
+        """
+        从响应内容中提取SVG代码（内容可能包含在HTML中）
+        
+        Args:
+            content: 响应体文本
+            
+        Returns:
+            str: SVG代码，如果内容不包含SVG返回None
+        """
+        if not content or '<svg' not in content.lower():
+            return None
+        svg_match = re.search(r'<svg[^>]*>.*?</svg>', content, re.DOTALL | re.IGNORECASE)
+        if svg_match:
+            return svg_match.group(0)
+        # 如果没有匹配到完整的SVG标签，但内容看起来像SVG，返回整个内容
+        if content.strip().startswith('<?xml') or content.strip().startswith('<svg'):
+            return content
+        return None
+    
     async def _download_svg(self, context, svg_url: str):
         """
         下载SVG文件内容（只下载SVG格式）
-        使用HTTP请求直接下载，不影响浏览器窗口
+        优先使用浏览器已加载的SVG响应，未捕获到时通过 SvgDownloadClient 异步下载，不影响浏览器窗口
         
         Args:
             context: 浏览器上下文对象
@@ -3179,75 +7882,40 @@ class ManualBrowserScraper:
         """
         try:
             # 再次检查URL是否是SVG格式
-            from urllib.parse import urlparse
             parsed = urlparse(svg_url)
             url_path = parsed.path.lower()
             
             if not url_path.endswith('.svg'):
-                print(f"    [跳过] URL不是SVG格式: {svg_url}")
+                logger.info("[跳过] URL不是SVG格式: %s", svg_url)
                 return None
             
-            # 使用HTTP请求直接下载，不创建新页面
-            try:
-                # 使用context的request API来下载，这样可以复用浏览器的cookies和headers
-                response = await context.request.get(svg_url, timeout=15000)
-                if response.status == 200:
-                    content = await response.text()
-                    
-                    # 提取SVG内容（可能包含在HTML中）
-                    if '<svg' in content.lower():
-                        import re
-                        svg_match = re.search(r'<svg[^>]*>.*?</svg>', content, re.DOTALL | re.IGNORECASE)
-                        if svg_match:
-                            return svg_match.group(0)
-                        # 如果没有匹配到完整的SVG标签，但内容看起来像SVG，返回整个内容
-                        if content.strip().startswith('<?xml') or content.strip().startswith('<svg'):
-                            return content
-                    
-                    # 如果内容不包含SVG标签，返回None
-                    print(f"    [跳过] 下载的内容不包含SVG标签")
-                    return None
-                else:
-                    print(f"    [下载失败] HTTP状态码: {response.status}")
-                    return None
-            except Exception as http_error:
-                # 如果request API失败，回退到使用requests库
-                print(f"    [警告] 使用context.request失败，尝试使用requests库: {http_error}")
-                try:
-                    import requests
-                    # 从context获取cookies（如果可能）
-                    cookies = {}
-                    try:
-                        # 尝试从context获取cookies
-                        all_cookies = await context.cookies()
-                        for cookie in all_cookies:
-                            cookies[cookie['name']] = cookie['value']
-                    except:
-                        pass
-                    
-                    response = requests.get(svg_url, cookies=cookies, timeout=15)
-                    if response.status_code == 200:
-                        content = response.text
-                        
-                        # 提取SVG内容
-                        if '<svg' in content.lower():
-                            import re
-                            svg_match = re.search(r'<svg[^>]*>.*?</svg>', content, re.DOTALL | re.IGNORECASE)
-                            if svg_match:
-                                return svg_match.group(0)
-                            if content.strip().startswith('<?xml') or content.strip().startswith('<svg'):
-                                return content
-                        
-                        print(f"    [跳过] 下载的内容不包含SVG标签")
-                        return None
-                    else:
-                        print(f"    [下载失败] HTTP状态码: {response.status_code}")
-                        return None
-                except Exception as requests_error:
-                    print(f"    [下载错误] requests库也失败: {requests_error}")
-                    return None
+            # 优先使用浏览器已加载的SVG响应（无需再次下载）
+            cached_content = await self.svg_response_cache.wait_for(svg_url)
+            if cached_content:
+                svg_content = self._extract_svg_markup(cached_content)
+                if svg_content:
+                    metrics_count("svg_cache_hits")
+                    logger.debug("[缓存命中] 使用浏览器已加载的SVG响应 (%s 字符)", len(svg_content))
+                    return svg_content
+            
+            # 使用HTTP请求直接下载，不创建新页面（限速、限制并发、失败重试，见 SvgDownloadClient）
+            result = await self.download_client.fetch(context, svg_url)
+            if result is None:
+                return None
+            _, content, validators = result
+            # 放入缓存，采集保存成功后从缓存读取该响应的 ETag / Last-Modified
+            self.svg_response_cache.put(svg_url, content, validators)
+            
+            # 提取SVG内容（可能包含在HTML中）
+            svg_content = self._extract_svg_markup(content)
+            if svg_content:
+                return svg_content
+            
+            # 如果内容不包含SVG标签，返回None
+            logger.warning("[跳过] 下载的内容不包含SVG标签")
+            return None
         except Exception as e:
-            print(f"    [下载错误] {e}")
+            logger.error("[下载错误] %s", e)
             return None
     
     async def _extract_page_info(self, page):
@@ -3399,20 +8067,26 @@ class ManualBrowserScraper:
                         // 优先使用tagitem选择器
                         const tagItems = document.querySelectorAll('.tagitem, span.tagitem');
                         if (tagItems.length > 0) {
-                            info.chain_buttons = Array.from(tagItems).slice(0, 20).map(tag => {
-                                const text = getVisibleText(tag);
-                                const classes = tag.className || '';
-                                return { text: text, classes: classes, isActive: classes.includes('active') };
-                            }).filter(item => item.text && item.text.length > 0);
+                            info.chain_buttons = {
+                                columns: ['text', 'classes', 'isActive'],
+                                rows: Array.from(tagItems).slice(0, 20).map(tag => {
+                                    const text = getVisibleText(tag);
+                                    const classes = tag.className || '';
+                                    return [text, classes, classes.includes('active')];
+                                }).filter(row => row[0] && row[0].length > 0)
+                            };
                         } else {
                             // 如果没有tagitem，尝试查找按钮
                             const buttons = document.querySelectorAll('button, [class*="button"], [class*="chain-item"], [role="button"]');
                             if (buttons.length > 0) {
-                                info.chain_buttons = Array.from(buttons).slice(0, 20).map(btn => {
-                                    const text = getVisibleText(btn);
-                                    const classes = btn.className || '';
-                                    return { text: text, classes: classes };
-                                }).filter(item => item.text && item.text.length > 0);
+                                info.chain_buttons = {
+                                    columns: ['text', 'classes'],
+                                    rows: Array.from(buttons).slice(0, 20).map(btn => {
+                                        const text = getVisibleText(btn);
+                                        const classes = btn.className || '';
+                                        return [text, classes];
+                                    }).filter(row => row[0] && row[0].length > 0)
+                                };
                             }
                         }
                         
@@ -3426,14 +8100,14 @@ class ManualBrowserScraper:
                     }
                 """)
                 
-                # 合并提取的信息
+                # 合并提取的信息（按列编码的列表字段解码为记录列表）
+                if "chain_buttons" in chain_info:
+                    chain_info["chain_buttons"] = decode_row_tuples(chain_info["chain_buttons"])
                 page_info.update(chain_info)
-                print(f"  [产业链信息] 提取到产业链信息: {chain_info}")
+                logger.debug("[产业链信息] 提取到产业链信息: %s", chain_info)
             
         except Exception as e:
-            print(f"  提取页面信息时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("提取页面信息时出错: %s", e)
         
         return page_info
     
@@ -3471,10 +8145,18 @@ class ManualBrowserScraper:
             chain_name = chain_id
         
         # 清理文件名中的非法字符
-        import re
         chain_name = re.sub(r'[<>:"/\\|?*]', '_', chain_name)
         chain_name = chain_name.strip()
         
+        # 记录 chain_id -> 产业链名称映射（供chain-info页面查询）
+        self._record_chain_name(chain_id, chain_name)
+        
+        # 内容寻址存储：SVG内容保存为blob，输出目录中只保存该产业链的manifest
+        if self.svg_storage == "blobs":
+            manifest_path = self.output_dir / f"{chain_name}.{SvgBlobStore.MANIFEST_NAME}"
+            self._save_svg_snapshot(manifest_path, chain_name, data)
+            return manifest_path
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # 保存SVG代码，使用产业链名称命名
@@ -3484,15 +8166,12 @@ class ManualBrowserScraper:
         if svg_data.get("svg_content"):
             svg_filename = f"{chain_name}_{timestamp}.txt"
             svg_filepath = self.output_dir / svg_filename
-            with open(svg_filepath, 'w', encoding='utf-8') as f:
-                for idx, svg_html in enumerate(svg_data["svg_content"]):
-                    f.write(f"\n{'='*80}\n")
-                    f.write(f"SVG #{idx + 1}\n")
-                    f.write(f"{'='*80}\n")
-                    f.write(svg_html)
-                    f.write("\n")
+            self.file_writer.submit(svg_filepath, lambda svg_content=svg_data["svg_content"]: "".join(
+                f"\n{'='*80}\nSVG #{idx + 1}\n{'='*80}\n{svg_html}\n"
+                for idx, svg_html in enumerate(svg_content)
+            ))
             saved_file = svg_filepath
-            print(f"    [保存] SVG代码已保存: {svg_filepath}")
+            logger.debug("[保存] SVG代码已提交写入: %s", svg_filepath)
         
         # 保存单独的SVG文件（从URL下载的），使用产业链名称命名
         if svg_data.get("svg_files"):
@@ -3500,18 +8179,17 @@ class ManualBrowserScraper:
                 svg_url = svg_file["url"]
                 
                 # 只保存SVG格式的文件
-                from urllib.parse import urlparse
                 parsed = urlparse(svg_url)
                 url_path = parsed.path.lower()
                 
                 if not url_path.endswith('.svg'):
-                    print(f"    [跳过] 非SVG文件，不保存: {svg_url}")
+                    logger.info("[跳过] 非SVG文件，不保存: %s", svg_url)
                     continue
                 
                 # 验证内容是否是SVG格式
                 content = svg_file.get("content", "")
                 if not content or ('<svg' not in content.lower() and not content.strip().startswith('<?xml')):
-                    print(f"    [跳过] 内容不是SVG格式，不保存: {svg_url}")
+                    logger.info("[跳过] 内容不是SVG格式，不保存: %s", svg_url)
                     continue
                 
                 # 使用产业链名称命名SVG文件
@@ -3523,9 +8201,8 @@ class ManualBrowserScraper:
                     svg_filename = f"{chain_name}_{timestamp}_{idx}.svg"
                 
                 filepath = self.output_dir / svg_filename
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                print(f"    [保存] SVG文件已保存: {filepath}")
+                self.file_writer.write_text(filepath, content)
+                logger.debug("[保存] SVG文件已提交写入: %s", filepath)
                 if not saved_file:
                     saved_file = filepath
         
@@ -3545,6 +8222,14 @@ async def main():
     # 如需禁用缓存持久化，可以设置 use_persistent_context=False
     # 例如：scraper = ManualBrowserScraper(use_persistent_context=False)
     
+    args = parse_args()
+    setup_logging("DEBUG" if args.verbose else args.log_level, json_format=args.log_format == "json")
+    
+    # 只打印采集指标汇总，不启动浏览器
+    if args.metrics_summary:
+        print_metrics_summary(args.metrics_summary)
+        return
+    
     # 检查并安装Playwright浏览器（如果是打包后的exe）
     if getattr(sys, 'frozen', False):
         # 如果是打包后的exe
@@ -3562,22 +8247,92 @@ async def main():
             print(f"[警告] Playwright浏览器检查失败: {e}")
             print("[提示] 如果浏览器无法启动，请手动运行: playwright install chromium")
     
-    scraper = ManualBrowserScraper()
-    await scraper.start()
+    # 指定了种子URL时进入无人值守的批量采集模式，否则启动交互模式
+    seed_urls = list(args.seed)
+    if args.batch:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            seed_urls.extend(line.strip() for line in f)
+    
+    # 性能配置：命令行 --profile 优先，其次是配置文件中的 "profile"，批量模式默认使用 batch 配置
+    profile_overrides = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            profile_overrides = json.load(f)
+    profile_name = args.profile or profile_overrides.pop("profile", None) or ("batch" if seed_urls else None)
+    
+    scraper = ManualBrowserScraper(
+        performance_profile=profile_name,
+        profile_overrides=profile_overrides,
+        metrics_port=args.metrics_port,
+        metrics_textfile=args.metrics_textfile,
+        loop_lag_threshold=args.loop_lag_threshold,
+        svg_storage=args.svg_storage,
+        storage_state_path=args.storage_state
+    )
+    if seed_urls:
+        await scraper.run_batch(
+            seed_urls,
+            concurrency=args.concurrency,
+            max_depth=args.max_depth,
+            max_pages=args.max_pages,
+            refresh=args.refresh,
+            headless=False if args.headed else None
+        )
+    else:
+        await scraper.start()
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    import argparse
+    parser = argparse.ArgumentParser(description="产业链数据采集工具（默认启动交互模式，指定种子URL时进入批量采集模式）")
+    parser.add_argument("--batch", metavar="SEEDS_FILE",
+                        help="批量采集模式：种子URL文件，每行一个URL（以#开头的行会被忽略）")
+    parser.add_argument("--seed", action="append", default=[], metavar="URL",
+                        help="批量采集模式：种子URL，可重复指定")
+    parser.add_argument("--concurrency", type=int, default=4, help="批量采集的并发页面数，默认4")
+    parser.add_argument("--max-depth", type=int, default=1,
+                        help="批量采集的最大发现深度，默认1（种子页面 + 从种子页面发现的页面）")
+    parser.add_argument("--max-pages", type=int, default=None, help="批量采集最多采集的页面数，默认不限制")
+    parser.add_argument("--refresh", action="store_true", help="批量采集时已采集过的页面也重新采集")
+    parser.add_argument("--headed", action="store_true", help="批量采集时显示浏览器窗口（默认由性能配置决定）")
+    parser.add_argument("--storage-state", metavar="STATE_FILE", default=None,
+                        help="批量采集使用的登录状态文件（Playwright storage_state），默认从persistent context导出到 chrome_cache_storage_state.json")
+    parser.add_argument("--profile", choices=sorted(PERFORMANCE_PROFILES),
+                        help="性能配置：interactive（交互模式默认）、fast、batch（批量模式默认）")
+    parser.add_argument("--metrics-summary", nargs="?", const=str(Path(__file__).parent / "svg_output" / STATE_DIRNAME / DEFAULT_METRICS_FILENAME),
+                        metavar="METRICS_FILE",
+                        help="打印采集指标文件中各页面类型每个阶段耗时的 p50/p95/p99 后退出（默认读取 svg_output/.state/collection_metrics.jsonl）")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="在本机该端口提供Prometheus指标（http://127.0.0.1:PORT/metrics），默认不启动")
+    parser.add_argument("--metrics-textfile", metavar="PROM_FILE", default=None,
+                        help="定期将Prometheus指标写入该文件（node-exporter textfile collector，.prom）")
+    parser.add_argument("--svg-storage", choices=["files", "blobs"], default="files",
+                        help="SVG保存方式：files（默认，每次采集保存带时间戳的文件）或 blobs（内容寻址存储，相同SVG只保存一份）")
+    parser.add_argument("--loop-lag-threshold", type=float, default=0.25, metavar="SECONDS",
+                        help="事件循环延迟超过该值时输出阻塞循环的协程或回调及其调用栈，默认0.25秒")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO",
+                        help="日志级别，默认INFO（DEBUG会输出每个步骤的详细信息和提取结果）")
+    parser.add_argument("--log-format", choices=["text", "json"], default="text",
+                        help="日志格式：text（默认）或 json（每行一条JSON记录，包含page_type/url/stage/elapsed字段）")
+    parser.add_argument("-v", "--verbose", action="store_true", help="等同于 --log-level DEBUG")
+    parser.add_argument("--config", metavar="CONFIG_FILE",
+                        help="性能配置文件（JSON），可包含 \"profile\" 以及要覆盖的配置项，例如 {\"profile\": \"fast\", \"scroll_delay\": 1.0}")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    import sys
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
+        # 先写出队列中剩余的日志，再打印退出信息
+        stop_logging()
         print("\n\n程序已退出")
     except Exception as e:
+        stop_logging()
         print(f"\n[错误] 程序运行出错: {e}")
-        import traceback
         traceback.print_exc()
         input("\n按回车键退出...")
     except Exception as e:
         print(f"\n\n发生错误: {e}")
-        import traceback
         traceback.print_exc()
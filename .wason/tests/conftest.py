@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 采集工具是单文件脚本，测试直接导入 manual_browser_scraper
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
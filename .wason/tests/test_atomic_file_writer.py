@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from manual_browser_scraper import AtomicFileWriter
+
+
+@pytest.fixture
+def writer():
+    writer = AtomicFileWriter()
+    yield writer
+    writer.close(timeout=5)
+
+
+def test_write_text_json_and_csv(tmp_path, writer):
+    text_future = writer.write_text(tmp_path / "a" / "b.txt", "内容")
+    json_future = writer.write_json(tmp_path / "c.json", {"名称": 1})
+    csv_future = writer.write_csv(tmp_path / "d.csv", ["name"], [{"name": "甲", "extra": "x"}])
+    assert writer.flush(timeout=5)
+    assert text_future.result(timeout=1) == len("内容".encode("utf-8"))
+    assert (tmp_path / "a" / "b.txt").read_text(encoding="utf-8") == "内容"
+    assert json_future.result(timeout=1) > 0
+    assert '"名称": 1' in (tmp_path / "c.json").read_text(encoding="utf-8")
+    assert csv_future.result(timeout=1) > 0
+    assert (tmp_path / "d.csv").read_text(encoding="utf-8-sig").splitlines() == ["name", "甲"]
+    # 临时文件已替换为目标文件
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_pending_writes_to_same_path_are_coalesced(tmp_path, writer):
+    gate = threading.Event()
+    path = tmp_path / "out.txt"
+    # 第一次写入阻塞在写入线程中，之后对同一路径的两次提交合并为一次
+    first = writer.submit(tmp_path / "block.txt", lambda: gate.wait(5) and "x")
+    second = writer.write_text(path, "old")
+    third = writer.write_text(path, "new")
+    gate.set()
+    assert writer.flush(timeout=5)
+    assert first.result(timeout=1) == 1
+    assert second.result(timeout=1) == third.result(timeout=1) == 3
+    assert path.read_text(encoding="utf-8") == "new"
+    assert writer.coalesced == 1
+
+
+def test_failed_write_sets_exception_and_keeps_old_file(tmp_path, writer):
+    path = tmp_path / "keep.txt"
+    path.write_text("old", encoding="utf-8")
+    
+    def render():
+        raise ValueError("boom")
+    
+    future = writer.submit(path, render)
+    assert writer.flush(timeout=5)
+    with pytest.raises(ValueError):
+        future.result(timeout=1)
+    assert writer.failed == 1
+    assert path.read_text(encoding="utf-8") == "old"
+
+
+def test_submit_after_close_raises(tmp_path):
+    writer = AtomicFileWriter()
+    writer.close(timeout=5)
+    with pytest.raises(RuntimeError):
+        writer.write_text(tmp_path / "late.txt", "x")
@@ -0,0 +1,134 @@
+import asyncio
+
+from manual_browser_scraper import CollectionScheduler
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_duplicate_key_is_skipped_while_in_flight():
+    async def scenario():
+        scheduler = CollectionScheduler(workers=1, type_limits={"chain-info": 1})
+        scheduler.start()
+        release = asyncio.Event()
+        
+        async def job():
+            await release.wait()
+        
+        assert await scheduler.submit("chain-info", "a", job)
+        assert not await scheduler.submit("chain-info", "a", job)
+        assert scheduler.duplicates == 1
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert not scheduler.is_in_flight("a")
+        assert scheduler.completed == 1
+        await scheduler.stop()
+    
+    run(scenario())
+
+
+def test_type_limit_and_round_robin_dispatch():
+    async def scenario():
+        scheduler = CollectionScheduler(workers=2, type_limits={"chain-info": 1, "svg": 1})
+        scheduler.start()
+        started = []
+        release = asyncio.Event()
+        
+        def make_job(name):
+            async def job():
+                started.append(name)
+                await release.wait()
+            return job
+        
+        for name in ("info-1", "info-2"):
+            await scheduler.submit("chain-info", name, make_job(name))
+        await scheduler.submit("svg", "svg-1", make_job("svg-1"))
+        await asyncio.sleep(0)
+        # chain-info 只有一个并发名额，第二个任务不能占用 svg 的名额
+        assert sorted(started) == ["info-1", "svg-1"]
+        assert scheduler.queue_depth == 1
+        assert scheduler.in_flight_by_type() == {"chain-info": 2, "svg": 1}
+        release.set()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert started[-1] == "info-2"
+        await scheduler.stop()
+    
+    run(scenario())
+
+
+def test_full_queue_waits_for_space_instead_of_dropping():
+    async def scenario():
+        scheduler = CollectionScheduler(workers=1, queue_size=1, type_limits={"chain-info": 1}, submit_timeout=5)
+        scheduler.start()
+        release = asyncio.Event()
+        
+        async def job():
+            await release.wait()
+        
+        await scheduler.submit("chain-info", "running", job)
+        await scheduler.submit("chain-info", "queued", job)
+        waiting = asyncio.create_task(scheduler.submit("chain-info", "waiting", job))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        # 等待空位期间重复提交同一个key会被跳过
+        assert not await scheduler.submit("chain-info", "waiting", job)
+        release.set()
+        assert await asyncio.wait_for(waiting, 1)
+        assert scheduler.dropped == 0
+        await scheduler.stop()
+    
+    run(scenario())
+
+
+def test_full_queue_gives_up_after_timeout():
+    async def scenario():
+        scheduler = CollectionScheduler(workers=1, queue_size=1, type_limits={"chain-info": 1}, submit_timeout=0.05)
+        scheduler.start()
+        release = asyncio.Event()
+        
+        async def job():
+            await release.wait()
+        
+        await scheduler.submit("chain-info", "running", job)
+        await scheduler.submit("chain-info", "queued", job)
+        assert not await scheduler.submit("chain-info", "late", job)
+        assert scheduler.dropped == 1
+        # 放弃后key不再占用，之后可以重新提交
+        assert not scheduler.is_in_flight("late")
+        await scheduler.stop()
+    
+    run(scenario())
+
+
+def test_stop_wakes_waiting_submitters():
+    async def scenario():
+        scheduler = CollectionScheduler(workers=1, queue_size=1, type_limits={"chain-info": 1}, submit_timeout=5)
+        scheduler.start()
+        
+        async def job():
+            await asyncio.Event().wait()
+        
+        await scheduler.submit("chain-info", "running", job)
+        await scheduler.submit("chain-info", "queued", job)
+        waiting = asyncio.create_task(scheduler.submit("chain-info", "waiting", job))
+        await asyncio.sleep(0)
+        await scheduler.stop()
+        assert await asyncio.wait_for(waiting, 1) is False
+    
+    run(scenario())
+
+
+def test_submit_before_start_is_rejected():
+    async def scenario():
+        scheduler = CollectionScheduler()
+        
+        async def job():
+            pass
+        
+        assert not await scheduler.submit("svg", "a", job)
+        assert scheduler.in_flight_count == 0
+    
+    run(scenario())
@@ -0,0 +1,105 @@
+import pytest
+
+from manual_browser_scraper import CrawlStateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CrawlStateStore(tmp_path / "state" / "crawl_state.db")
+    yield store
+    store.close()
+
+
+def test_records_survive_reopen(tmp_path):
+    db_path = tmp_path / "crawl_state.db"
+    store = CrawlStateStore(db_path)
+    store.record("chain-detail", "https://a/chain-detail?id=1", content_hash="h1", output_path=tmp_path / "a.txt")
+    store.record_hash("chain-info", "https://a/chain-info?id=2", "h2")
+    store.record_validators("https://a/chain-detail?id=1", etag='"e1"', fingerprint="f1")
+    store.close()
+    
+    reopened = CrawlStateStore(db_path)
+    try:
+        assert reopened.load_collected("chain-detail") == {"https://a/chain-detail?id=1"}
+        record = reopened.get_record("chain-detail", "https://a/chain-detail?id=1")
+        assert record["content_hash"] == "h1"
+        assert record["output_path"] == str(tmp_path / "a.txt")
+        assert reopened.load_hashes("chain-info") == {"https://a/chain-info?id=2": "h2"}
+        assert reopened.get_validators("https://a/chain-detail?id=1") == {
+            "etag": '"e1"', "last_modified": None, "fingerprint": "f1"}
+    finally:
+        reopened.close()
+
+
+def test_record_keeps_previous_hash_and_path(store):
+    store.record("svg", "u", content_hash="h", output_path="p")
+    store.flush()
+    store.record("svg", "u")
+    record = store.get_record("svg", "u")
+    assert (record["content_hash"], record["output_path"]) == ("h", "p")
+    store.flush()
+    assert store.load_records("svg")["u"]["content_hash"] == "h"
+
+
+def test_forget_hides_pending_and_stored_records(store):
+    store.record("svg", "u")
+    store.flush()
+    store.forget("svg", "u")
+    assert store.get_record("svg", "u") is None
+    store.flush()
+    assert store.load_collected("svg") == set()
+
+
+def test_tracked_set_record_writes_once_with_hash_and_path(store):
+    collected = store.tracked_set("chain-info")
+    collected.record("u", content_hash="h", output_path="p")
+    assert "u" in collected
+    assert store.pending_count == 1
+    store.flush()
+    assert store.load_records("chain-info")["u"]["content_hash"] == "h"
+
+
+def test_tracked_set_mutators_stay_in_sync(store):
+    collected = store.tracked_set("svg")
+    collected.add("a")
+    collected.update(["b", "c"])
+    collected.remove("b")
+    store.flush()
+    assert store.load_collected("svg") == {"a", "c"} == set(collected)
+    with pytest.raises(KeyError):
+        collected.remove("missing")
+    collected.clear()
+    store.flush()
+    assert store.load_collected("svg") == set()
+
+
+def test_tracked_set_rejects_unsyncable_operations(store):
+    collected = store.tracked_set("svg")
+    collected.record("a")
+    with pytest.raises(TypeError):
+        collected.pop()
+    with pytest.raises(TypeError):
+        collected |= {"b"}
+    with pytest.raises(TypeError):
+        collected.difference_update({"a"})
+    assert set(collected) == {"a"}
+
+
+def test_tracked_set_loads_existing_records(tmp_path):
+    db_path = tmp_path / "crawl_state.db"
+    store = CrawlStateStore(db_path)
+    store.record("product-details", "u")
+    store.close()
+    reopened = CrawlStateStore(db_path)
+    try:
+        assert "u" in reopened.tracked_set("product-details")
+    finally:
+        reopened.close()
+
+
+def test_tracked_dict_records_non_empty_hashes(store):
+    hashes = store.tracked_dict("chain-info")
+    hashes["a"] = "h"
+    hashes["b"] = ""
+    store.flush()
+    assert store.load_hashes("chain-info") == {"a": "h"}
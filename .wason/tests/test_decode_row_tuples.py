@@ -0,0 +1,24 @@
+from manual_browser_scraper import PROJECT_ROW_COLUMNS, decode_row_tuples
+
+
+def test_decodes_column_encoded_rows():
+    payload = {"columns": ["project_name", "round"], "rows": [["甲", "A轮"], ["乙", "天使轮"]]}
+    assert decode_row_tuples(payload) == [
+        {"project_name": "甲", "round": "A轮"},
+        {"project_name": "乙", "round": "天使轮"},
+    ]
+
+
+def test_project_row_columns_round_trip():
+    row = [f"value-{i}" for i in range(len(PROJECT_ROW_COLUMNS))]
+    record, = decode_row_tuples({"columns": list(PROJECT_ROW_COLUMNS), "rows": [row]})
+    assert list(record) == list(PROJECT_ROW_COLUMNS)
+    assert record["project_url"] == row[-1]
+
+
+def test_passes_through_record_lists_and_empty_payloads():
+    records = [{"project_name": "甲"}]
+    assert decode_row_tuples(records) is records
+    assert decode_row_tuples(None) == []
+    assert decode_row_tuples({}) == []
+    assert decode_row_tuples({"columns": ["a"], "rows": None}) == []
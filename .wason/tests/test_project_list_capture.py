@@ -0,0 +1,58 @@
+from manual_browser_scraper import ProjectListCapture
+
+
+def test_find_records_in_nested_payload_with_total():
+    payload = {
+        "code": 0,
+        "data": {
+            "totalCount": "3",
+            "list": [
+                {"projectName": "甲", "projectId": 1},
+                {"projectName": "乙", "projectId": 2},
+                {"projectName": "丙", "projectId": 3},
+            ],
+        },
+    }
+    records, total = ProjectListCapture.find_records(payload)
+    assert [item["projectName"] for item in records] == ["甲", "乙", "丙"]
+    assert total == 3
+
+
+def test_find_records_ignores_lists_without_project_names():
+    payload = {"data": {"menus": [{"title": "首页"}, {"title": "产业链"}]}, "tags": ["a", "b"]}
+    assert ProjectListCapture.find_records(payload) == (None, None)
+
+
+def test_find_records_stops_at_max_depth():
+    payload = [{"projectName": "甲"}]
+    for _ in range(6):
+        payload = {"data": payload}
+    assert ProjectListCapture.find_records(payload) == (None, None)
+
+
+def test_merge_dedups_by_project_url_and_builds_detail_urls():
+    capture = ProjectListCapture()
+    page = {"total": 2, "rows": [
+        {"projectName": "甲", "projectId": 1, "investors": [{"name": "红杉"}, {"name": "高瓴"}]},
+        {"projectName": "乙", "detailUrl": "/product-details?id=2"},
+    ]}
+    assert capture.merge(page) == 2
+    assert capture.merge(page) == 0
+    assert capture.is_complete
+    first, second = capture.to_list()
+    assert first["project_url"] == "https://www.hanghangcha.com/product-details?id=1"
+    assert first["investors"] == "红杉、高瓴"
+    assert second["project_url"] == "https://www.hanghangcha.com/product-details?id=2"
+    assert second["row_index"] == 2
+
+
+def test_matches_table_requires_names_and_urls_to_agree():
+    capture = ProjectListCapture()
+    capture.merge([{"projectName": "甲", "projectId": 1}, {"projectName": "乙", "projectId": 2}])
+    detail = "https://www.hanghangcha.com/product-details?id="
+    assert capture.matches_table([("甲", detail + "1"), ("乙", detail + "2/")])
+    # 名称一致但链接不一致：接口数据不是表格显示的列表
+    assert not capture.matches_table([("甲", detail + "9"), ("乙", detail + "8")])
+    # 表格中大部分项目不在接口数据中
+    assert not capture.matches_table([("甲", ""), ("丁", ""), ("戊", "")])
+    assert not capture.matches_table([])
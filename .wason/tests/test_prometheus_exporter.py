@@ -0,0 +1,45 @@
+from manual_browser_scraper import PrometheusExporter
+
+
+def test_render_counters_gauges_and_callbacks():
+    exporter = PrometheusExporter()
+    exporter.counter("collections_total", "完成的采集数")
+    exporter.inc("collections_total", page_type="svg")
+    exporter.inc("collections_total", 2, page_type="svg")
+    exporter.gauge("queue_depth", "排队任务数", lambda: 4)
+    exporter.gauge("in_flight", "进行中的任务数", lambda: {"svg": 1}, label="page_type")
+    text = exporter.render()
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert "# HELP scraper_collections_total 完成的采集数" in lines
+    assert "# TYPE scraper_collections_total counter" in lines
+    assert 'scraper_collections_total{page_type="svg"} 3' in lines
+    assert "scraper_queue_depth 4" in lines
+    assert 'scraper_in_flight{page_type="svg"} 1' in lines
+
+
+def test_render_histogram_buckets_are_cumulative():
+    exporter = PrometheusExporter(namespace="test")
+    exporter.histogram("latency_seconds", "采集耗时", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        exporter.observe("latency_seconds", value, page_type="svg")
+    lines = exporter.render().splitlines()
+    assert 'test_latency_seconds_bucket{page_type="svg",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{page_type="svg",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{page_type="svg",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_sum{page_type="svg"} 5.55' in lines
+    assert 'test_latency_seconds_count{page_type="svg"} 3' in lines
+
+
+def test_render_escapes_labels_and_skips_failing_callbacks():
+    exporter = PrometheusExporter()
+    exporter.counter("errors_total", "错误数")
+    exporter.inc("errors_total", reason='bad "quote"\n')
+    
+    def broken():
+        raise RuntimeError("boom")
+    
+    exporter.gauge("broken", "回调出错的仪表", broken)
+    text = exporter.render()
+    assert 'scraper_errors_total{reason="bad \\"quote\\"\\n"} 1' in text.splitlines()
+    assert "scraper_broken" not in text
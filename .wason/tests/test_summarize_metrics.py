@@ -0,0 +1,44 @@
+import json
+
+from manual_browser_scraper import _percentile, summarize_metrics
+
+
+def write_records(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert _percentile(values, 50) == 50
+    assert _percentile(values, 95) == 95
+    assert _percentile(values, 99) == 99
+    assert _percentile([7], 99) == 7
+    assert _percentile([], 50) == 0.0
+
+
+def test_summarize_groups_by_page_type_and_skips_skipped_latency(tmp_path):
+    path = tmp_path / "collection_metrics.jsonl"
+    write_records(path, [
+        {"page_type": "chain-info", "outcome": "saved", "total_ms": 100.0,
+         "stages_ms": {"extract": 60.0, "other": 40.0}, "bytes_written": 10, "loop_lag_ms": 5.0},
+        {"page_type": "chain-info", "outcome": "saved", "total_ms": 300.0,
+         "stages_ms": {"extract": 200.0, "other": 100.0}, "bytes_written": 20},
+        {"page_type": "chain-info", "outcome": "skipped", "total_ms": 1.0, "stages_ms": {}},
+        {"page_type": "svg", "outcome": "failed", "total_ms": 50.0, "bytes_downloaded": 7},
+    ])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("{not json\n")
+    
+    summary = summarize_metrics(path)
+    chain_info = summary["chain-info"]
+    assert chain_info["count"] == 3
+    assert chain_info["outcomes"] == {"saved": 2, "skipped": 1}
+    assert chain_info["bytes_written"] == 30
+    latency = chain_info["latency_ms"]
+    assert latency["total"] == {"count": 2, "p50": 100.0, "p95": 300.0, "p99": 300.0}
+    assert latency["extract"]["p50"] == 60.0
+    assert latency["loop_lag"]["count"] == 1
+    assert summary["svg"]["bytes_downloaded"] == 7
+    assert summary["svg"]["outcomes"] == {"failed": 1}
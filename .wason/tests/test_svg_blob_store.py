@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from manual_browser_scraper import AtomicFileWriter, SvgBlobStore, SvgFingerprint
+
+
+@pytest.fixture
+def writer():
+    writer = AtomicFileWriter()
+    yield writer
+    writer.close(timeout=5)
+
+
+def test_put_dedups_by_fingerprint(tmp_path, writer):
+    store = SvgBlobStore(tmp_path / ".blobs", writer)
+    first = store.put("\ufeff<svg>\r\n<g/>\r\n</svg>")
+    second = store.put("<svg>\n<g/>\n</svg>")
+    assert first["created"] and not second["created"]
+    # blob id 与下载时计算的内容指纹一致
+    assert first["blob_id"] == second["blob_id"] == SvgFingerprint.of("<svg>\n<g/>\n</svg>")
+    assert writer.flush(timeout=5)
+    assert store.read(first["blob_id"]) == "<svg>\n<g/>\n</svg>"
+    assert (store.blobs_written, store.blobs_reused) == (1, 1)
+
+
+def test_existing_blob_on_disk_is_not_rewritten(tmp_path, writer):
+    store = SvgBlobStore(tmp_path / ".blobs", writer)
+    blob_id = store.put("<svg/>")["blob_id"]
+    assert writer.flush(timeout=5)
+    assert not SvgBlobStore(tmp_path / ".blobs", writer).put("<svg/>")["created"]
+    assert store.contains(blob_id)
+
+
+def test_add_snapshot_only_updates_last_seen_for_same_content(tmp_path, writer):
+    store = SvgBlobStore(tmp_path / ".blobs", writer)
+    manifest_path = tmp_path / "链" / SvgBlobStore.MANIFEST_NAME
+    blob = dict(store.put("<svg/>"), kind="inline")
+    store.add_snapshot(manifest_path, "链", [blob], {"svg_url": "u"})
+    snapshot = store.add_snapshot(manifest_path, "链", [blob])
+    assert snapshot["times_seen"] == 2
+    changed = dict(store.put("<svg><g/></svg>"), kind="inline")
+    store.add_snapshot(manifest_path, "链", [changed])
+    assert writer.flush(timeout=5)
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert [len(s["blobs"]) for s in manifest["snapshots"]] == [1, 1]
+    assert manifest["snapshots"][0]["svg_url"] == "u"
+
+
+def test_manifest_cache_is_bounded_and_reloads_from_disk(tmp_path, writer):
+    store = SvgBlobStore(tmp_path / ".blobs", writer, max_manifests=2)
+    blob = dict(store.put("<svg/>"), kind="inline")
+    paths = [tmp_path / f"chain{i}" / SvgBlobStore.MANIFEST_NAME for i in range(4)]
+    for path in paths:
+        store.add_snapshot(path, path.parent.name, [blob])
+        assert writer.flush(timeout=5)
+    assert len(store._manifests) <= 2
+    # 已淘汰的manifest再次使用时从磁盘加载，内容不丢失
+    snapshot = store.add_snapshot(paths[0], "chain0", [blob])
+    assert snapshot["times_seen"] == 2
+
+
+def test_failed_blob_write_is_retried(tmp_path, writer):
+    root = tmp_path / ".blobs"
+    # blob目录被同名文件占用，写入失败
+    root.write_text("", encoding="utf-8")
+    store = SvgBlobStore(root, writer)
+    blob_id = store.put("<svg/>")["blob_id"]
+    assert writer.flush(timeout=5)
+    assert not store.contains(blob_id)
+    root.unlink()
+    assert store.put("<svg/>")["created"]
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from manual_browser_scraper import SvgDownloadClient, TokenBucket
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    async def scenario():
+        bucket = TokenBucket(rate=50, burst=2)
+        assert await bucket.acquire() == 0.0
+        assert await bucket.acquire() == 0.0
+        started = time.monotonic()
+        waited = await bucket.acquire()
+        assert waited > 0
+        assert time.monotonic() - started >= 0.015
+    
+    run(scenario())
+
+
+def test_token_bucket_without_rate_never_waits():
+    async def scenario():
+        bucket = TokenBucket(rate=0, burst=1)
+        assert [await bucket.acquire() for _ in range(5)] == [0.0] * 5
+    
+    run(scenario())
+
+
+def make_client(responses, **kwargs):
+    """下载客户端，_request 按顺序返回 responses 中的结果（异常实例会被抛出）"""
+    client = SvgDownloadClient(rate=0, backoff=0.001, max_backoff=0.01, **kwargs)
+    calls = []
+    
+    async def fake_request(context, url, extra_headers):
+        calls.append(dict(extra_headers))
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    client._request = fake_request
+    return client, calls
+
+
+def test_fetch_retries_transient_failures():
+    client, calls = make_client([
+        ConnectionError("reset"),
+        (503, "", {"retry-after": "60"}, None),
+        (200, "<svg/>", {"etag": '"e1"', "last-modified": "Mon"}, "f1"),
+    ], retries=3)
+    result = run(client.fetch(None, "https://data.hanghangcha.com/a.svg"))
+    assert result == (200, "<svg/>", {"etag": '"e1"', "last_modified": "Mon", "fingerprint": "f1"})
+    assert (len(calls), client.retried, client.downloads) == (3, 2, 1)
+
+
+def test_fetch_gives_up_on_non_retryable_status():
+    client, calls = make_client([(404, "", {}, None)], retries=3)
+    assert run(client.fetch(None, "https://data.hanghangcha.com/a.svg")) is None
+    assert len(calls) == 1
+
+
+def test_fetch_sends_conditional_headers_and_handles_304():
+    client, calls = make_client([(304, None, {}, None)])
+    validators = {"etag": '"e1"', "last_modified": "Mon"}
+    assert run(client.fetch(None, "https://data.hanghangcha.com/a.svg", validators)) == (304, None, None)
+    assert calls == [{"If-None-Match": '"e1"', "If-Modified-Since": "Mon"}]
+    assert client.not_modified == 1
+
+
+def test_cookie_header_matches_domain_path_and_scheme():
+    client = SvgDownloadClient()
+    client._cookies = [
+        {"name": "sid", "value": "1", "domain": ".hanghangcha.com", "path": "/"},
+        {"name": "api", "value": "2", "domain": "data.hanghangcha.com", "path": "/api"},
+        {"name": "secure", "value": "3", "domain": "hanghangcha.com", "path": "/", "secure": True},
+        {"name": "other", "value": "4", "domain": "example.com", "path": "/"},
+    ]
+    assert client._cookie_header("https://data.hanghangcha.com/a.svg") == "sid=1; secure=3"
+    assert client._cookie_header("http://data.hanghangcha.com/api/x") == "sid=1; api=2"
@@ -0,0 +1,51 @@
+import hashlib
+import json
+
+from manual_browser_scraper import ManualBrowserScraper, SvgFingerprint, content_digest, data_digest
+
+
+def test_fingerprint_ignores_bom_and_line_endings():
+    unix = "<svg>\n  <g/>\n</svg>"
+    assert SvgFingerprint.of("﻿" + unix.replace("\n", "\r\n")) == SvgFingerprint.of(unix)
+    assert SvgFingerprint.of(unix.encode("utf-8")) == SvgFingerprint.of(unix)
+    assert SvgFingerprint.of(unix) != SvgFingerprint.of(unix.replace("<g/>", "<g />"))
+
+
+def test_streaming_update_matches_whole_content():
+    content = "﻿<svg>\r\n<text>中文</text>\r\n</svg>".encode("utf-8")
+    fingerprint = SvgFingerprint()
+    # 分块（含空块、跨越 \r\n 的切分）与整体计算结果一致
+    for chunk in (b"", content[:5], content[5:9], content[9:]):
+        fingerprint.update(chunk)
+    assert fingerprint.hexdigest() == SvgFingerprint.of(content)
+
+
+def test_normalize_and_digest_define_the_fingerprint():
+    markup = "﻿<svg>\r\n</svg>\r\n"
+    assert SvgFingerprint.normalize(markup) == "<svg>\n</svg>\n"
+    assert SvgFingerprint.of(markup) == content_digest(SvgFingerprint.normalize(markup))
+    assert content_digest("abc") == hashlib.blake2b(b"abc", digest_size=16).hexdigest()
+
+
+def test_data_digest_ignores_key_order():
+    assert data_digest({"a": 1, "b": ["中"]}) == data_digest({"b": ["中"], "a": 1})
+    assert data_digest({"a": 1}) == content_digest(json.dumps({"a": 1}))
+
+
+def test_data_hash_detects_same_length_content_changes():
+    scraper = ManualBrowserScraper.__new__(ManualBrowserScraper)
+    base = {"svg_count": 1, "svg_urls": ["u"], "svg_content": ["<svg><g id='a'/></svg>"]}
+    changed = dict(base, svg_content=["<svg><g id='b'/></svg>"])
+    assert scraper._calculate_data_hash(base) != scraper._calculate_data_hash(changed)
+    assert scraper._calculate_data_hash(base) == scraper._calculate_data_hash(dict(base))
+
+
+def test_list_hashes_are_order_independent():
+    scraper = ManualBrowserScraper.__new__(ManualBrowserScraper)
+    projects = [{"project_name": "甲", "project_url": "u1"}, {"project_name": "乙", "project_url": "u2"}]
+    assert (scraper._calculate_chain_info_data_hash(projects)
+            == scraper._calculate_chain_info_data_hash(list(reversed(projects))))
+    product = {"project_name": "甲", "company_name": "公司", "business_info": {"法人": "张三"}}
+    assert scraper._calculate_product_details_data_hash(product) == scraper._calculate_product_details_data_hash(dict(product))
+    assert scraper._calculate_product_details_data_hash(product) != scraper._calculate_product_details_data_hash(
+        dict(product, business_info={"法人": "李四"}))
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from manual_browser_scraper import ContextRecycler, LoginRequiredError, ManualBrowserScraper, UrlFrontier
+
+
+def normalize(url):
+    return url.rstrip("/")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_add_dedups_and_respects_depth_and_page_limits():
+    frontier = UrlFrontier(normalize, max_depth=1, max_pages=2)
+    assert frontier.add("https://a/chain-info?id=1", 0)
+    assert not frontier.add("https://a/chain-info?id=1/", 0)
+    assert not frontier.add("https://a/chain-info?id=2", 2)
+    assert frontier.add("https://a/chain-info?id=3", 1)
+    assert not frontier.add("https://a/chain-info?id=4", 1)
+    assert (frontier.added, frontier.duplicates, frontier.pending) == (2, 1, 2)
+
+
+def test_retry_requeues_until_max_attempts_and_join_completes():
+    async def scenario():
+        frontier = UrlFrontier(normalize, max_attempts=2)
+        frontier.add("https://a/chain-detail?id=1", 0, "chain-detail")
+        item = await frontier.get()
+        assert frontier.retry(item)
+        frontier.task_done()
+        retried = await frontier.get()
+        assert retried["attempt"] == 2
+        assert not frontier.retry(retried)
+        frontier.failed += 1
+        frontier.task_done()
+        await asyncio.wait_for(frontier.join(), 1)
+        assert (frontier.retried, frontier.failed, frontier.pending) == (1, 1, 0)
+    
+    run(scenario())
+
+
+def test_get_returns_none_when_stopped():
+    async def scenario():
+        frontier = UrlFrontier(normalize)
+        stop_event = asyncio.Event()
+        getter = asyncio.create_task(frontier.get(stop_event))
+        await asyncio.sleep(0)
+        stop_event.set()
+        assert await asyncio.wait_for(getter, 1) is None
+        # 已停止时不再取出条目，条目留给下一个浏览器上下文
+        frontier.add("https://a/chain-info?id=1", 0)
+        assert await frontier.get(stop_event) is None
+        assert frontier.pending == 1
+    
+    run(scenario())
+
+
+class FakePage:
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    pages = []
+    
+    async def new_page(self):
+        return FakePage()
+
+
+def make_scraper(collect):
+    # 只需要 _run_batch_round 用到的属性，不创建输出目录和状态数据库
+    scraper = ManualBrowserScraper.__new__(ManualBrowserScraper)
+    scraper.context_recycler = ContextRecycler()
+    scraper._collect_batch_url = collect
+    return scraper
+
+
+def test_batch_round_completes_all_urls():
+    async def collect(page, context, item, refresh, page_timeout):
+        await asyncio.sleep(0)
+        return []
+    
+    async def scenario():
+        scraper = make_scraper(collect)
+        frontier = UrlFrontier(normalize)
+        for i in range(5):
+            frontier.add(f"https://a/chain-info?id={i}", 0, "chain-info")
+        assert await scraper._run_batch_round(FakeContext(), frontier, 2, False, 10) is None
+        assert frontier.completed == 5
+    
+    run(scenario())
+
+
+def test_batch_round_aborts_on_logged_out_page():
+    async def collect(page, context, item, refresh, page_timeout):
+        if item["url"].endswith("id=2"):
+            raise LoginRequiredError("未登录")
+        await asyncio.sleep(0)
+        return []
+    
+    async def scenario():
+        scraper = make_scraper(collect)
+        frontier = UrlFrontier(normalize)
+        for i in range(6):
+            frontier.add(f"https://a/chain-info?id={i}", 0, "chain-info")
+        with pytest.raises(LoginRequiredError):
+            await scraper._run_batch_round(FakeContext(), frontier, 2, False, 10)
+        # 未登录的页面不计为完成，也不重试
+        assert frontier.completed < 6
+        assert frontier.retried == 0
+    
+    run(scenario())